@@ -1,18 +1,71 @@
 """Main orchestration module for the news aggregator."""
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 from src.scraper.news_scraper import NewsScraper, Article
+from src.embeddings.batch_jobs import (
+    BATCH_TERMINAL_STATUSES,
+    BatchJobStore,
+    download_batch_results,
+    submit_batch,
+    wait_for_batch,
+)
 from src.embeddings.embeddings_service import EmbeddingsService
+from src.embeddings.llm_cache import bypass_llm_cache
+from src.embeddings.similarity import SimilarityIndex
 from src.storage.supabase_storage import SupabaseStorage
+from src.pdf_generator.digest_builder import DigestBuilder
 from src.pdf_generator.pdf_service import PDFGenerator
 from src.config import settings
+from src.security import SANITIZED_KEY, sanitized_view, strip_private_fields
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Marks the end of a stream between pipeline stages
+_END_OF_STREAM = None
+
+
+class _StreamingDeduplicator:
+    """Incremental duplicate filter for articles arriving in chunks.
+
+    Keeps an article only if it is below the similarity threshold with every
+    article kept so far, which matches the batch grouping done by
+    EmbeddingsService.find_duplicates for the same arrival order.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._kept: Optional[np.ndarray] = None
+        self.kept_articles: List[Dict[str, Any]] = []
+
+    @property
+    def vectors(self) -> Optional[np.ndarray]:
+        """Normalized embeddings of the kept articles, in arrival order."""
+        return self._kept
+
+    def filter(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the articles of a chunk that are not duplicates."""
+        unique = []
+        for article in articles:
+            vector = np.asarray(article["embedding"], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+
+            if self._kept is not None and float(np.max(self._kept @ vector)) >= self.threshold:
+                continue
+
+            self._kept = vector[None, :] if self._kept is None else np.vstack([self._kept, vector])
+            self.kept_articles.append(article)
+            unique.append(article)
+        return unique
+
 
 class NewsAggregator:
     """Main orchestrator for the news aggregation pipeline."""
@@ -22,55 +75,136 @@ class NewsAggregator:
         self.embeddings_service = EmbeddingsService()
         self.storage = SupabaseStorage()
         self.pdf_generator = PDFGenerator()
+        self.batch_jobs = BatchJobStore(settings.llm_batch_state_path)
     
     async def process_articles(
         self,
         articles: List[Article],
-        deduplicate: bool = True
+        deduplicate: bool = True,
+        embedding_stats: Optional[Dict[str, int]] = None
     ) -> List[Dict[str, Any]]:
-        """Process articles: generate embeddings and deduplicate."""
+        """Process articles: generate embeddings and deduplicate.
+
+        Args:
+            articles: Scraped articles
+            deduplicate: Remove duplicate articles based on similarity
+            embedding_stats: Optional dict filled with embedding failure accounting
+        """
+        processed_articles, _ = await self._process_with_similarity(
+            articles,
+            deduplicate,
+            embedding_stats
+        )
+        return processed_articles
+
+    async def _process_with_similarity(
+        self,
+        articles: List[Article],
+        deduplicate: bool = True,
+        embedding_stats: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[SimilarityIndex]]:
+        """Process articles and keep the run's similarity structure for later stages.
+
+        Returns:
+            Tuple of (processed articles, SimilarityIndex aligned with them)
+        """
         if not articles:
             logger.warning("No articles to process")
-            return []
+            return [], None
         
         logger.info(f"Processing {len(articles)} articles")
         
-        # Generate embeddings
-        texts = [f"{article.title} {article.content}" for article in articles]
-        embeddings = await self.embeddings_service.generate_embeddings_batch(texts)
+        # Generate embeddings from text sanitized once, here at ingestion
+        views = self._sanitized_views(articles)
+        embeddings = await self.embeddings_service.generate_embeddings_batch(
+            self._embedding_texts(views),
+            stats=embedding_stats,
+            sanitized=True
+        )
         
         # Create article dictionaries with embeddings
-        processed_articles = []
-        for article, embedding in zip(articles, embeddings):
+        processed_articles = self._build_records(articles, embeddings, views)
+        
+        logger.info(f"Generated embeddings for {len(processed_articles)} articles")
+        
+        if not processed_articles:
+            return [], None
+        
+        # Pairwise similarities are computed once and shared with clustering
+        # and ranking, which find their articles in it
+        similarity = SimilarityIndex(
+            [article["embedding"] for article in processed_articles],
+            articles=processed_articles
+        )
+        
+        # Deduplicate if requested
+        if deduplicate and len(processed_articles) > 1:
+            processed_articles, similarity = self._deduplicate_articles(
+                processed_articles,
+                similarity
+            )
+        
+        return processed_articles, similarity
+
+    @staticmethod
+    def _sanitized_views(articles: List[Article]) -> List[Dict[str, str]]:
+        """Sanitize each scraped article's text once, for embedding and every LLM call."""
+        return [
+            sanitized_view({"title": article.title, "content": article.content})
+            for article in articles
+        ]
+
+    @staticmethod
+    def _embedding_texts(views: List[Dict[str, str]]) -> List[str]:
+        """Embedding input per article, from its sanitized view."""
+        return [f"{view.get('title', '')} {view.get('content', '')}" for view in views]
+
+    @staticmethod
+    def _build_records(
+        articles: List[Article],
+        embeddings: List[Optional[List[float]]],
+        views: List[Dict[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Turn scraped articles into records, skipping failed embeddings.
+
+        Each record carries its sanitized view under SANITIZED_KEY; storage
+        drops it (see strip_private_fields).
+        """
+        records = []
+        for article, embedding, view in zip(articles, embeddings, views):
             if embedding:
-                processed_articles.append({
+                records.append({
                     "title": article.title,
                     "content": article.content,
                     "url": article.url,
                     "source": article.source,
                     "published_date": article.published_date.isoformat(),
                     "author": article.author,
-                    "embedding": embedding
+                    "embedding": embedding,
+                    SANITIZED_KEY: view,
                 })
-        
-        logger.info(f"Generated embeddings for {len(processed_articles)} articles")
-        
-        # Deduplicate if requested
-        if deduplicate and len(processed_articles) > 1:
-            processed_articles = self._deduplicate_articles(processed_articles)
-        
-        return processed_articles
+        return records
     
     def _deduplicate_articles(
         self,
-        articles: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Remove duplicate articles based on embedding similarity."""
+        articles: List[Dict[str, Any]],
+        similarity: Optional[SimilarityIndex] = None
+    ) -> Tuple[List[Dict[str, Any]], SimilarityIndex]:
+        """Remove duplicate articles based on embedding similarity.
+
+        Returns:
+            Tuple of (unique articles, similarity index restricted to them)
+        """
+        embeddings = [article["embedding"] for article in articles]
+        if similarity is None:
+            similarity = SimilarityIndex(embeddings, articles=articles)
         if len(articles) <= 1:
-            return articles
+            return articles, similarity
         
-        embeddings = [article["embedding"] for article in articles]
-        duplicate_groups = self.embeddings_service.find_duplicates(embeddings)
+        duplicate_groups = self.embeddings_service.find_duplicates(
+            embeddings,
+            similarity=similarity
+        )
         
         # Keep only the first article from each duplicate group
         duplicates_to_remove = set()
@@ -78,19 +212,17 @@ class NewsAggregator:
             # Remove all but the first article in the group
             duplicates_to_remove.update(group[1:])
         
-        unique_articles = [
-            article for idx, article in enumerate(articles)
-            if idx not in duplicates_to_remove
-        ]
+        kept = [idx for idx in range(len(articles)) if idx not in duplicates_to_remove]
+        unique_articles = [articles[idx] for idx in kept]
         
         logger.info(
             f"Deduplication: {len(articles)} -> {len(unique_articles)} "
             f"({len(articles) - len(unique_articles)} duplicates removed)"
         )
         
-        return unique_articles
+        return unique_articles, similarity.subset(kept)
     
-    def store_articles(
+    async def store_articles(
         self,
         articles: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
@@ -98,7 +230,7 @@ class NewsAggregator:
         if not articles:
             return []
         
-        stored = self.storage.store_articles_batch(articles)
+        stored = await self.storage.store_articles_batch(articles)
         logger.info(f"Stored {len(stored)} articles in database")
         return stored
     
@@ -107,7 +239,11 @@ class NewsAggregator:
         articles: List[Dict[str, Any]],
         filename: Optional[str] = None,
         group_by_topic: bool = True,
-        enrich: bool = True
+        enrich: bool = True,
+        similarity: Optional[SimilarityIndex] = None,
+        refresh_cache: bool = False,
+        fast: bool = False,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> str:
         """Generate PDF digest from articles.
 
@@ -116,38 +252,208 @@ class NewsAggregator:
             filename: Optional output filename
             group_by_topic: If True, cluster articles by topic and generate index
             enrich: If True, add executive summary, top picks, and section briefs
+            similarity: SimilarityIndex covering articles, reused for clustering
+                and top-article ranking
+            refresh_cache: Regenerate names and summaries instead of reusing
+                cached LLM responses (fresh results still refresh the cache)
+            fast: Name topics and write summaries locally (keywords and
+                extractive sentences), with no chat API calls
+            on_event: Receives digest progress while enriching (see
+                DigestBuilder)
         """
         if not articles:
             logger.warning("No articles to generate digest from")
             return None
 
         if group_by_topic and len(articles) >= 3:
-            # Cluster articles by topic
-            logger.info("Clustering articles by topic...")
-            grouped_articles = await self.embeddings_service.cluster_and_name_articles(
-                articles,
-                max_clusters=8
-            )
+            cache = self.embeddings_service.content_generator.cache
+            before = await cache.astats() if cache else {}
 
-            if enrich:
-                # Enrich with executive summary, top picks, and briefs
-                logger.info("Enriching content with AI summaries...")
-                enriched_data = self.embeddings_service.enrich_grouped_articles(
-                    grouped_articles
+            with bypass_llm_cache(refresh_cache):
+                # Cluster articles by topic
+                logger.info("Clustering articles by topic...")
+                grouped_articles = await self.embeddings_service.cluster_and_name_articles(
+                    articles,
+                    max_clusters=8,
+                    similarity=similarity,
+                    local=fast
                 )
-                pdf_path = self.pdf_generator.generate_pdf_enriched(enriched_data, filename)
-                logger.info(f"Generated enriched digest PDF: {pdf_path}")
-            else:
-                pdf_path = self.pdf_generator.generate_pdf_grouped(grouped_articles, filename)
-                logger.info(f"Generated grouped digest PDF: {pdf_path}")
+
+                if enrich:
+                    # Enrich with executive summary, top picks, and briefs
+                    logger.info(
+                        "Enriching content with extractive summaries..." if fast
+                        else "Enriching content with AI summaries..."
+                    )
+                    pdf_path = await self._build_enriched_pdf(
+                        grouped_articles,
+                        filename,
+                        fast,
+                        on_event,
+                        similarity
+                    )
+                    logger.info(f"Generated enriched digest PDF: {pdf_path}")
+                else:
+                    pdf_path = self.pdf_generator.generate_pdf_grouped(
+                        [{"topic_name": topic, "articles": group} for topic, group in grouped_articles.items()],
+                        filename
+                    )
+                    logger.info(f"Generated grouped digest PDF: {pdf_path}")
+
+                # Topics learned from locally named clusters are not kept
+                if not fast:
+                    self.embeddings_service.commit_topics()
+
+            if cache:
+                after = await cache.astats()
+                hits = after["hits"] - before["hits"]
+                misses = after["misses"] - before["misses"]
+                reused = after["semantic_hits"] - before["semantic_hits"]
+                lookups = reused + after["semantic_misses"] - before["semantic_misses"]
+                logger.info(f"LLM cache: {hits} hits, {misses} misses")
+                if lookups:
+                    logger.info(
+                        f"Semantic cache: reused {reused}/{lookups} responses "
+                        f"({reused / lookups:.0%}), none older than "
+                        f"{settings.llm_semantic_cache_max_age_hours:g}h"
+                    )
         else:
             # Generate flat PDF
             pdf_path = self.pdf_generator.generate_pdf(articles, filename)
             logger.info(f"Generated digest PDF: {pdf_path}")
 
         return str(pdf_path)
+
+    async def _build_enriched_pdf(
+        self,
+        grouped_articles: Dict[str, List[Dict[str, Any]]],
+        filename: Optional[str],
+        fast: bool = False,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        similarity: Optional[SimilarityIndex] = None
+    ):
+        """Enrich topics and render the PDF, assembling sections as they finish.
+
+        Summary and section texts are streamed; each section is rendered as
+        soon as it completes, so the PDF is written right after the last one.
+        """
+        builder = DigestBuilder(list(grouped_articles), self.pdf_generator, on_event)
+        enriched_data = await self.embeddings_service.enrich_grouped_articles(
+            grouped_articles,
+            local=fast,
+            on_event=builder.handle,
+            similarity=similarity
+        )
+        return self.pdf_generator.generate_pdf_enriched(builder.finish(enriched_data), filename)
     
-    def _filter_existing_articles(self, articles: List[Article]) -> List[Article]:
+    async def submit_digest_batch(
+        self,
+        articles: List[Dict[str, Any]],
+        filename: Optional[str] = None,
+        similarity: Optional[SimilarityIndex] = None
+    ) -> Optional[str]:
+        """Cluster articles now and submit their enrichment as a Batch API job.
+
+        Topic naming runs synchronously (the grouping is needed to build the
+        enrichment prompts); every enrichment request that misses the LLM
+        cache goes into one batch job. The job, its articles and the topics
+        learned while clustering are persisted, so resume_digest_batch can
+        finish the digest after a restart; the topics are only saved then.
+
+        Args:
+            articles: List of processed articles with embeddings
+            filename: Optional output filename for the PDF
+            similarity: SimilarityIndex aligned with articles, reused for clustering
+
+        Returns:
+            Batch job id ("" if every response was already cached), or None
+            if nothing was submitted
+        """
+        generator = self.embeddings_service.content_generator
+        if generator.cache is None:
+            logger.error("Batch enrichment needs the LLM cache (LLM_CACHE_ENABLED=true)")
+            return None
+        if len(articles) < 3:
+            logger.warning("Not enough articles for an enriched digest")
+            return None
+
+        pending = self.batch_jobs.load()
+        if pending:
+            logger.warning(f"Replacing pending batch job {pending.get('batch_id')}")
+
+        grouped_articles = await self.embeddings_service.cluster_and_name_articles(
+            articles,
+            max_clusters=8,
+            similarity=similarity
+        )
+        staged, self.embeddings_service.staged_topics = self.embeddings_service.staged_topics, None
+        requests = await generator.collect_batch_requests(grouped_articles)
+
+        batch_id = ""
+        if requests:
+            batch_id = await submit_batch(generator.client, requests, metadata={"job": "digest_enrichment"})
+
+        self.batch_jobs.save({
+            "batch_id": batch_id,
+            "submitted_at": datetime.now().isoformat(),
+            "request_count": len(requests),
+            "filename": filename,
+            "grouped_articles": {
+                topic: [strip_private_fields(article) for article in group]
+                for topic, group in grouped_articles.items()
+            },
+            "topics": staged.to_dict() if staged is not None else None,
+        })
+        return batch_id
+
+    async def resume_digest_batch(self, wait: bool = True) -> Optional[str]:
+        """Finish the digest of the pending batch job, if it is done.
+
+        Batch results seed the LLM cache, then enrichment runs as usual and
+        is served from it. Requests the job did not answer (or all of them,
+        if it failed or expired) fall back to synchronous calls.
+
+        Args:
+            wait: Poll until the job finishes, for at most
+                LLM_BATCH_WAIT_TIMEOUT seconds; if False, check once
+
+        Returns:
+            Path to the generated PDF, or None if no job is pending or it is
+            still running
+        """
+        state = self.batch_jobs.load()
+        if state is None:
+            logger.info("No pending batch job")
+            return None
+
+        generator = self.embeddings_service.content_generator
+        batch_id = state.get("batch_id")
+        if batch_id:
+            batch = await wait_for_batch(
+                generator.client,
+                batch_id,
+                settings.llm_batch_poll_interval,
+                timeout=settings.llm_batch_wait_timeout if wait else 0
+            )
+            if batch.status not in BATCH_TERMINAL_STATUSES:
+                return None
+
+            if batch.status == "completed":
+                results = await download_batch_results(generator.client, batch)
+                seeded = await generator.seed_cache(results)
+                logger.info(f"Seeded LLM cache with {seeded}/{state.get('request_count', 0)} batch responses")
+            else:
+                logger.warning(f"Batch {batch_id} {batch.status}, enriching with synchronous calls")
+
+        pdf_path = await self._build_enriched_pdf(state["grouped_articles"], state.get("filename"))
+        logger.info(f"Generated enriched digest PDF from batch {batch_id or '(cached)'}: {pdf_path}")
+        if state.get("topics"):
+            self.embeddings_service.commit_topics(state["topics"])
+
+        self.batch_jobs.clear()
+        return str(pdf_path)
+
+    async def _filter_existing_articles(self, articles: List[Article]) -> List[Article]:
         """Filter out articles that already exist in the database.
 
         Args:
@@ -160,7 +466,7 @@ class NewsAggregator:
             return []
 
         urls = [article.url for article in articles]
-        existing_urls = self.storage.get_existing_urls(urls)
+        existing_urls = await self.storage.get_existing_urls(urls)
 
         if not existing_urls:
             return articles
@@ -179,7 +485,10 @@ class NewsAggregator:
         store: bool = True,
         generate_pdf: bool = True,
         group_by_topic: bool = True,
-        enrich: bool = True
+        enrich: bool = True,
+        streaming: bool = False,
+        fast: bool = False,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """Run the complete news aggregation pipeline.
 
@@ -190,10 +499,28 @@ class NewsAggregator:
             generate_pdf: Generate PDF digest
             group_by_topic: Cluster articles by topic in PDF (requires generate_pdf=True)
             enrich: Add executive summary, top 3 picks, and section briefs (requires group_by_topic=True)
+            streaming: Run scrape, filter, embed, dedupe and store as concurrent
+                stages connected by bounded queues instead of one after another
+            fast: Build the digest without chat API calls (local topic names
+                and extractive summaries)
+            on_event: Receives digest progress (streamed text and finished
+                sections, see DigestBuilder)
 
         Returns:
             Dictionary with pipeline results including article count and PDF path.
         """
+        if streaming:
+            return await self.run_streaming_pipeline(
+                sources=sources,
+                deduplicate=deduplicate,
+                store=store,
+                generate_pdf=generate_pdf,
+                group_by_topic=group_by_topic,
+                enrich=enrich,
+                fast=fast,
+                on_event=on_event
+            )
+
         logger.info("Starting news aggregation pipeline")
         start_time = datetime.now()
 
@@ -211,7 +538,7 @@ class NewsAggregator:
 
         # Step 2: Filter out articles that already exist in database
         if store:
-            articles = self._filter_existing_articles(articles)
+            articles = await self._filter_existing_articles(articles)
             if not articles:
                 logger.info("All articles already exist in database")
                 return {
@@ -224,12 +551,17 @@ class NewsAggregator:
                 }
 
         # Step 3: Process articles (embeddings + deduplication)
-        processed_articles = await self.process_articles(articles, deduplicate)
+        embedding_stats: Dict[str, int] = {}
+        processed_articles, similarity = await self._process_with_similarity(
+            articles,
+            deduplicate,
+            embedding_stats
+        )
 
         # Step 4: Store articles
         stored_articles = []
         if store and processed_articles:
-            stored_articles = self.store_articles(processed_articles)
+            stored_articles = await self.store_articles(processed_articles)
 
         # Step 5: Generate PDF (with optional topic clustering and enrichment)
         pdf_path = None
@@ -237,7 +569,10 @@ class NewsAggregator:
             pdf_path = await self.generate_digest(
                 processed_articles,
                 group_by_topic=group_by_topic,
-                enrich=enrich
+                enrich=enrich,
+                similarity=similarity,
+                fast=fast,
+                on_event=on_event
             )
 
         elapsed_time = (datetime.now() - start_time).total_seconds()
@@ -248,6 +583,7 @@ class NewsAggregator:
             "articles_new": len(articles),
             "articles_processed": len(processed_articles),
             "articles_stored": len(stored_articles),
+            "embedding_failures": embedding_stats,
             "pdf_path": pdf_path,
             "elapsed_time": elapsed_time
         }
@@ -255,6 +591,150 @@ class NewsAggregator:
         logger.info(f"Pipeline completed in {elapsed_time:.2f}s: {result}")
         return result
 
+    async def run_streaming_pipeline(
+        self,
+        sources: Optional[List[str]] = None,
+        deduplicate: bool = True,
+        store: bool = True,
+        generate_pdf: bool = True,
+        group_by_topic: bool = True,
+        enrich: bool = True,
+        fast: bool = False,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Run the pipeline with articles flowing through the stages as they arrive.
+
+        Each finished feed is filtered, embedded, deduplicated and stored while
+        other feeds are still being scraped. Stages are connected by bounded
+        queues, so a slow stage applies backpressure upstream and memory stays
+        bounded by the queue sizes. The PDF is generated once all stages drain.
+
+        Args:
+            Same as run_full_pipeline.
+
+        Returns:
+            Dictionary with pipeline results (same keys as run_full_pipeline).
+        """
+        logger.info("Starting streaming news aggregation pipeline")
+        start_time = datetime.now()
+
+        queue_size = settings.stream_queue_size
+        to_filter: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        to_embed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        to_dedupe: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        to_store: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        counts = {"scraped": 0, "new": 0, "stored": 0}
+        embedding_stats: Dict[str, int] = {}
+        processed_articles: List[Dict[str, Any]] = []
+        deduplicator = _StreamingDeduplicator(settings.similarity_threshold)
+
+        async def scrape_stage():
+            async for feed_articles in self.scraper.iter_all_sources(sources):
+                counts["scraped"] += len(feed_articles)
+                await to_filter.put(feed_articles)
+            await to_filter.put(_END_OF_STREAM)
+
+        async def filter_stage():
+            while (chunk := await to_filter.get()) is not _END_OF_STREAM:
+                if store:
+                    chunk = await self._filter_existing_articles(chunk)
+                counts["new"] += len(chunk)
+                if chunk:
+                    await to_embed.put(chunk)
+            await to_embed.put(_END_OF_STREAM)
+
+        async def embed_stage():
+            while (chunk := await to_embed.get()) is not _END_OF_STREAM:
+                views = self._sanitized_views(chunk)
+                embeddings = await self.embeddings_service.generate_embeddings_batch(
+                    self._embedding_texts(views),
+                    stats=embedding_stats,
+                    sanitized=True
+                )
+                records = self._build_records(chunk, embeddings, views)
+                if records:
+                    await to_dedupe.put(records)
+            await to_dedupe.put(_END_OF_STREAM)
+
+        async def dedupe_stage():
+            while (records := await to_dedupe.get()) is not _END_OF_STREAM:
+                if deduplicate:
+                    records = deduplicator.filter(records)
+                processed_articles.extend(records)
+                if store and records:
+                    await to_store.put(records)
+            await to_store.put(_END_OF_STREAM)
+
+        async def store_stage():
+            while (records := await to_store.get()) is not _END_OF_STREAM:
+                stored = await self.store_articles(records)
+                counts["stored"] += len(stored)
+
+        # Each stage forwards the end marker once drained; a failing stage
+        # cancels the others instead of leaving them blocked on a queue
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(scrape_stage())
+                group.create_task(filter_stage())
+                group.create_task(embed_stage())
+                group.create_task(dedupe_stage())
+                group.create_task(store_stage())
+        except ExceptionGroup as errors:
+            # Raise a lone stage error as is, as run_full_pipeline would,
+            # so callers and the API can tell what failed
+            if len(errors.exceptions) == 1:
+                raise errors.exceptions[0] from errors
+            raise
+
+        if counts["scraped"] == 0:
+            logger.warning("No articles scraped")
+            return {
+                "success": False,
+                "message": "No articles found",
+                "articles_scraped": 0
+            }
+
+        pdf_path = None
+        if generate_pdf and processed_articles:
+            # The deduplicator already holds the kept articles' normalized
+            # vectors; the run's one index is built from them
+            if deduplicate:
+                similarity = SimilarityIndex(
+                    deduplicator.vectors,
+                    articles=deduplicator.kept_articles,
+                    normalized=True
+                )
+            else:
+                similarity = SimilarityIndex(
+                    [article["embedding"] for article in processed_articles],
+                    articles=processed_articles
+                )
+            pdf_path = await self.generate_digest(
+                processed_articles,
+                group_by_topic=group_by_topic,
+                enrich=enrich,
+                similarity=similarity,
+                fast=fast,
+                on_event=on_event
+            )
+
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+
+        result = {
+            "success": True,
+            "articles_scraped": counts["scraped"],
+            "articles_new": counts["new"],
+            "articles_processed": len(processed_articles),
+            "articles_stored": counts["stored"],
+            "embedding_failures": embedding_stats,
+            "pdf_path": pdf_path,
+            "elapsed_time": elapsed_time
+        }
+
+        logger.info(f"Streaming pipeline completed in {elapsed_time:.2f}s: {result}")
+        return result
+
 
 async def main():
     """Test the aggregator."""
@@ -1,9 +1,12 @@
 """FastAPI application for the news aggregator."""
 
+import asyncio
+import json
 import os
 import re
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
@@ -20,7 +23,6 @@ SAFE_FILENAME_PATTERN = re.compile(r'^[a-zA-Z0-9_\-\.]+\.pdf$')
 
 from src.aggregator import NewsAggregator
 from src.config import settings
-from src.storage.supabase_storage import SupabaseStorage
 from src.security import safe_log_error, get_safe_error_detail, verify_api_key
 
 logging.basicConfig(level=logging.INFO)
@@ -29,10 +31,24 @@ logger = logging.getLogger(__name__)
 # Rate limiter configuration
 limiter = Limiter(key_func=get_remote_address)
 
+# Global instances; the API reads through the aggregator's storage so both
+# share one database connection pool
+aggregator = NewsAggregator()
+storage = aggregator.storage
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the database connection pool on shutdown."""
+    yield
+    await storage.close()
+
+
 app = FastAPI(
     title="Tech News Aggregator API",
     description="Automated tech news aggregation with AI-powered deduplication",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration - restrict in production
@@ -48,9 +64,8 @@ app.add_middleware(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# Global instances
-aggregator = NewsAggregator()
-storage = SupabaseStorage()
+# Pipeline runs behind streaming responses; they finish even if the client leaves
+_background_runs: set = set()
 
 
 class ScrapeRequest(BaseModel):
@@ -79,6 +94,14 @@ class ScrapeRequest(BaseModel):
         True,
         description="Add executive summary, top 3 must-read articles, and section briefs (optimized for NotebookLM)"
     )
+    streaming: bool = Field(
+        False,
+        description="Process each feed through filter, embed, dedupe and store as soon as it is scraped"
+    )
+    fast: bool = Field(
+        False,
+        description="Build the digest without LLM calls (keyword topic names, extractive summaries)"
+    )
 
 
 class ArticleResponse(BaseModel):
@@ -99,6 +122,7 @@ class PipelineResponse(BaseModel):
     articles_new: Optional[int] = None
     articles_processed: int
     articles_stored: int
+    embedding_failures: Optional[Dict[str, int]] = None
     pdf_path: Optional[str] = None
     elapsed_time: float
 
@@ -129,6 +153,14 @@ class WebhookRequest(BaseModel):
         True,
         description="Add executive summary, top 3 articles, and section briefs"
     )
+    streaming: bool = Field(
+        False,
+        description="Process each feed through filter, embed, dedupe and store as soon as it is scraped"
+    )
+    fast: bool = Field(
+        False,
+        description="Build the digest without LLM calls (keyword topic names, extractive summaries)"
+    )
 
     @field_validator('sources')
     @classmethod
@@ -211,7 +243,9 @@ async def scrape_news(
             store=scrape_request.store,
             generate_pdf=scrape_request.generate_pdf,
             group_by_topic=scrape_request.group_by_topic,
-            enrich=scrape_request.enrich
+            enrich=scrape_request.enrich,
+            streaming=scrape_request.streaming,
+            fast=scrape_request.fast
         )
 
         return PipelineResponse(**result)
@@ -221,6 +255,59 @@ async def scrape_news(
         raise HTTPException(status_code=500, detail=get_safe_error_detail(e))
 
 
+@app.post("/scrape/stream")
+@limiter.limit("5/minute")
+async def scrape_news_stream(
+    request: Request,
+    scrape_request: ScrapeRequest,
+    _api_key: str = Depends(verify_api_key)
+):
+    """
+    Run the same pipeline as /scrape, streaming digest progress as NDJSON.
+
+    One JSON object per line, each with a "type":
+    - "text": summary or section text as it is generated ("part", "topic", "text")
+    - "executive_summary", "top_articles": finished digest parts
+    - "section": a finished topic section, with its markdown
+    - "result": the pipeline result (same fields as /scrape), last on success
+    - "error": the pipeline failed ("detail")
+
+    Requires X-API-Key header if API_KEY is configured.
+    """
+    logger.info(f"Received streaming scrape request: fast={scrape_request.fast}")
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def run_pipeline():
+        try:
+            result = await aggregator.run_full_pipeline(
+                sources=scrape_request.sources,
+                deduplicate=scrape_request.deduplicate,
+                store=scrape_request.store,
+                generate_pdf=scrape_request.generate_pdf,
+                group_by_topic=scrape_request.group_by_topic,
+                enrich=scrape_request.enrich,
+                streaming=scrape_request.streaming,
+                fast=scrape_request.fast,
+                on_event=events.put_nowait
+            )
+            events.put_nowait({"type": "result", **PipelineResponse(**result).model_dump()})
+        except Exception as e:
+            safe_log_error(logger, "Error in streaming scrape endpoint", e)
+            events.put_nowait({"type": "error", "detail": get_safe_error_detail(e)})
+        finally:
+            events.put_nowait(None)
+
+    task = asyncio.create_task(run_pipeline())
+    _background_runs.add(task)
+    task.add_done_callback(_background_runs.discard)
+
+    async def ndjson():
+        while (event := await events.get()) is not None:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @app.get("/articles", response_model=List[ArticleResponse])
 @limiter.limit("30/minute")
 async def get_articles(
@@ -237,7 +324,7 @@ async def get_articles(
         source: Filter by source name
     """
     try:
-        articles = storage.get_articles(limit=limit, source=source)
+        articles = await storage.get_articles(limit=limit, source=source)
         return articles
         
     except Exception as e:
@@ -347,7 +434,9 @@ async def n8n_webhook(
             store=webhook_request.store,
             generate_pdf=webhook_request.generate_pdf,
             group_by_topic=webhook_request.group_by_topic,
-            enrich=webhook_request.enrich
+            enrich=webhook_request.enrich,
+            streaming=webhook_request.streaming,
+            fast=webhook_request.fast
         )
 
         return PipelineResponse(**result)
@@ -9,11 +9,29 @@ class Settings(BaseSettings):
     
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""  # Empty for the OpenAI API; set to use a compatible server (e.g. src.mock_openai)
     embedding_model: str = "text-embedding-ada-002"
+    embedding_max_retries: int = 3
+    embedding_retry_base_delay: float = 1.0  # Seconds, doubled on each retry
+    llm_concurrency: int = 8  # Max chat completions in flight at once
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./output/llm_cache.sqlite"
+    llm_cache_max_entries: int = 5000  # Exact-match responses; least recently used are evicted beyond this
+    llm_semantic_cache_enabled: bool = True
+    llm_semantic_cache_threshold: float = 0.97  # Min similarity of article sets to reuse a response
+    llm_semantic_cache_max_age_hours: float = 48.0  # Staleness bound for reused responses
+    llm_semantic_cache_max_entries: int = 1000  # Separate limit; oldest semantic entries are evicted beyond this
+    llm_batch_state_path: str = "./output/llm_batch_job.json"  # Pending Batch API job, kept across restarts
+    llm_batch_poll_interval: float = 60.0  # Seconds between batch job status checks
+    llm_batch_wait_timeout: float = 3600.0  # Longest a resume waits for the job (seconds)
     
     # Supabase
     supabase_url: str = ""
     supabase_key: str = ""
+    url_lookup_chunk_size: int = 100  # URL hashes per existing-URL query
+    url_lookup_concurrency: int = 4  # Existing-URL queries in flight at once
+    known_urls_enabled: bool = True  # Answer existing-URL checks from a local record first
+    known_urls_path: str = "./output/known_urls.bin"
     
     # API
     api_host: str = "0.0.0.0"
@@ -26,9 +44,18 @@ class Settings(BaseSettings):
     request_timeout: int = 30
     max_retries: int = 3
     news_sources: str = ""
+    source_weights: str = ""  # Ranking weight per domain, e.g. "techcrunch.com:1.5,github.blog:0.8"
+    stream_queue_size: int = 4  # Max feed chunks buffered between streaming stages
     
     # Similarity
     similarity_threshold: float = 0.85
+    cluster_reassign_min_similarity: float = 0.75  # Orphans of small clusters join the nearest topic
+    
+    # Topics (persistent centroids reused across runs)
+    incremental_topics: bool = False
+    topic_store_path: str = "./output/topics.json"
+    topic_max_distance: float = 0.35  # Cosine distance to join a known topic
+    topic_half_life_days: float = 7.0  # Idle topics lose half their weight per period
     
     # Output
     output_dir: str = "./output"
@@ -52,6 +79,21 @@ class Settings(BaseSettings):
                 sources.append(s)
         return sources
 
+    def get_source_weights(self) -> dict[str, float]:
+        """Get per-domain ranking weights (domains not listed weigh 1.0)."""
+        weights = {}
+        for item in self.source_weights.split(","):
+            domain, _, weight = item.strip().rpartition(":")
+            domain = domain.strip().lower()
+            if domain.startswith("www."):
+                domain = domain[4:]
+            try:
+                if domain:
+                    weights[domain] = float(weight)
+            except ValueError:
+                continue
+        return weights
+
     def get_allowed_domains(self) -> set[str]:
         """Extract allowed domains from configured news sources.
 
@@ -3,8 +3,17 @@
 Module structure:
 - embeddings_service.py: Main embeddings service
 - clustering.py: Similarity-based grouping logic
+- similarity.py: Pairwise similarities shared by dedupe, clustering and ranking
 - content_generator.py: LLM content generation
 - prompts.py: Centralized prompt catalog
+- llm_cache.py: Persistent LLM response cache
+- batch_jobs.py: Offline enrichment through the OpenAI Batch API
+- token_budget.py: Token counting and prompt packing
+- ranking.py: Local article ranking for top picks
+- extractive.py: LLM-free cluster labels and extractive summaries
+- singleflight.py: Coalescing of concurrent identical API calls
+- streaming.py: Streamed LLM output and incremental JSON field decoding
+- topic_store.py: Persistent topic centroids for incremental clustering
 
 Basic usage:
     from src.embeddings import EmbeddingsService
@@ -23,7 +32,10 @@ from src.embeddings.clustering import (
     cosine_similarity,
     find_similar_articles,
 )
+from src.embeddings.batch_jobs import BatchJobStore, record_llm_requests
 from src.embeddings.content_generator import ContentGenerator
+from src.embeddings.llm_cache import LLMCache, bypass_llm_cache
+from src.embeddings.similarity import SimilarityIndex, top_k_similar
 
 __all__ = [
     # Main service
@@ -34,6 +46,12 @@ __all__ = [
     "cluster_articles",
     "cosine_similarity",
     "find_similar_articles",
+    "SimilarityIndex",
+    "top_k_similar",
     # Content generation
     "ContentGenerator",
+    "LLMCache",
+    "bypass_llm_cache",
+    "BatchJobStore",
+    "record_llm_requests",
 ]
@@ -0,0 +1,203 @@
+"""Offline LLM enrichment through the OpenAI Batch API.
+
+Digests that are not latency-sensitive can be enriched at batch prices and
+outside the rate limit shared with synchronous runs. Enrichment first runs
+in recording mode: every LLM request that misses the cache is captured
+instead of sent. The captured requests are submitted as one JSONL batch
+job and polled. Once the job completes, its results are written to the LLM
+cache under the same keys, so a normal enrichment pass afterwards is served
+from the cache.
+
+Job state is persisted between submission and completion, so a restart
+resumes polling instead of losing the batch.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from src.security import safe_log_error
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Statuses after which a batch job will not change any more
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# custom_id -> request body, set while requests are recorded instead of sent
+_recorder: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar(
+    "llm_batch_recorder", default=None
+)
+
+
+@contextmanager
+def record_llm_requests() -> Iterator[Dict[str, Dict[str, Any]]]:
+    """Capture LLM requests made inside the block instead of sending them.
+
+    Captured calls return None, like a failed call. Cached responses are
+    still returned, so only requests that need the API are recorded.
+
+    Yields:
+        Dictionary of custom_id -> request body, filled as calls are made
+    """
+    requests: Dict[str, Dict[str, Any]] = {}
+    token = _recorder.set(requests)
+    try:
+        yield requests
+    finally:
+        _recorder.reset(token)
+
+
+def recorded_requests() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Requests being recorded in the current context (None if not recording)."""
+    return _recorder.get()
+
+
+def batch_custom_id(config_key: str, key: str) -> str:
+    """Batch request id carrying the LLM_CONFIG key and the cache key."""
+    return f"{config_key}:{key}"
+
+
+def parse_custom_id(custom_id: str) -> Tuple[str, str]:
+    """Split a batch request id into (config_key, cache key)."""
+    config_key, _, key = custom_id.rpartition(":")
+    return config_key, key
+
+
+async def submit_batch(
+    client: AsyncOpenAI,
+    requests: Dict[str, Dict[str, Any]],
+    metadata: Optional[Dict[str, str]] = None
+) -> str:
+    """Upload recorded requests as JSONL and create a batch job.
+
+    Args:
+        client: OpenAI client (or one pointed at a compatible server)
+        requests: custom_id -> chat completion request body
+        metadata: Optional labels stored with the job
+
+    Returns:
+        Batch job id
+    """
+    lines = [
+        json.dumps({"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body})
+        for custom_id, body in requests.items()
+    ]
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+
+    input_file = await client.files.create(file=("llm_requests.jsonl", data), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+        metadata=metadata
+    )
+    logger.info(f"Submitted batch {batch.id} with {len(requests)} requests")
+    return batch.id
+
+
+async def wait_for_batch(
+    client: AsyncOpenAI,
+    batch_id: str,
+    poll_interval: float,
+    timeout: Optional[float] = None
+) -> Any:
+    """Poll a batch job until it reaches a terminal status.
+
+    Args:
+        client: OpenAI client
+        batch_id: Batch job id
+        poll_interval: Seconds between polls
+        timeout: Give up after this many seconds (None waits for the
+            job, 0 polls once)
+
+    Returns:
+        Latest batch object; its status may still be pending on timeout
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in BATCH_TERMINAL_STATUSES:
+            return batch
+        if deadline is not None and time.monotonic() + poll_interval > deadline:
+            logger.info(f"Batch {batch_id} is still {batch.status}")
+            return batch
+        await asyncio.sleep(poll_interval)
+
+
+async def download_batch_results(client: AsyncOpenAI, batch: Any) -> Dict[str, str]:
+    """Fetch the successful responses of a finished batch job.
+
+    Args:
+        client: OpenAI client
+        batch: Batch object (see wait_for_batch)
+
+    Returns:
+        Dictionary of custom_id -> response text (failed requests are left out)
+    """
+    if not batch.output_file_id:
+        return {}
+
+    content = await client.files.content(batch.output_file_id)
+    results = {}
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            text = response["body"]["choices"][0]["message"]["content"]
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+            continue
+        if text:
+            results[item["custom_id"]] = text.strip()
+
+    counts = getattr(batch, "request_counts", None)
+    total = getattr(counts, "total", None) or len(results)
+    logger.info(f"Batch {batch.id}: {len(results)}/{total} requests succeeded")
+    return results
+
+
+class BatchJobStore:
+    """Persisted state of the pending batch job, if any."""
+
+    def __init__(self, path: str):
+        """Initialize the store.
+
+        Args:
+            path: JSON file holding the job state
+        """
+        self.path = Path(path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Pending job state, or None if there is none (or it is unreadable)."""
+        if not self.path.exists():
+            return None
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            safe_log_error(logger, "Error loading batch job state", e)
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Write the job state to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Forget the job once its digest has been generated."""
+        self.path.unlink(missing_ok=True)
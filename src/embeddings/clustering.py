@@ -1,13 +1,27 @@
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
+from sklearn.cluster import AgglomerativeClustering, MiniBatchKMeans
 
 from src.security import safe_log_error
 
+if TYPE_CHECKING:
+    from src.embeddings.similarity import SimilarityIndex
+
 logger = logging.getLogger(__name__)
 
+# Exact agglomerative clustering needs O(n²) memory; above this size the
+# two-stage mini-batch k-means engine is used instead
+AGGLOMERATIVE_MAX_ARTICLES = 2000
+
+# Upper bound on micro-clusters built by the first stage for large inputs
+MAX_MICRO_CLUSTERS = 500
+
+# Minimum cosine similarity for moving an article from an undersized
+# cluster into the nearest large one
+REASSIGN_MIN_SIMILARITY = 0.75
+
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """Calculate cosine similarity between two vectors.
@@ -31,22 +45,139 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     return float(np.dot(a, b) / (norm_a * norm_b))
 
 
+def normalize_embeddings(embeddings: List[List[float]]) -> np.ndarray:
+    """Stack embeddings into an L2-normalized float32 matrix.
+    
+    Args:
+        embeddings: List of vectors
+        
+    Returns:
+        Matrix of shape (n, d) with unit-length rows (zero rows kept as zero)
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cluster_centroids(
+    vectors: np.ndarray,
+    labels: np.ndarray,
+    cluster_ids: np.ndarray
+) -> np.ndarray:
+    """Compute normalized centroids of several clusters at once.
+    
+    Args:
+        vectors: Normalized vectors, shape (n, d)
+        labels: Cluster label per vector
+        cluster_ids: Labels whose centroids are wanted
+        
+    Returns:
+        Matrix of shape (len(cluster_ids), d) aligned with cluster_ids
+    """
+    position = np.full(int(labels.max()) + 1, -1)
+    position[cluster_ids] = np.arange(len(cluster_ids))
+    member = position[labels] >= 0
+    
+    sums = np.zeros((len(cluster_ids), vectors.shape[1]), dtype=np.float32)
+    np.add.at(sums, position[labels[member]], vectors[member])
+    return normalize_embeddings(sums)
+
+
+def nearest_centroid(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    min_similarity: float
+) -> np.ndarray:
+    """Index of the most similar centroid per vector, -1 if below min_similarity."""
+    similarities = vectors @ centroids.T
+    best = np.argmax(similarities, axis=1)
+    best_similarity = similarities[np.arange(len(vectors)), best]
+    return np.where(best_similarity >= min_similarity, best, -1)
+
+
+def _agglomerative_labels(
+    vectors: np.ndarray,
+    n_clusters: Optional[int],
+    distance_threshold: float,
+    distances: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Exact cosine/average-linkage clustering (O(n²) memory).
+    
+    If a precomputed cosine distance matrix is given it is used instead
+    of recomputing distances from the vectors.
+    """
+    metric = 'precomputed' if distances is not None else 'cosine'
+    if n_clusters is not None:
+        clusterer = AgglomerativeClustering(
+            n_clusters=min(n_clusters, len(vectors)),
+            metric=metric,
+            linkage='average'
+        )
+    else:
+        clusterer = AgglomerativeClustering(
+            n_clusters=None,
+            distance_threshold=distance_threshold,
+            metric=metric,
+            linkage='average'
+        )
+    return clusterer.fit_predict(distances if distances is not None else vectors)
+
+
+def _minibatch_labels(
+    vectors: np.ndarray,
+    n_clusters: Optional[int],
+    distance_threshold: float
+) -> np.ndarray:
+    """Two-stage clustering for large inputs.
+    
+    Mini-batch k-means first over-partitions the normalized vectors into
+    micro-clusters (k-means on unit vectors approximates cosine distance),
+    then the micro-centroids are merged with the same agglomerative rules as
+    the exact path. Memory is O(n·d + m²) for m micro-clusters instead of O(n²).
+    """
+    n = len(vectors)
+    n_micro = int(min(n, MAX_MICRO_CLUSTERS, max(4 * np.sqrt(n), n_clusters or 0)))
+    
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_micro,
+        batch_size=1024,
+        n_init=1,
+        random_state=0
+    )
+    micro_labels = kmeans.fit_predict(vectors)
+    
+    centroids = normalize_embeddings(kmeans.cluster_centers_)
+    centroid_labels = _agglomerative_labels(centroids, n_clusters, distance_threshold)
+    return centroid_labels[micro_labels]
+
+
 def cluster_articles(
     articles: List[Dict[str, Any]],
     n_clusters: Optional[int] = None,
     distance_threshold: float = 0.5,
-    min_cluster_size: int = 2
+    min_cluster_size: int = 2,
+    method: str = "auto",
+    similarity: Optional["SimilarityIndex"] = None,
+    reassign_min_similarity: Optional[float] = REASSIGN_MIN_SIMILARITY
 ) -> List[Tuple[int, List[Dict[str, Any]]]]:
     """Group articles by embedding similarity.
     
-    Uses AgglomerativeClustering to create hierarchical groups
-    of similar articles.
+    Small inputs use exact AgglomerativeClustering (cosine distance,
+    average linkage). Inputs above AGGLOMERATIVE_MAX_ARTICLES use a
+    two-stage mini-batch k-means engine with the same output.
     
     Args:
         articles: List of articles with 'embedding' field
         n_clusters: Fixed number of clusters (None for automatic)
         distance_threshold: Distance threshold for automatic clustering
         min_cluster_size: Minimum cluster size to be included
+        method: 'auto', 'agglomerative' or 'minibatch'
+        similarity: Optional SimilarityIndex aligned with articles, reused
+            instead of recomputing normalized vectors and distances
+        reassign_min_similarity: Articles from clusters below min_cluster_size
+            join the nearest kept cluster centroid if at least this similar;
+            the rest are dropped (None drops them all)
         
     Returns:
         List of tuples (cluster_id, articles_in_cluster)
@@ -67,34 +198,53 @@ def cluster_articles(
         return []
     
     try:
-        # Create embeddings matrix
-        embeddings = np.array([a['embedding'] for a in articles_with_embeddings])
-        
-        # Configure clustering
-        if n_clusters is not None:
-            # Fixed number of clusters
-            n_clusters = min(n_clusters, len(articles_with_embeddings))
-            clusterer = AgglomerativeClustering(
-                n_clusters=n_clusters,
-                metric='cosine',
-                linkage='average'
-            )
+        # Reuse the run's similarity structure when it covers these articles
+        if similarity is not None:
+            similarity = similarity.aligned(articles_with_embeddings)
+        
+        # Create normalized float32 embeddings matrix
+        if similarity is not None:
+            embeddings = similarity.vectors
         else:
-            # Automatic distance-based clustering
-            clusterer = AgglomerativeClustering(
-                n_clusters=None,
-                distance_threshold=distance_threshold,
-                metric='cosine',
-                linkage='average'
+            embeddings = normalize_embeddings([a['embedding'] for a in articles_with_embeddings])
+        
+        if method == "auto":
+            method = (
+                "agglomerative"
+                if len(embeddings) <= AGGLOMERATIVE_MAX_ARTICLES
+                else "minibatch"
             )
         
         # Run clustering
-        labels = clusterer.fit_predict(embeddings)
+        if method == "agglomerative":
+            distances = (
+                similarity.distance_matrix()
+                if similarity is not None and similarity.is_dense
+                else None
+            )
+            labels = _agglomerative_labels(embeddings, n_clusters, distance_threshold, distances)
+        elif method == "minibatch":
+            labels = _minibatch_labels(embeddings, n_clusters, distance_threshold)
+        else:
+            raise ValueError(f"Unknown clustering method: {method}")
+        
+        # Move members of undersized clusters to the nearest kept centroid
+        labels = np.asarray(labels)
+        sizes = np.bincount(labels)
+        kept_ids = np.flatnonzero(sizes >= min_cluster_size)
+        orphaned = sizes[labels] < min_cluster_size
+        if reassign_min_similarity is not None and len(kept_ids) and orphaned.any():
+            centroids = cluster_centroids(embeddings, labels, kept_ids)
+            target = nearest_centroid(embeddings[orphaned], centroids, reassign_min_similarity)
+            labels = labels.copy()
+            labels[orphaned] = np.where(target >= 0, kept_ids[target], -1)
         
         # Group articles by cluster
         clusters: Dict[int, List[Dict[str, Any]]] = {}
         for article, label in zip(articles_with_embeddings, labels):
             label = int(label)
+            if label < 0:
+                continue
             if label not in clusters:
                 clusters[label] = []
             clusters[label].append(article)
@@ -111,7 +261,7 @@ def cluster_articles(
         
         logger.info(
             f"Clustered {len(articles_with_embeddings)} articles into "
-            f"{len(result)} clusters"
+            f"{len(result)} clusters ({method})"
         )
         
         return result
@@ -142,32 +292,56 @@ def find_similar_articles(
     if not articles or not target_embedding:
         return []
     
-    similarities = []
+    # Imported here: similarity.py builds on this module
+    from src.embeddings.similarity import top_k_similar
     
-    for article in articles:
-        embedding = article.get('embedding')
-        if embedding is None:
-            continue
-        
-        sim = cosine_similarity(target_embedding, embedding)
-        if sim >= min_similarity:
-            similarities.append((article, sim))
+    candidates = [a for a in articles if a.get('embedding') is not None]
+    if not candidates:
+        return []
     
-    # Ordenar por similitud descendente
-    similarities.sort(key=lambda x: x[1], reverse=True)
+    indices, scores = top_k_similar(
+        [target_embedding],
+        [a['embedding'] for a in candidates],
+        k=top_k,
+        min_similarity=min_similarity
+    )
     
-    return similarities[:top_k]
+    return [
+        (candidates[idx], float(score))
+        for idx, score in zip(indices[0], scores[0])
+        if idx >= 0
+    ]
+
+
+def _normalized_vectors(
+    articles: List[Dict[str, Any]],
+    similarity: Optional["SimilarityIndex"] = None
+) -> np.ndarray:
+    """Normalized embeddings of articles, from the similarity index if it covers them."""
+    aligned = similarity.aligned(articles) if similarity is not None else None
+    if aligned is not None:
+        return aligned.vectors
+    return normalize_embeddings([a['embedding'] for a in articles])
 
 
 def merge_small_clusters(
     clusters: List[Tuple[int, List[Dict[str, Any]]]],
-    min_size: int = 3
+    min_size: int = 3,
+    min_similarity: float = REASSIGN_MIN_SIMILARITY,
+    similarity: Optional["SimilarityIndex"] = None
 ) -> List[Tuple[int, List[Dict[str, Any]]]]:
-    """Merge small clusters into 'Other' or with the most similar cluster.
+    """Merge small clusters into the most similar large cluster or 'Other'.
+    
+    Centroids of all large clusters are computed at once. Each article of
+    a small cluster joins the nearest centroid if their similarity reaches
+    min_similarity; only the true outliers go to 'Other'.
     
     Args:
         clusters: List of clusters (id, articles)
         min_size: Minimum size to keep cluster separate
+        min_similarity: Minimum cosine similarity to join a large cluster
+        similarity: The run's SimilarityIndex, whose normalized vectors are
+            reused for the articles it covers
         
     Returns:
         List of clusters with small ones merged
@@ -177,14 +351,42 @@ def merge_small_clusters(
     
     for cluster_id, articles in clusters:
         if len(articles) >= min_size:
-            large_clusters.append((cluster_id, articles))
+            large_clusters.append((cluster_id, list(articles)))
         else:
             small_articles.extend(articles)
     
-    if small_articles:
-        # Add "Other" cluster with small articles
+    orphans = [a for a in small_articles if a.get('embedding') is not None]
+    outliers = [a for a in small_articles if a.get('embedding') is None]
+    
+    if orphans and large_clusters:
+        members = [
+            (position, article)
+            for position, (_, articles) in enumerate(large_clusters)
+            for article in articles
+            if article.get('embedding') is not None
+        ]
+        if members:
+            labels = np.array([position for position, _ in members])
+            vectors = _normalized_vectors([article for _, article in members], similarity)
+            present = np.unique(labels)
+            centroids = cluster_centroids(vectors, labels, present)
+            
+            orphan_vectors = _normalized_vectors(orphans, similarity)
+            target = nearest_centroid(orphan_vectors, centroids, min_similarity)
+            for article, idx in zip(orphans, target):
+                if idx >= 0:
+                    large_clusters[present[idx]][1].append(article)
+                else:
+                    outliers.append(article)
+        else:
+            outliers.extend(orphans)
+    else:
+        outliers.extend(orphans)
+    
+    if outliers:
+        # Add "Other" cluster with the articles no large cluster could take
         other_id = max(c[0] for c in large_clusters) + 1 if large_clusters else 0
-        large_clusters.append((other_id, small_articles))
+        large_clusters.append((other_id, outliers))
     
     return large_clusters
 
@@ -208,3 +410,26 @@ def get_cluster_centroid(articles: List[Dict[str, Any]]) -> Optional[List[float]
     
     centroid = np.mean(embeddings, axis=0)
     return centroid.tolist()
+
+
+def order_by_centrality(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order articles from most to least representative of the group.
+    
+    Ranks by similarity to the centroid of the group's embeddings.
+    Articles without embeddings keep their order, after the others.
+    
+    Args:
+        articles: Articles in the group
+        
+    Returns:
+        The same articles, most central first
+    """
+    embedded = [a for a in articles if a.get("embedding") is not None]
+    if len(embedded) < 2:
+        return list(articles)
+    
+    vectors = normalize_embeddings([a["embedding"] for a in embedded])
+    centroid = normalize_embeddings([vectors.mean(axis=0)])[0]
+    order = np.argsort(-(vectors @ centroid), kind="stable")
+    ranked = [embedded[i] for i in order]
+    return ranked + [a for a in articles if a.get("embedding") is None]
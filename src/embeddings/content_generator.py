@@ -7,34 +7,66 @@ for grouped articles using OpenAI.
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from src.config import settings
+from src.embeddings.batch_jobs import (
+    batch_custom_id,
+    parse_custom_id,
+    record_llm_requests,
+    recorded_requests,
+)
+from src.embeddings.clustering import normalize_embeddings, order_by_centrality
+from src.embeddings.extractive import keyword_labels, plain_text
+from src.embeddings.llm_cache import LLMCache
+from src.embeddings.ranking import rank_articles
+from src.embeddings.similarity import SimilarityIndex
+from src.embeddings.singleflight import SingleFlight, flight_key
+from src.embeddings.streaming import EventCallback, JsonFieldStream, TextCallback
+from src.embeddings.token_budget import (
+    SUMMARY_MAX_TOKENS,
+    TITLE_MAX_TOKENS,
+    count_tokens,
+    pack_items,
+    truncate_to_tokens,
+)
 from src.embeddings.prompts import (
     CLUSTER_NAME_SYSTEM,
     EXECUTIVE_SUMMARY_SYSTEM,
     SECTION_BRIEF_SYSTEM,
+    SECTION_ENRICHMENT_SYSTEM,
     SECTION_NARRATIVE_SYSTEM,
+    TLDR_BATCH_SYSTEM,
     TOP_ARTICLES_SYSTEM,
     LLM_CONFIG,
     cluster_name_prompt,
     executive_summary_prompt,
     section_brief_prompt,
+    section_enrichment_prompt,
     section_narrative_prompt,
+    tldr_batch_prompt,
     top_articles_prompt,
 )
 from src.security import (
     safe_llm_input,
     safe_log_error,
-    sanitize_article_data,
-    prepare_articles_for_llm,
+    sanitized_view,
 )
 
 logger = logging.getLogger(__name__)
 
+# Locally ranked candidates shown to the LLM for top-article selection
+TOP_ARTICLES_SHORTLIST = 20
+
+# Articles summarized per TL;DR request
+TLDR_BATCH_SIZE = 10
+
+# Shared by all generator instances so concurrent pipeline runs coalesce
+_flights = SingleFlight()
+
 
 class ContentGenerator:
     """Generates narrative content using LLM for grouped articles."""
@@ -46,13 +78,26 @@ class ContentGenerator:
             openai_api_key: OpenAI API key (optional, uses settings by default)
         """
         self.api_key = openai_api_key or settings.openai_api_key
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=settings.openai_base_url or None)
+        # Caps in-flight completions so fan-out stays under API rate limits
+        self._semaphore = asyncio.Semaphore(settings.llm_concurrency)
+        # config_key -> calls and prompt/completion tokens spent
+        self.token_usage: Dict[str, Dict[str, int]] = {}
+        self.cache: Optional[LLMCache] = None
+        if settings.llm_cache_enabled:
+            self.cache = LLMCache(
+                settings.llm_cache_path,
+                settings.llm_cache_max_entries,
+                settings.llm_semantic_cache_max_entries
+            )
     
-    def _call_llm(
+    async def _call_llm(
         self,
         system_prompt: str,
         user_prompt: str,
-        config_key: str
+        config_key: str,
+        input_embedding: Optional[np.ndarray] = None,
+        on_text: Optional[TextCallback] = None
     ) -> Optional[str]:
         """Call the LLM with specified configuration.
         
@@ -60,72 +105,254 @@ class ContentGenerator:
             system_prompt: System prompt
             user_prompt: User prompt
             config_key: Configuration key in LLM_CONFIG
+            input_embedding: Unit-length embedding of the prompt input, used
+                by the semantic cache for prompts that enable it
+            on_text: Receives the response text as it is generated; the
+                completion is streamed. Cached and shared responses arrive
+                in one piece.
             
         Returns:
             LLM response or None on error
         """
         config = LLM_CONFIG.get(config_key, {})
         
-        try:
-            kwargs = {
-                "model": config.get("model", "gpt-4o-mini"),
-                "max_tokens": config.get("max_tokens", 100),
-                "temperature": config.get("temperature", 0.4),
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-            }
+        kwargs = {
+            "model": config.get("model", "gpt-4o-mini"),
+            "max_tokens": config.get("max_tokens", 100),
+            "temperature": config.get("temperature", 0.4),
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+        }
+        
+        # Add response_format if configured
+        if "response_format" in config:
+            kwargs["response_format"] = config["response_format"]
+        
+        # Covers model, temperature, max_tokens, response_format and both prompts
+        key = flight_key(kwargs["model"], {k: v for k, v in kwargs.items() if k != "model"})
+        
+        ttl = config.get("cache_ttl", 0)
+        use_cache = self.cache is not None and ttl > 0
+        use_semantic = (
+            use_cache
+            and input_embedding is not None
+            and config.get("semantic_cache", False)
+            and settings.llm_semantic_cache_enabled
+        )
+        # Everything but the user prompt: reuse only across identical prompt
+        # setups, and input vectors from the same embedding model
+        variant = flight_key(kwargs["model"], {
+            **{k: v for k, v in kwargs.items() if k not in ("model", "messages")},
+            "system": system_prompt,
+            "embedding_model": settings.embedding_model,
+        })
+        
+        if use_cache:
+            try:
+                cached = await self.cache.aget(key, ttl)
+                if cached is None and use_semantic:
+                    cached = await self.cache.aget_similar(
+                        config_key,
+                        variant,
+                        input_embedding,
+                        settings.llm_semantic_cache_threshold,
+                        min(ttl, settings.llm_semantic_cache_max_age_hours * 3600)
+                    )
+                if cached is not None:
+                    if on_text is not None:
+                        on_text(cached)
+                    return cached
+            except Exception as e:
+                safe_log_error(logger, "LLM cache lookup failed", e)
+        
+        # Batch mode: capture the request for a batch job instead of sending it
+        recorded = recorded_requests()
+        if recorded is not None:
+            recorded[batch_custom_id(config_key, key)] = kwargs
+            return None
+        
+        streamed = False
+        
+        async def call() -> Optional[str]:
+            nonlocal streamed
+            try:
+                async with self._semaphore:
+                    if on_text is None:
+                        response = await self.client.chat.completions.create(**kwargs)
+                        content = response.choices[0].message.content.strip()
+                    else:
+                        streamed = True
+                        content, response = await self._stream_completion(kwargs, on_text)
+            except Exception as e:
+                safe_log_error(logger, f"LLM call failed ({config_key})", e)
+                return None
             
-            # Add response_format if configured
-            if "response_format" in config:
-                kwargs["response_format"] = config["response_format"]
+            self._record_usage(config_key, kwargs["model"], system_prompt + user_prompt, content, response)
             
-            response = self.client.chat.completions.create(**kwargs)
-            return response.choices[0].message.content.strip()
+            if use_cache:
+                try:
+                    await self.cache.aset(key, config_key, content)
+                    if use_semantic:
+                        await self.cache.aset_similar(config_key, variant, input_embedding, content)
+                except Exception as e:
+                    safe_log_error(logger, "LLM cache write failed", e)
+            return content
+        
+        # Identical concurrent requests share one completion
+        content = await _flights.run(key, call)
+        if on_text is not None and not streamed and content:
+            # Another caller streamed this completion
+            on_text(content)
+        return content
+    
+    async def _stream_completion(
+        self,
+        kwargs: Dict[str, Any],
+        on_text: TextCallback
+    ) -> Tuple[str, Any]:
+        """Run a chat completion as a stream, forwarding text as it arrives.
+        
+        Args:
+            kwargs: Chat completion request
+            on_text: Receives each chunk of generated text
             
-        except Exception as e:
-            safe_log_error(logger, f"LLM call failed ({config_key})", e)
+        Returns:
+            Tuple of (full response text, final chunk carrying token usage)
+        """
+        stream = await self.client.chat.completions.create(
+            **kwargs,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        parts = []
+        usage_chunk = None
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage_chunk = chunk
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                parts.append(text)
+                on_text(text)
+        return "".join(parts).strip(), usage_chunk
+    
+    def _record_usage(
+        self,
+        config_key: str,
+        model: str,
+        prompt: str,
+        content: str,
+        response: Any
+    ) -> None:
+        """Log and accumulate the tokens spent by one call.
+        
+        Uses the usage reported by the API, counting locally when it is
+        missing (e.g. from OpenAI-compatible servers that omit it).
+        """
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(prompt_tokens, int):
+            prompt_tokens = count_tokens(prompt, model)
+        if not isinstance(completion_tokens, int):
+            completion_tokens = count_tokens(content, model)
+        
+        totals = self.token_usage.setdefault(
+            config_key,
+            {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        )
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        logger.info(f"LLM call {config_key}: {prompt_tokens} prompt + {completion_tokens} completion tokens")
+    
+    @staticmethod
+    def _input_budget(config_key: str) -> int:
+        """Token budget for the articles packed into a prompt."""
+        return LLM_CONFIG.get(config_key, {}).get("input_tokens", 1000)
+    
+    @staticmethod
+    def _model(config_key: str) -> str:
+        """Model configured for a prompt."""
+        return LLM_CONFIG.get(config_key, {}).get("model", "gpt-4o-mini")
+    
+    @staticmethod
+    def _safe_title(article: Dict[str, Any], model: str) -> str:
+        """Sanitized article title capped at TITLE_MAX_TOKENS."""
+        title = sanitized_view(article).get('title', '')
+        return truncate_to_tokens(title, TITLE_MAX_TOKENS, model)
+    
+    def _pack_titles(
+        self,
+        articles: List[Dict[str, Any]],
+        config_key: str,
+        prefix: str = "- "
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Titles that fit the prompt's budget, most representative first.
+        
+        Returns:
+            Tuple of (included articles, formatted title lines)
+        """
+        model = self._model(config_key)
+        ranked = order_by_centrality(articles)
+        items = [f"{prefix}{self._safe_title(a, model)}" for a in ranked]
+        packed = pack_items(items, self._input_budget(config_key), model)
+        return ranked[:len(packed)], packed
+    
+    @staticmethod
+    def _input_embedding(articles: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Embed a prompt's articles as the centroid of their embeddings.
+        
+        Reuses the article embeddings computed by the pipeline, so the
+        semantic cache needs no extra API call.
+        
+        Args:
+            articles: Articles included in the prompt
+            
+        Returns:
+            Unit-length centroid, or None if no article has an embedding
+        """
+        embeddings = [a["embedding"] for a in articles if a.get("embedding") is not None]
+        if not embeddings:
             return None
+        return normalize_embeddings([normalize_embeddings(embeddings).mean(axis=0)])[0]
     
-    def generate_cluster_name(self, articles: List[Dict[str, Any]]) -> str:
+    async def generate_cluster_name(self, articles: List[Dict[str, Any]]) -> str:
         """Generate a descriptive name for a cluster of articles.
         
         Args:
             articles: List of articles in the cluster
             
         Returns:
-            Cluster name (2-4 words)
+            Cluster name (2-4 words); title keywords if the LLM gives none
         """
         if not articles:
             return "General News"
         
-        # Sanitize and prepare titles
-        titles = []
-        for article in articles[:10]:  # Limitar para no exceder contexto
-            safe_article = sanitize_article_data(article)
-            title = safe_article.get('title', '')[:100]
-            titles.append(f"- {title}")
-        
-        titles_text = "\n".join(titles)
-        user_prompt = cluster_name_prompt(titles_text)
+        # Most representative titles that fit the budget
+        included, titles = self._pack_titles(articles, "cluster_name")
+        user_prompt = cluster_name_prompt("\n".join(titles))
         
-        result = self._call_llm(
+        result = await self._call_llm(
             CLUSTER_NAME_SYSTEM,
             user_prompt,
-            "cluster_name"
+            "cluster_name",
+            self._input_embedding(included)
         )
         
-        return result or "General News"
+        return result or keyword_labels([articles])[0]
     
-    def generate_executive_summary(
+    async def generate_executive_summary(
         self,
-        grouped_articles: Dict[str, List[Dict[str, Any]]]
+        grouped_articles: Dict[str, List[Dict[str, Any]]],
+        on_text: Optional[TextCallback] = None
     ) -> Optional[str]:
         """Generate executive summary of the day.
         
         Args:
             grouped_articles: Articles grouped by topic
+            on_text: Receives the summary text as it is generated
             
         Returns:
             Executive summary in bullet point format
@@ -133,39 +360,58 @@ class ContentGenerator:
         if not grouped_articles:
             return None
         
-        # Preparar input con temas y conteos
+        model = self._model("executive_summary")
+        
+        # Topics with counts and their most representative titles; larger
+        # topics first so they survive packing
         summary_parts = []
-        for topic, articles in list(grouped_articles.items())[:10]:
+        topics = sorted(grouped_articles.items(), key=lambda item: len(item[1]), reverse=True)
+        for topic, articles in topics:
             safe_topic = safe_llm_input(topic, "topic")
-            sample_titles = []
-            for article in articles[:3]:
-                safe_article = sanitize_article_data(article)
-                sample_titles.append(safe_article.get('title', '')[:80])
+            sample_titles = [
+                self._safe_title(article, model)
+                for article in order_by_centrality(articles)[:3]
+            ]
             
             summary_parts.append(
                 f"**{safe_topic}** ({len(articles)} articles):\n" +
                 "\n".join(f"  - {t}" for t in sample_titles)
             )
         
+        summary_parts = pack_items(
+            summary_parts,
+            self._input_budget("executive_summary"),
+            model,
+            separator="\n\n"
+        )
         summary_input = "\n\n".join(summary_parts)
         user_prompt = executive_summary_prompt(summary_input)
         
-        return self._call_llm(
+        return await self._call_llm(
             EXECUTIVE_SUMMARY_SYSTEM,
             user_prompt,
-            "executive_summary"
+            "executive_summary",
+            on_text=on_text
         )
     
-    def select_top_articles(
+    async def select_top_articles(
         self,
         articles: List[Dict[str, Any]],
-        count: int = 3
+        count: int = 3,
+        topics: Optional[List[int]] = None,
+        similarity: Optional[SimilarityIndex] = None
     ) -> List[Dict[str, Any]]:
         """Select the most important articles.
         
+        A local ranking (see ranking.py) shortlists candidates from every
+        topic; the LLM picks from the shortlist. If the LLM gives no usable
+        answer, the top of the local ranking is returned instead.
+        
         Args:
             articles: List of candidate articles
             count: Number of articles to select
+            topics: Topic label per article, for centrality within its topic
+            similarity: The run's SimilarityIndex, reused by the ranking
             
         Returns:
             List of selected articles with selection reason
@@ -173,24 +419,27 @@ class ContentGenerator:
         if len(articles) <= count:
             return articles
         
-        # Prepare numbered list of titles
-        titles = []
-        for i, article in enumerate(articles[:20], 1):
-            safe_article = sanitize_article_data(article)
-            title = safe_article.get('title', '')[:100]
-            titles.append(f"{i}. {title}")
+        shortlist = rank_articles(articles, TOP_ARTICLES_SHORTLIST, topics, similarity=similarity)
+        
+        # Numbered titles; packing keeps a prefix so numbers map to positions
+        model = self._model("top_articles")
+        titles = [
+            f"{i}. {self._safe_title(article, model)}"
+            for i, article in enumerate(shortlist, 1)
+        ]
+        titles = pack_items(titles, self._input_budget("top_articles"), model)
         
         titles_text = "\n".join(titles)
         user_prompt = top_articles_prompt(titles_text)
         
-        result = self._call_llm(
+        result = await self._call_llm(
             TOP_ARTICLES_SYSTEM,
             user_prompt,
             "top_articles"
         )
         
         if not result:
-            return articles[:count]
+            return shortlist[:count]
         
         try:
             parsed = json.loads(result)
@@ -199,27 +448,29 @@ class ContentGenerator:
             selected = []
             for sel in selections[:count]:
                 idx = sel.get("index", 1) - 1
-                if 0 <= idx < len(articles):
-                    article = articles[idx].copy()
+                if 0 <= idx < len(titles):
+                    article = shortlist[idx].copy()
                     article["selection_reason"] = sel.get("reason", "")
                     selected.append(article)
             
-            return selected if selected else articles[:count]
+            return selected if selected else shortlist[:count]
             
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, AttributeError, TypeError):
             logger.warning("Failed to parse top articles JSON response")
-            return articles[:count]
+            return shortlist[:count]
     
-    def generate_section_brief(
+    async def generate_section_brief(
         self,
         topic: str,
-        articles: List[Dict[str, Any]]
+        articles: List[Dict[str, Any]],
+        on_text: Optional[TextCallback] = None
     ) -> Optional[str]:
         """Generate a short brief for a section.
         
         Args:
             topic: Topic/section name
             articles: Articles in the section
+            on_text: Receives the brief as it is generated
             
         Returns:
             Brief of 2-3 sentences
@@ -229,30 +480,29 @@ class ContentGenerator:
         
         safe_topic = safe_llm_input(topic, "topic")
         
-        titles = []
-        for article in articles[:5]:
-            safe_article = sanitize_article_data(article)
-            titles.append(f"- {safe_article.get('title', '')[:100]}")
-        
-        titles_text = "\n".join(titles)
-        user_prompt = section_brief_prompt(safe_topic, titles_text)
+        included, titles = self._pack_titles(articles, "section_brief")
+        user_prompt = section_brief_prompt(safe_topic, "\n".join(titles))
         
-        return self._call_llm(
+        return await self._call_llm(
             SECTION_BRIEF_SYSTEM,
             user_prompt,
-            "section_brief"
+            "section_brief",
+            self._input_embedding(included),
+            on_text
         )
     
-    def generate_section_narrative(
+    async def generate_section_narrative(
         self,
         topic: str,
-        articles: List[Dict[str, Any]]
+        articles: List[Dict[str, Any]],
+        on_text: Optional[TextCallback] = None
     ) -> Optional[str]:
         """Generate a podcast narrative for a section.
         
         Args:
             topic: Topic name
             articles: Articles in the section
+            on_text: Receives the narrative as it is generated
             
         Returns:
             Narrative of 2-4 paragraphs
@@ -261,60 +511,377 @@ class ContentGenerator:
             return None
         
         safe_topic = safe_llm_input(topic, "topic")
+        included, articles_input = self._section_articles_input(articles, "section_narrative")
+        user_prompt = section_narrative_prompt(safe_topic, articles_input)
+        
+        return await self._call_llm(
+            SECTION_NARRATIVE_SYSTEM,
+            user_prompt,
+            "section_narrative",
+            self._input_embedding(included),
+            on_text
+        )
+    
+    def _section_articles_input(
+        self,
+        articles: List[Dict[str, Any]],
+        config_key: str
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """Format the section articles that fit the budget with title and summary.
         
-        # Prepare articles with title and summary
+        The summary is the article's plain-text content, capped at
+        SUMMARY_MAX_TOKENS.
+        
+        Returns:
+            Tuple of (included articles, formatted input)
+        """
+        model = self._model(config_key)
+        ranked = order_by_centrality(articles)
         articles_parts = []
-        for article in articles[:5]:
-            safe_article = sanitize_article_data(article)
-            title = safe_article.get('title', '')[:150]
-            summary = safe_article.get('summary', '')[:300]
+        for article in ranked:
+            safe_article = sanitized_view(article)
+            title = truncate_to_tokens(safe_article.get('title', ''), TITLE_MAX_TOKENS, model)
+            summary = truncate_to_tokens(plain_text(safe_article.get('content', '')), SUMMARY_MAX_TOKENS, model)
             articles_parts.append(f"**{title}**\n{summary}")
         
-        articles_input = "\n\n".join(articles_parts)
-        user_prompt = section_narrative_prompt(safe_topic, articles_input)
+        articles_parts = pack_items(
+            articles_parts,
+            self._input_budget(config_key),
+            model,
+            separator="\n\n"
+        )
+        return ranked[:len(articles_parts)], "\n\n".join(articles_parts)
+    
+    async def generate_section_enrichment(
+        self,
+        topic: str,
+        articles: List[Dict[str, Any]],
+        on_text: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[str, Optional[str]]:
+        """Generate a section's brief and narrative in one call.
         
-        return self._call_llm(
-            SECTION_NARRATIVE_SYSTEM,
+        Falls back to the separate brief and narrative calls if the
+        combined response is missing or does not validate.
+        
+        Args:
+            topic: Topic name
+            articles: Articles in the section
+            on_text: Receives (field, text) as the brief and narrative are
+                generated; the JSON response is decoded while it streams
+            
+        Returns:
+            Dictionary with 'brief' and 'narrative'
+        """
+        if not articles:
+            return {"brief": None, "narrative": None}
+        
+        safe_topic = safe_llm_input(topic, "topic")
+        included, articles_input = self._section_articles_input(articles, "section_enrichment")
+        user_prompt = section_enrichment_prompt(safe_topic, articles_input)
+        
+        on_json = None
+        if on_text is not None:
+            fields = JsonFieldStream(("brief", "narrative"))
+            
+            def on_json(chunk: str) -> None:
+                for field, text in fields.feed(chunk):
+                    on_text(field, text)
+        
+        result = await self._call_llm(
+            SECTION_ENRICHMENT_SYSTEM,
             user_prompt,
-            "section_narrative"
+            "section_enrichment",
+            self._input_embedding(included),
+            on_json
+        )
+        
+        if result:
+            try:
+                parsed = json.loads(result)
+                brief, narrative = parsed.get("brief"), parsed.get("narrative")
+                if (
+                    isinstance(brief, str) and brief.strip()
+                    and isinstance(narrative, str) and narrative.strip()
+                ):
+                    return {"brief": brief.strip(), "narrative": narrative.strip()}
+            except (json.JSONDecodeError, AttributeError):
+                pass
+        
+        if recorded_requests() is not None:
+            # Only the combined request goes into a batch job
+            return {"brief": None, "narrative": None}
+        
+        logger.warning("Invalid section enrichment response, falling back to separate calls")
+        brief, narrative = await asyncio.gather(
+            self.generate_section_brief(topic, articles, self._field_callback(on_text, "brief")),
+            self.generate_section_narrative(topic, articles, self._field_callback(on_text, "narrative"))
+        )
+        return {"brief": brief, "narrative": narrative}
+    
+    @staticmethod
+    def _field_callback(
+        on_text: Optional[Callable[[str, str], None]],
+        field: str
+    ) -> Optional[TextCallback]:
+        """Text callback that tags its chunks with a field name."""
+        if on_text is None:
+            return None
+        return lambda text: on_text(field, text)
+    
+    @staticmethod
+    def _tldr_input(article: Dict[str, Any], model: str, max_tokens: int) -> str:
+        """Title and plain-text content of an article, capped for a TL;DR batch."""
+        safe_article = sanitized_view(article)
+        title = truncate_to_tokens(safe_article.get('title', ''), TITLE_MAX_TOKENS, model)
+        # RSS content is often HTML; tags only waste the budget
+        content = plain_text(safe_article.get('content', ''))
+        return truncate_to_tokens(f"{title}\n{content}", max_tokens, model)
+    
+    async def _generate_tldr_batch(self, inputs: List[str]) -> List[Optional[str]]:
+        """Summarize one batch of articles in a single JSON request.
+        
+        Args:
+            inputs: Article inputs (see _tldr_input)
+            
+        Returns:
+            TL;DR per input, mapped back by index (None where missing)
+        """
+        articles_input = "\n\n".join(f"{i}. {text}" for i, text in enumerate(inputs, 1))
+        result = await self._call_llm(
+            TLDR_BATCH_SYSTEM,
+            tldr_batch_prompt(articles_input),
+            "tldr_batch"
+        )
+        
+        tldrs: List[Optional[str]] = [None] * len(inputs)
+        if not result:
+            return tldrs
+        
+        try:
+            for entry in json.loads(result).get("summaries", []):
+                idx = entry.get("index")
+                tldr = entry.get("tldr")
+                if isinstance(idx, int) and 1 <= idx <= len(inputs) and isinstance(tldr, str) and tldr.strip():
+                    tldrs[idx - 1] = tldr.strip()
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            logger.warning("Failed to parse TL;DR batch JSON response")
+        return tldrs
+    
+    async def generate_tldrs(self, articles: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Generate a one or two sentence TL;DR for each article.
+        
+        Articles are packed TLDR_BATCH_SIZE per JSON request, and batches run
+        concurrently under the LLM semaphore. Results are cached per article
+        by content hash, so an article is summarized once however many runs
+        include it; articles with identical content share one TL;DR.
+        
+        Args:
+            articles: Articles with 'title' and 'content'
+            
+        Returns:
+            TL;DR per article in input order (None where generation failed)
+        """
+        if not articles:
+            return []
+        
+        config = LLM_CONFIG["tldr_batch"]
+        model = config["model"]
+        ttl = config["article_cache_ttl"]
+        per_article = config["input_tokens"] // TLDR_BATCH_SIZE
+        
+        # Content hash -> input; the system prompt is part of the hash so
+        # prompt changes invalidate cached TL;DRs
+        inputs: Dict[str, str] = {}
+        keys = []
+        for article in articles:
+            text = self._tldr_input(article, model, per_article)
+            key = flight_key(model, {"system": TLDR_BATCH_SYSTEM, "article": text})
+            inputs.setdefault(key, text)
+            keys.append(key)
+        
+        tldrs: Dict[str, str] = {}
+        if self.cache is not None:
+            try:
+                tldrs.update(await self.cache.aget_many(inputs, ttl))
+            except Exception as e:
+                safe_log_error(logger, "LLM cache lookup failed", e)
+        
+        pending = [key for key in inputs if key not in tldrs]
+        batches = [pending[i:i + TLDR_BATCH_SIZE] for i in range(0, len(pending), TLDR_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self._generate_tldr_batch([inputs[key] for key in batch]) for batch in batches)
         )
+        
+        generated = {
+            key: tldr
+            for batch, batch_tldrs in zip(batches, results)
+            for key, tldr in zip(batch, batch_tldrs)
+            if tldr
+        }
+        tldrs.update(generated)
+        if self.cache is not None:
+            try:
+                await self.cache.aset_many(generated, "tldr_batch")
+            except Exception as e:
+                safe_log_error(logger, "LLM cache write failed", e)
+        
+        logger.info(
+            f"TL;DRs: {len(inputs) - len(pending)} cached, {len(generated)}/{len(pending)} "
+            f"generated in {len(batches)} batches"
+        )
+        return [tldrs.get(key) for key in keys]
     
-    def enrich_grouped_articles(
+    async def enrich_grouped_articles(
         self,
-        grouped_articles: Dict[str, List[Dict[str, Any]]]
+        grouped_articles: Dict[str, List[Dict[str, Any]]],
+        on_event: Optional[EventCallback] = None,
+        similarity: Optional[SimilarityIndex] = None
     ) -> Dict[str, Any]:
         """Enrich grouped articles with generated content.
         
+        With on_event, the summary and section texts are streamed and each
+        part is reported as soon as it is complete, so a digest can be
+        assembled while other parts are still being generated. Events are
+        dictionaries with a 'type':
+        
+        - "text": chunk of streamed text, with 'part' ("executive_summary",
+          "brief" or "narrative"), 'topic' for sections, and 'text'
+        - "executive_summary": the final summary, in 'text'
+        - "section": a finished section, with 'topic' and 'section' (brief,
+          narrative, articles without TL;DRs, count)
+        - "top_articles": the picks with their TL;DRs, in 'articles'
+        
         Args:
             grouped_articles: Articles grouped by topic
+            on_event: Receives events as content is generated
+            similarity: The run's SimilarityIndex, reused to rank top articles
             
         Returns:
-            Dictionary with executive summary, top articles and enriched sections
+            Dictionary with executive summary, top articles (with 'tldr') and
+            enriched sections
         """
+        emit = on_event or (lambda event: None)
+        
         result = {
             "executive_summary": None,
             "top_articles": [],
             "sections": {}
         }
         
-        # Generate executive summary
-        result["executive_summary"] = self.generate_executive_summary(grouped_articles)
-        
-        # Collect all articles for top selection
+        # Collect all articles for top selection, labelled by topic
         all_articles = []
-        for articles in grouped_articles.values():
+        article_topics = []
+        for topic_index, articles in enumerate(grouped_articles.values()):
             all_articles.extend(articles)
+            article_topics.extend([topic_index] * len(articles))
+        
+        topics = list(grouped_articles)
+        
+        async def summary() -> Optional[str]:
+            on_text = None
+            if on_event is not None:
+                def on_text(text: str) -> None:
+                    emit({"type": "text", "part": "executive_summary", "text": text})
+            text = await self.generate_executive_summary(grouped_articles, on_text)
+            emit({"type": "executive_summary", "text": text})
+            return text
+        
+        async def section(topic: str) -> Dict[str, Optional[str]]:
+            articles = grouped_articles[topic]
+            on_text = None
+            if on_event is not None:
+                def on_text(field: str, text: str) -> None:
+                    emit({"type": "text", "part": field, "topic": topic, "text": text})
+            texts = await self.generate_section_enrichment(topic, articles, on_text)
+            emit({"type": "section", "topic": topic, "section": {
+                "articles": articles,
+                "count": len(articles),
+                **texts,
+            }})
+            return texts
+        
+        async def picks() -> Tuple[List[Dict[str, Any]], List[Optional[str]]]:
+            top_articles, tldrs = await asyncio.gather(
+                self.select_top_articles(all_articles, topics=article_topics, similarity=similarity),
+                self.generate_tldrs(all_articles)
+            )
+            # Top articles are copies; match them back to their TL;DR by URL
+            tldr_by_url = {article.get("url"): tldr for article, tldr in zip(all_articles, tldrs)}
+            top_articles = [
+                {**article, "tldr": tldr_by_url.get(article.get("url"))}
+                for article in top_articles
+            ]
+            emit({"type": "top_articles", "articles": top_articles})
+            return top_articles, tldrs
+        
+        # Every call is independent: run them together, bounded by the semaphore
+        executive_summary, (top_articles, tldrs), *section_texts = await asyncio.gather(
+            summary(),
+            picks(),
+            *(section(topic) for topic in topics)
+        )
         
-        # Select top articles
-        result["top_articles"] = self.select_top_articles(all_articles)
+        result["executive_summary"] = executive_summary
+        result["top_articles"] = top_articles
         
         # Enrich each section
-        for topic, articles in grouped_articles.items():
+        tldr_of = {id(article): tldr for article, tldr in zip(all_articles, tldrs)}
+        for i, topic in enumerate(topics):
+            articles = grouped_articles[topic]
             result["sections"][topic] = {
-                "articles": articles,
+                "articles": [{**article, "tldr": tldr_of.get(id(article))} for article in articles],
                 "count": len(articles),
-                "brief": self.generate_section_brief(topic, articles),
-                "narrative": self.generate_section_narrative(topic, articles),
+                "brief": section_texts[i]["brief"],
+                "narrative": section_texts[i]["narrative"],
             }
         
         return result
+    
+    async def collect_batch_requests(
+        self,
+        grouped_articles: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Record the LLM requests that enriching these articles would make.
+        
+        Runs enrich_grouped_articles without calling the API; requests
+        already answered by the cache are not recorded.
+        
+        Args:
+            grouped_articles: Articles grouped by topic
+            
+        Returns:
+            Dictionary of batch custom_id -> chat completion request body
+        """
+        with record_llm_requests() as requests:
+            await self.enrich_grouped_articles(grouped_articles)
+        return requests
+    
+    async def seed_cache(self, results: Dict[str, str]) -> int:
+        """Store batch job results in the LLM cache.
+        
+        A later enrich_grouped_articles over the same articles makes the
+        same requests, which are then answered from the cache.
+        
+        Args:
+            results: Batch custom_id -> response text
+            
+        Returns:
+            Number of responses stored
+        """
+        if self.cache is None:
+            logger.warning("LLM cache disabled, batch results cannot be reused")
+            return 0
+        
+        by_config: Dict[str, Dict[str, str]] = {}
+        for custom_id, content in results.items():
+            config_key, key = parse_custom_id(custom_id)
+            by_config.setdefault(config_key, {})[key] = content
+        
+        stored = 0
+        for config_key, responses in by_config.items():
+            try:
+                await self.cache.aset_many(responses, config_key)
+                stored += len(responses)
+            except Exception as e:
+                safe_log_error(logger, "LLM cache write failed", e)
+        return stored
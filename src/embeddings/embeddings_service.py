@@ -7,17 +7,23 @@ For clustering and content generation, see the separate modules:
 - prompts.py: LLM prompt catalog
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import numpy as np
-from openai import AsyncOpenAI
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    BadRequestError,
+    InternalServerError,
+    RateLimitError,
+)
 
 from src.config import settings
 from src.security import (
     safe_log_error,
     sanitize_text_for_llm,
-    sanitize_article_data,
 )
 
 # Imports for backward compatibility
@@ -27,9 +33,57 @@ from src.embeddings.clustering import (
     find_similar_articles,
 )
 from src.embeddings.content_generator import ContentGenerator
+from src.embeddings.extractive import enrich_grouped_articles_locally, keyword_labels
+from src.embeddings.similarity import SimilarityIndex
+from src.embeddings.singleflight import SingleFlight, flight_key
+from src.embeddings.streaming import EventCallback
+from src.embeddings.topic_store import TopicStore
 
 logger = logging.getLogger(__name__)
 
+# Shared by all service instances so concurrent pipeline runs coalesce
+_flights = SingleFlight()
+
+
+def _unique_names(names: List[str], taken: Iterable[str] = ()) -> List[str]:
+    """Make cluster names unique by suffixing repeats in order.
+    
+    The first occurrence keeps its name; later ones become "Name (2)",
+    "Name (3)", ... skipping anything already taken.
+    
+    Args:
+        names: Generated names, in cluster order
+        taken: Names already in use (e.g. stored topics)
+        
+    Returns:
+        Unique names aligned with names
+    """
+    used = set(taken)
+    unique = []
+    for name in names:
+        candidate, n = name, 1
+        while candidate in used:
+            n += 1
+            candidate = f"{name} ({n})"
+        used.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+# Errors worth retrying as-is (APITimeoutError is a subclass of
+# APIConnectionError); an exhausted quota is reported as a 429 but is not
+# transient, see _is_quota_error
+TRANSIENT_EMBEDDING_ERRORS = (
+    APIConnectionError,
+    InternalServerError,
+    RateLimitError,
+)
+
+
+def _is_quota_error(error: Exception) -> bool:
+    """Whether a rate limit error means the account is out of quota."""
+    return isinstance(error, RateLimitError) and getattr(error, "code", None) == "insufficient_quota"
+
 
 class EmbeddingsService:
     """Service for generating and comparing embeddings using OpenAI.
@@ -45,9 +99,25 @@ class EmbeddingsService:
     
     def __init__(self):
         """Initialize the embeddings service."""
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Retries are handled here so they can be counted per run
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            max_retries=0
+        )
         self.model = settings.embedding_model
+        self.max_retries = settings.embedding_max_retries
+        self.retry_base_delay = settings.embedding_retry_base_delay
         self._content_generator: Optional[ContentGenerator] = None
+        self.topic_store: Optional[TopicStore] = None
+        # Topics as changed by the last clustering run, not yet saved
+        self.staged_topics: Optional[TopicStore] = None
+        if settings.incremental_topics:
+            self.topic_store = TopicStore.load(
+                settings.topic_store_path,
+                max_distance=settings.topic_max_distance,
+                half_life_days=settings.topic_half_life_days
+            )
     
     @property
     def content_generator(self) -> ContentGenerator:
@@ -89,42 +159,136 @@ class EmbeddingsService:
     async def generate_embeddings_batch(
         self,
         texts: List[str],
-        batch_size: int = 10
+        batch_size: int = 10,
+        stats: Optional[Dict[str, int]] = None,
+        sanitized: bool = False
     ) -> List[Optional[List[float]]]:
         """Generate embeddings for multiple texts.
         
+        Transient API errors are retried with exponential backoff. If a
+        batch is rejected as invalid input (400) it is bisected until the
+        offending texts are isolated, so only those are lost. Texts already
+        being embedded by a concurrent call share that call's result.
+        
         Args:
             texts: List of texts
             batch_size: Batch size to avoid rate limits
+            stats: Optional dict filled with failure accounting
+                ('retried', 'split' and 'dropped' text counts)
+            sanitized: Texts were already sanitized at ingestion
             
         Returns:
             List of embeddings (None for failed texts)
+            
+        Raises:
+            Exception: Errors no retry or split can fix (authentication,
+                permissions, exhausted quota, ...), on the first batch
         """
+        if stats is None:
+            stats = {}
+        for key in ("retried", "split", "dropped"):
+            stats.setdefault(key, 0)
+        
         embeddings = []
         
         for i in range(0, len(texts), batch_size):
             batch = texts[i:i + batch_size]
             
-            try:
-                # Sanitize texts
+            if not sanitized:
                 batch = [sanitize_text_for_llm(text) for text in batch]
-                # Replace empty with space
-                batch = [text if text else " " for text in batch]
-                
+            # Replace empty with space
+            batch = [text if text else " " for text in batch]
+            
+            async def fetch(positions: List[int], batch=batch):
+                return await self._embed_isolating_failures(
+                    [batch[pos] for pos in positions],
+                    stats
+                )
+            
+            keys = [flight_key(self.model, text) for text in batch]
+            embeddings.extend(await _flights.run_many(keys, fetch))
+        
+        # Counted from the results: texts shared with a concurrent call are
+        # accounted in that call's stats, not in these
+        logger.info(
+            f"Generated {sum(e is not None for e in embeddings)} embeddings "
+            f"(retried={stats['retried']}, split={stats['split']}, "
+            f"dropped={stats['dropped']})"
+        )
+        return embeddings
+    
+    async def _embed_isolating_failures(
+        self,
+        batch: List[str],
+        stats: Dict[str, int]
+    ) -> List[Optional[List[float]]]:
+        """Embed a batch, bisecting when the input is rejected.
+        
+        Args:
+            batch: Sanitized texts
+            stats: Failure accounting to update
+            
+        Returns:
+            Embeddings aligned with batch (None for dropped texts)
+            
+        Raises:
+            Exception: Any error other than rejected input or a transient
+                one (authentication, permissions, exhausted quota, ...)
+        """
+        try:
+            return await self._embed_with_retry(batch, stats)
+        except TRANSIENT_EMBEDDING_ERRORS as e:
+            if _is_quota_error(e):
+                raise
+            # Still failing after retries: splitting would only add load
+            safe_log_error(logger, "Embeddings batch failed after retries", e)
+            stats["dropped"] += len(batch)
+            return [None] * len(batch)
+        except BadRequestError as e:
+            if len(batch) == 1:
+                safe_log_error(logger, "Dropping text after embedding error", e)
+                stats["dropped"] += 1
+                return [None]
+            
+            safe_log_error(logger, f"Embeddings batch of {len(batch)} failed, bisecting", e)
+            stats["split"] += len(batch)
+            mid = len(batch) // 2
+            left = await self._embed_isolating_failures(batch[:mid], stats)
+            right = await self._embed_isolating_failures(batch[mid:], stats)
+            return left + right
+    
+    async def _embed_with_retry(
+        self,
+        batch: List[str],
+        stats: Dict[str, int]
+    ) -> List[List[float]]:
+        """Call the embeddings API, retrying transient errors with backoff.
+        
+        Args:
+            batch: Sanitized texts
+            stats: Failure accounting to update
+            
+        Returns:
+            Embeddings aligned with batch
+            
+        Raises:
+            Exception: The last error once retries are exhausted, or any
+                non-transient error (including exhausted quota) immediately
+        """
+        attempt = 0
+        while True:
+            try:
                 response = await self.client.embeddings.create(
                     model=self.model,
                     input=batch
                 )
-                
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
-                
-            except Exception as e:
-                safe_log_error(logger, "Error in embeddings batch", e)
-                embeddings.extend([None] * len(batch))
-        
-        logger.info(f"Generated {len(embeddings)} embeddings")
-        return embeddings
+                return [item.embedding for item in response.data]
+            except TRANSIENT_EMBEDDING_ERRORS as e:
+                if attempt >= self.max_retries or _is_quota_error(e):
+                    raise
+                stats["retried"] += len(batch)
+                await asyncio.sleep(self.retry_base_delay * (2 ** attempt))
+                attempt += 1
     
     def cosine_similarity(
         self,
@@ -167,13 +331,15 @@ class EmbeddingsService:
     def find_duplicates(
         self,
         embeddings: List[List[float]],
-        threshold: Optional[float] = None
+        threshold: Optional[float] = None,
+        similarity: Optional[SimilarityIndex] = None
     ) -> List[List[int]]:
         """Find duplicate articles based on embeddings.
         
         Args:
             embeddings: List of embeddings
             threshold: Similarity threshold
+            similarity: Precomputed SimilarityIndex for these embeddings
             
         Returns:
             List of duplicate groups (indices)
@@ -181,28 +347,10 @@ class EmbeddingsService:
         if threshold is None:
             threshold = settings.similarity_threshold
         
-        n = len(embeddings)
-        visited = set()
-        duplicate_groups = []
+        if similarity is None:
+            similarity = SimilarityIndex(embeddings)
         
-        for i in range(n):
-            if i in visited:
-                continue
-            
-            group = [i]
-            visited.add(i)
-            
-            for j in range(i + 1, n):
-                if j in visited:
-                    continue
-                
-                similarity = self.cosine_similarity(embeddings[i], embeddings[j])
-                if similarity >= threshold:
-                    group.append(j)
-                    visited.add(j)
-            
-            if len(group) > 1:
-                duplicate_groups.append(group)
+        duplicate_groups = similarity.duplicate_groups(threshold)
         
         logger.info(f"Found {len(duplicate_groups)} duplicate groups")
         return duplicate_groups
@@ -211,7 +359,8 @@ class EmbeddingsService:
         self,
         articles: List[Dict[str, Any]],
         max_clusters: int = 8,
-        distance_threshold: float = 1.2
+        distance_threshold: float = 1.2,
+        similarity: Optional[SimilarityIndex] = None
     ) -> Dict[int, List[Dict[str, Any]]]:
         """Group articles by semantic similarity.
         
@@ -219,6 +368,7 @@ class EmbeddingsService:
             articles: List of articles with 'embedding'
             max_clusters: Maximum number of clusters
             distance_threshold: Distance threshold
+            similarity: Precomputed SimilarityIndex aligned with articles
             
         Returns:
             Dictionary cluster_id -> list of articles
@@ -226,41 +376,168 @@ class EmbeddingsService:
         clusters = _cluster_articles(
             articles,
             n_clusters=max_clusters,
-            distance_threshold=distance_threshold
+            distance_threshold=distance_threshold,
+            similarity=similarity,
+            reassign_min_similarity=settings.cluster_reassign_min_similarity
         )
         
         return {cluster_id: arts for cluster_id, arts in clusters}
     
+    async def _name_clusters(self, groups: List[List[Dict[str, Any]]], local: bool = False) -> List[str]:
+        """Name clusters with the LLM, or locally from their title keywords.
+        
+        Args:
+            groups: Articles of each cluster
+            local: Use c-TF-IDF keyword labels instead of LLM calls
+            
+        Returns:
+            One name per cluster (not yet deduplicated)
+        """
+        if local:
+            return keyword_labels(groups)
+        # Name all clusters at once; the generator bounds concurrency
+        return await asyncio.gather(
+            *(self.content_generator.generate_cluster_name(group) for group in groups)
+        )
+    
     async def cluster_and_name_articles(
         self,
         articles: List[Dict[str, Any]],
-        max_clusters: int = 8
+        max_clusters: int = 8,
+        similarity: Optional[SimilarityIndex] = None,
+        local: bool = False
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Group articles and generate descriptive cluster names.
         
         Args:
             articles: List of articles with embeddings
             max_clusters: Maximum number of clusters
+            similarity: Precomputed SimilarityIndex aligned with articles
+            local: Name clusters from title keywords, without LLM calls
             
         Returns:
             Dictionary cluster_name -> list of articles
         """
+        if self.topic_store is not None:
+            return await self._cluster_and_name_incrementally(
+                articles,
+                max_clusters,
+                similarity,
+                local
+            )
+        
         # First group
-        clusters = self.cluster_articles(articles, max_clusters=max_clusters)
+        clusters = self.cluster_articles(
+            articles,
+            max_clusters=max_clusters,
+            similarity=similarity
+        )
         
         if not clusters:
             return {}
         
-        # Generate names for each cluster
-        named_clusters = {}
-        for cluster_id, cluster_articles in clusters.items():
-            name = self.content_generator.generate_cluster_name(cluster_articles)
-            named_clusters[name] = cluster_articles
+        groups = list(clusters.values())
+        names = await self._name_clusters(groups, local)
+        named_clusters = dict(zip(_unique_names(names), groups))
         
         logger.info(f"Grouped {len(articles)} articles into {len(named_clusters)} clusters")
         return named_clusters
     
-    def generate_executive_summary(
+    async def _cluster_and_name_incrementally(
+        self,
+        articles: List[Dict[str, Any]],
+        max_clusters: int,
+        similarity: Optional[SimilarityIndex] = None,
+        local: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Assign articles to persistent topics; cluster and name only the leftovers.
+        
+        Changes are made on a copy of the topic store, kept in staged_topics
+        until commit_topics saves them. If known topics already fill
+        max_clusters, leftovers join their nearest one instead of forming
+        new topics (without moving its centroid).
+        
+        Args:
+            articles: List of articles with embeddings
+            max_clusters: Maximum number of clusters
+            similarity: Precomputed SimilarityIndex aligned with articles
+            local: Name new topics from title keywords, without LLM calls
+            
+        Returns:
+            Dictionary cluster_name -> list of articles
+        """
+        store = self.topic_store.copy()
+        if any(a.get('embedding') is None for a in articles):
+            articles = [a for a in articles if a.get('embedding') is not None]
+            similarity = None
+        assigned, leftovers = store.assign(articles)
+        
+        # Known topics keep their names; only their centroids move
+        groups = [
+            (store.update(topic_id, topic_articles), topic_articles)
+            for topic_id, topic_articles in assigned.items()
+        ]
+        
+        new_topics = 0
+        remaining = max_clusters - len(groups)
+        if leftovers and remaining <= 0:
+            nearest = store.nearest(leftovers, [topic.topic_id for topic, _ in groups])
+            for topic, topic_articles in groups:
+                topic_articles.extend(nearest.get(topic.topic_id, []))
+        elif leftovers:
+            leftover_similarity = similarity.aligned(leftovers) if similarity is not None else None
+            clusters = self.cluster_articles(
+                leftovers,
+                max_clusters=remaining,
+                similarity=leftover_similarity
+            )
+            new_groups = list(clusters.values())
+            names = await self._name_clusters(new_groups, local)
+            taken = [topic.name for topic in store.topics.values()]
+            for name, cluster_articles in zip(_unique_names(names, taken), new_groups):
+                groups.append((store.add_topic(name, cluster_articles), cluster_articles))
+                new_topics += 1
+        
+        store.prune()
+        self.staged_topics = store
+        
+        groups.sort(key=lambda group: len(group[1]), reverse=True)
+        names = _unique_names([topic.name for topic, _ in groups])
+        named_clusters = {name: topic_articles for name, (_, topic_articles) in zip(names, groups)}
+        
+        logger.info(
+            f"Grouped {len(articles)} articles into {len(named_clusters)} topics "
+            f"({len(groups) - new_topics} reused, {new_topics} new)"
+        )
+        return named_clusters
+    
+    def commit_topics(self, topics: Optional[Dict[str, Any]] = None) -> None:
+        """Save the topics staged by clustering, once the digest was built.
+        
+        Runs that must leave the store untouched (local-only digests, batch
+        submissions that have not completed) simply do not call this.
+        
+        Args:
+            topics: Staged topics in TopicStore.to_dict form (e.g. kept with a
+                batch job), instead of those staged in memory
+        """
+        if self.topic_store is None:
+            return
+        if topics is not None:
+            staged = self.topic_store.copy()
+            staged.restore(topics)
+        else:
+            staged, self.staged_topics = self.staged_topics, None
+        if staged is None:
+            return
+        
+        self.topic_store = staged
+        try:
+            staged.save()
+        except Exception as e:
+            safe_log_error(logger, "Error saving topic store", e)
+    
+    async def generate_executive_summary(
         self,
         grouped_articles: Dict[str, List[Dict[str, Any]]]
     ) -> Optional[str]:
@@ -272,25 +549,27 @@ class EmbeddingsService:
         Returns:
             Executive summary
         """
-        return self.content_generator.generate_executive_summary(grouped_articles)
+        return await self.content_generator.generate_executive_summary(grouped_articles)
     
-    def select_top_articles(
+    async def select_top_articles(
         self,
         articles: List[Dict[str, Any]],
-        count: int = 3
+        count: int = 3,
+        topics: Optional[List[int]] = None
     ) -> List[Dict[str, Any]]:
         """Select the most important articles.
         
         Args:
             articles: List of candidates
             count: Number to select
+            topics: Topic label per article
             
         Returns:
             Selected articles
         """
-        return self.content_generator.select_top_articles(articles, count)
+        return await self.content_generator.select_top_articles(articles, count, topics)
     
-    def generate_section_brief(
+    async def generate_section_brief(
         self,
         topic: str,
         articles: List[Dict[str, Any]]
@@ -304,9 +583,9 @@ class EmbeddingsService:
         Returns:
             Brief of 2-3 sentences
         """
-        return self.content_generator.generate_section_brief(topic, articles)
+        return await self.content_generator.generate_section_brief(topic, articles)
     
-    def generate_section_narrative(
+    async def generate_section_narrative(
         self,
         topic: str,
         articles: List[Dict[str, Any]]
@@ -320,21 +599,69 @@ class EmbeddingsService:
         Returns:
             Narrative of 2-4 paragraphs
         """
-        return self.content_generator.generate_section_narrative(topic, articles)
+        return await self.content_generator.generate_section_narrative(topic, articles)
     
-    def enrich_grouped_articles(
+    async def generate_section_enrichment(
         self,
-        grouped_articles: Dict[str, List[Dict[str, Any]]]
+        topic: str,
+        articles: List[Dict[str, Any]]
+    ) -> Dict[str, Optional[str]]:
+        """Generate brief and narrative for a section in one call.
+        
+        Args:
+            topic: Topic name
+            articles: Articles in the section
+            
+        Returns:
+            Dictionary with 'brief' and 'narrative'
+        """
+        return await self.content_generator.generate_section_enrichment(topic, articles)
+
+    async def generate_tldrs(self, articles: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Generate a TL;DR per article in batched requests.
+
+        Args:
+            articles: Articles to summarize
+
+        Returns:
+            TL;DR per article in input order (None where generation failed)
+        """
+        return await self.content_generator.generate_tldrs(articles)
+
+    async def enrich_grouped_articles(
+        self,
+        grouped_articles: Dict[str, List[Dict[str, Any]]],
+        local: bool = False,
+        on_event: Optional[EventCallback] = None,
+        similarity: Optional[SimilarityIndex] = None
     ) -> Dict[str, Any]:
         """Enrich grouped articles with generated content.
         
         Args:
             grouped_articles: Articles grouped by topic
+            local: Build extractive content locally instead of calling the LLM
+            on_event: Receives content events as parts complete (see
+                ContentGenerator.enrich_grouped_articles); local content is
+                reported all at once, without text events
+            similarity: The run's SimilarityIndex, reused to rank top articles
             
         Returns:
             Enriched structure with summary, tops and sections
         """
-        return self.content_generator.enrich_grouped_articles(grouped_articles)
+        if not local:
+            return await self.content_generator.enrich_grouped_articles(
+                grouped_articles,
+                on_event,
+                similarity
+            )
+        
+        result = enrich_grouped_articles_locally(grouped_articles, similarity=similarity)
+        if on_event is not None:
+            on_event({"type": "executive_summary", "text": result["executive_summary"]})
+            for topic, section in result["sections"].items():
+                on_event({"type": "section", "topic": topic, "section": section})
+            on_event({"type": "top_articles", "articles": result["top_articles"]})
+        return result
 
 
 # =============================================================================
@@ -0,0 +1,249 @@
+"""Local, LLM-free digest content.
+
+Fast path for when the chat API is slow or down: the digest is built in
+seconds from data the pipeline already has.
+
+- Cluster labels: class-based TF-IDF (c-TF-IDF) over titles. All titles of
+  a cluster form one document, so a term scores high when it is frequent in
+  that cluster and rare in the others.
+- Briefs and narratives: extractive. Candidate sentences are the leads of
+  the cluster's articles, ordered by their article's similarity to the
+  cluster centroid, reusing the embeddings computed for deduplication.
+- Top picks: the local ranking (see ranking.py).
+
+The output has the same structure as ContentGenerator.enrich_grouped_articles.
+"""
+
+import html
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from src.embeddings.clustering import order_by_centrality
+from src.embeddings.ranking import rank_articles
+from src.embeddings.similarity import SimilarityIndex
+
+logger = logging.getLogger(__name__)
+
+# Keywords joined into a cluster label
+LABEL_MAX_TERMS = 3
+
+# Label when titles have no usable keyword (same as the LLM fallback)
+DEFAULT_LABEL = "General News"
+
+# Sentences per generated text
+BRIEF_SENTENCES = 2
+NARRATIVE_SENTENCES = 6
+SENTENCES_PER_PARAGRAPH = 3
+
+# Leading sentences of each article considered for summaries
+LEAD_SENTENCES = 3
+
+# Word cap for article TL;DRs
+TLDR_MAX_WORDS = 40
+
+# Topics listed in the executive summary
+SUMMARY_MAX_TOPICS = 5
+
+# Word overlap (Jaccard) above which two sentences count as repeats
+DUPLICATE_SENTENCE_OVERLAP = 0.6
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9])")
+# Words with inner punctuation kept whole (GPT-5, Node.js, C++)
+_TOKEN = r"(?u)\b\w[\w.+-]*\w\b|\b\w\b"
+
+
+def plain_text(text: str) -> str:
+    """Text without HTML tags and entities, with whitespace collapsed."""
+    return " ".join(html.unescape(_HTML_TAG.sub(" ", text or "")).split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split plain text into sentences, dropping fragments under four words."""
+    return [s for s in _SENTENCE_END.split(plain_text(text)) if len(s.split()) >= 4]
+
+
+def _surface_forms(titles: List[str]) -> Dict[str, str]:
+    """Most common spelling of each word in the titles, by lowercase form."""
+    counts = Counter(re.findall(_TOKEN, " ".join(titles)))
+    forms: Dict[str, str] = {}
+    for word, _ in counts.most_common():
+        forms.setdefault(word.lower(), word)
+    return forms
+
+
+def _format_label(terms: List[str], forms: Dict[str, str]) -> str:
+    """Join keywords into a label, keeping their usual capitalization."""
+    words = []
+    for term in terms:
+        spelled = [forms.get(word, word) for word in term.split()]
+        words.append(" ".join(w[0].upper() + w[1:] if w.islower() else w for w in spelled))
+    if len(words) == 1:
+        return words[0]
+    return ", ".join(words[:-1]) + " & " + words[-1]
+
+
+def keyword_labels(groups: List[List[Dict[str, Any]]], max_terms: int = LABEL_MAX_TERMS) -> List[str]:
+    """Label clusters with their most distinctive title keywords (c-TF-IDF).
+
+    Args:
+        groups: Articles of each cluster
+        max_terms: Keywords per label
+
+    Returns:
+        One label per cluster, aligned with groups
+    """
+    titles = [[plain_text(a.get("title", "")) for a in group] for group in groups]
+    vectorizer = CountVectorizer(stop_words="english", ngram_range=(1, 2), token_pattern=_TOKEN)
+    try:
+        counts = vectorizer.fit_transform([" ".join(t) for t in titles]).toarray().astype(np.float64)
+    except ValueError:
+        # Empty vocabulary: no titles, or only stop words
+        return [DEFAULT_LABEL] * len(groups)
+
+    # Term frequency within each class, weighted by rarity across classes
+    tf = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1.0)
+    idf = np.log(1.0 + (counts.sum() / len(groups)) / np.maximum(counts.sum(axis=0), 1.0))
+    scores = tf * idf
+
+    terms = vectorizer.get_feature_names_out()
+    has_letter = np.array([any(c.isalpha() for c in term) for term in terms])
+    scores[:, ~has_letter] = 0.0
+
+    labels = []
+    for row, group_titles in zip(scores, titles):
+        chosen, used_words = [], set()
+        for j in np.argsort(-row, kind="stable"):
+            if row[j] <= 0 or len(chosen) == max_terms:
+                break
+            words = set(terms[j].split())
+            # Skip "openai" once "openai gpt" is in (and vice versa)
+            if words & used_words:
+                continue
+            chosen.append(terms[j])
+            used_words |= words
+        labels.append(_format_label(chosen, _surface_forms(group_titles)) if chosen else DEFAULT_LABEL)
+    return labels
+
+
+def _words(sentence: str) -> set:
+    """Lowercase word set of a sentence."""
+    return set(re.findall(r"\w+", sentence.lower()))
+
+
+def _representative_sentences(articles: List[Dict[str, Any]], count: int) -> List[str]:
+    """Most representative sentences of a cluster, without repeats.
+
+    Sentences are taken by lead position first (every article's first
+    sentence, then every second sentence, ...) and, within a position, by
+    their article's similarity to the cluster centroid. Articles with no
+    usable content contribute their title instead.
+    """
+    leads = []
+    for article in order_by_centrality(articles):
+        sentences = split_sentences(article.get("content", ""))[:LEAD_SENTENCES]
+        leads.append(sentences or [plain_text(article.get("title", ""))])
+
+    picked: List[str] = []
+    picked_words: List[set] = []
+    for position in range(LEAD_SENTENCES):
+        for sentences in leads:
+            if len(picked) == count:
+                return picked
+            if position >= len(sentences) or not sentences[position]:
+                continue
+            words = _words(sentences[position])
+            if any(len(words & other) / max(len(words | other), 1) > DUPLICATE_SENTENCE_OVERLAP
+                   for other in picked_words):
+                continue
+            picked.append(sentences[position])
+            picked_words.append(words)
+    return picked
+
+
+def extractive_tldr(article: Dict[str, Any], max_words: int = TLDR_MAX_WORDS) -> str:
+    """Leading sentences of an article within a word cap (its title if none)."""
+    words: List[str] = []
+    for sentence in split_sentences(article.get("content", "")):
+        if words and len(words) + len(sentence.split()) > max_words:
+            break
+        words.extend(sentence.split())
+    if not words:
+        return plain_text(article.get("title", ""))
+    if len(words) > max_words:
+        return " ".join(words[:max_words]) + "..."
+    return " ".join(words)
+
+
+def extractive_brief(articles: List[Dict[str, Any]]) -> str:
+    """Short section brief from its most representative sentences."""
+    return " ".join(_representative_sentences(articles, BRIEF_SENTENCES))
+
+
+def extractive_narrative(articles: List[Dict[str, Any]]) -> str:
+    """Section narrative in paragraphs of representative sentences."""
+    sentences = _representative_sentences(articles, NARRATIVE_SENTENCES)
+    paragraphs = [
+        " ".join(sentences[i:i + SENTENCES_PER_PARAGRAPH])
+        for i in range(0, len(sentences), SENTENCES_PER_PARAGRAPH)
+    ]
+    return "\n\n".join(paragraphs)
+
+
+def extractive_executive_summary(grouped_articles: Dict[str, List[Dict[str, Any]]]) -> str:
+    """Bullet per major topic with its most representative sentence."""
+    topics = sorted(grouped_articles.items(), key=lambda item: len(item[1]), reverse=True)
+    bullets = []
+    for topic, articles in topics[:SUMMARY_MAX_TOPICS]:
+        bullet = f"- **{topic}** ({len(articles)} articles)"
+        lead = _representative_sentences(articles, 1)
+        if lead:
+            bullet += f": {lead[0]}"
+        bullets.append(bullet)
+    return "\n".join(bullets)
+
+
+def enrich_grouped_articles_locally(
+    grouped_articles: Dict[str, List[Dict[str, Any]]],
+    top_count: int = 3,
+    similarity: Optional[SimilarityIndex] = None
+) -> Dict[str, Any]:
+    """Build digest content without any LLM call.
+
+    Args:
+        grouped_articles: Articles grouped by topic
+        top_count: Number of top articles to pick
+        similarity: The run's SimilarityIndex, reused by the ranking
+
+    Returns:
+        Dictionary with executive summary, top articles (with 'tldr') and
+        enriched sections, shaped like ContentGenerator.enrich_grouped_articles
+    """
+    all_articles = []
+    article_topics = []
+    for topic_index, articles in enumerate(grouped_articles.values()):
+        all_articles.extend(articles)
+        article_topics.extend([topic_index] * len(articles))
+
+    top_articles = rank_articles(all_articles, top_count, article_topics, similarity=similarity)
+
+    result = {
+        "executive_summary": extractive_executive_summary(grouped_articles) if grouped_articles else None,
+        "top_articles": [{**article, "tldr": extractive_tldr(article)} for article in top_articles],
+        "sections": {},
+    }
+    for topic, articles in grouped_articles.items():
+        result["sections"][topic] = {
+            "articles": [{**article, "tldr": extractive_tldr(article)} for article in articles],
+            "count": len(articles),
+            "brief": extractive_brief(articles) or None,
+            "narrative": extractive_narrative(articles) or None,
+        }
+
+    logger.info(f"Built local digest content for {len(all_articles)} articles in {len(grouped_articles)} topics")
+    return result
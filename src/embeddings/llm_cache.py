@@ -0,0 +1,424 @@
+"""Persistent cache for LLM responses.
+
+Re-running a digest over the same articles (after a PDF failure, or to
+regenerate it with a different layout) reuses the stored completions
+instead of paying for them again. Entries are keyed by a hash of the full
+request, expire after a per-prompt TTL and are evicted least recently used
+first once the cache is full.
+
+A semantic layer also reuses responses across near-identical inputs, such
+as the same ongoing story with one new headline. Those entries are keyed
+by the centroid of the input articles' embeddings and matched above a
+similarity threshold, within a staleness bound. Their vectors are kept in
+memory once loaded, so a lookup is one matrix product; entries written by
+another process are seen after a restart. The semantic layer has its own
+size limit and evicts oldest first.
+
+Async callers use the a* methods, which run the database work in a worker
+thread so lookups never block the event loop. Hits only record their
+recency in memory; it is written in bulk before evictions, when many hits
+have accumulated, on stats() and on flush().
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Hits whose recency is kept in memory before it is written
+TOUCH_FLUSH_SIZE = 256
+
+# Set while fresh generation is wanted: lookups miss, new results are still stored
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True) -> Iterator[None]:
+    """Skip cache lookups for LLM calls made inside the block.
+
+    Applies to tasks started inside the block as well, since they inherit
+    the current context.
+
+    Args:
+        enabled: Bypass only if True (lets callers pass a flag through)
+    """
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class _SemanticGroup:
+    """In-memory semantic entries of one (config_key, variant, dimension)."""
+
+    def __init__(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.created_at = np.zeros(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, entry_id: int, vector: np.ndarray, created_at: float) -> None:
+        """Add an entry."""
+        self.ids = np.append(self.ids, entry_id)
+        self.vectors = vector[None, :] if not len(self.vectors) else np.vstack([self.vectors, vector])
+        self.created_at = np.append(self.created_at, created_at)
+
+    def remove(self, entry_ids: List[int]) -> None:
+        """Drop entries by id."""
+        keep = ~np.isin(self.ids, entry_ids)
+        if not keep.all():
+            self.ids = self.ids[keep]
+            self.vectors = self.vectors[keep]
+            self.created_at = self.created_at[keep]
+
+
+class LLMCache:
+    """SQLite-backed LLM response cache with TTL and LRU eviction."""
+
+    def __init__(self, path: str, max_entries: int = 5000, max_semantic_entries: int = 1000):
+        """Initialize the cache (the database is opened on first use).
+
+        Args:
+            path: SQLite database file
+            max_entries: Exact-match responses kept before least recently
+                used ones are evicted
+            max_semantic_entries: Semantic entries kept before the oldest
+                are evicted (a separate limit: the file holds up to
+                max_entries + max_semantic_entries responses)
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_semantic_entries = max_semantic_entries
+        self.hits = 0
+        self.misses = 0
+        self.semantic_hits = 0
+        self.semantic_misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # Serializes database access between worker threads and direct calls
+        self._lock = threading.RLock()
+        # key -> time of the last hit, not yet written
+        self._touched: Dict[str, float] = {}
+        # (config_key, variant, dimension) -> semantic entries, loaded on first use
+        self._semantic: Optional[Dict[Tuple[str, str, int], _SemanticGroup]] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the table if needed."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " config_key TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_semantic_cache ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " config_key TEXT NOT NULL,"
+                " variant TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_semantic_cache_lookup"
+                " ON llm_semantic_cache (config_key, variant, created_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _write_touches(self, conn: sqlite3.Connection) -> None:
+        """Write the recency of hits recorded in memory (caller commits)."""
+        if self._touched:
+            conn.executemany(
+                "UPDATE llm_cache SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def flush(self) -> None:
+        """Write pending hit recency to the database."""
+        with self._lock:
+            if self._touched:
+                conn = self._connection()
+                self._write_touches(conn)
+                conn.commit()
+
+    def get_many(self, keys: Iterable[str], ttl: float) -> Dict[str, str]:
+        """Look up several responses at once.
+
+        Args:
+            keys: Request hashes (see flight_key)
+            ttl: Max age in seconds for this kind of prompt
+
+        Returns:
+            Dictionary key -> cached response, for the keys that hit
+        """
+        keys = list(dict.fromkeys(keys))
+        if _bypass.get():
+            self.misses += len(keys)
+            return {}
+
+        found: Dict[str, str] = {}
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            expired = []
+            for key in keys:
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or now - row[1] > ttl:
+                    if row is not None:
+                        expired.append((key,))
+                    self.misses += 1
+                    continue
+                self._touched[key] = now
+                self.hits += 1
+                found[key] = row[0]
+
+            if expired:
+                conn.executemany("DELETE FROM llm_cache WHERE key = ?", expired)
+                conn.commit()
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._write_touches(conn)
+                conn.commit()
+        return found
+
+    def get(self, key: str, ttl: float) -> Optional[str]:
+        """Look up a response.
+
+        Args:
+            key: Request hash (see flight_key)
+            ttl: Max age in seconds for this kind of prompt
+
+        Returns:
+            Cached response, or None on a miss, an expired entry or a bypass
+        """
+        return self.get_many([key], ttl).get(key)
+
+    def set_many(self, responses: Dict[str, str], config_key: str) -> None:
+        """Store several responses, evicting the least recently used entries if full.
+
+        Args:
+            responses: Request hash (see flight_key) -> LLM response text
+            config_key: LLM_CONFIG key the requests were made with
+        """
+        if not responses:
+            return
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_cache (key, config_key, response, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(key, config_key, response, now, now) for key, response in responses.items()]
+            )
+            # Eviction must see the latest hits
+            for key in responses:
+                self._touched.pop(key, None)
+            self._write_touches(conn)
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def set(self, key: str, config_key: str, response: str) -> None:
+        """Store a response, evicting the least recently used entries if full.
+
+        Args:
+            key: Request hash (see flight_key)
+            config_key: LLM_CONFIG key the request was made with
+            response: LLM response text
+        """
+        self.set_many({key: response}, config_key)
+
+    async def aget(self, key: str, ttl: float) -> Optional[str]:
+        """Async get; the lookup runs in a worker thread."""
+        return (await self.aget_many([key], ttl)).get(key)
+
+    async def aget_many(self, keys: Iterable[str], ttl: float) -> Dict[str, str]:
+        """Async get_many; the lookups run in a worker thread (which sees the bypass flag)."""
+        return await asyncio.to_thread(self.get_many, list(keys), ttl)
+
+    async def aset(self, key: str, config_key: str, response: str) -> None:
+        """Async set; the write runs in a worker thread."""
+        await asyncio.to_thread(self.set_many, {key: response}, config_key)
+
+    async def aset_many(self, responses: Dict[str, str], config_key: str) -> None:
+        """Async set_many; the writes run in a worker thread."""
+        await asyncio.to_thread(self.set_many, dict(responses), config_key)
+
+    def _semantic_index(self) -> Dict[Tuple[str, str, int], _SemanticGroup]:
+        """In-memory vectors of the semantic entries, loaded on first use (caller holds the lock).
+
+        Groups are keyed by vector dimension too, so entries embedded with
+        another model are never stacked or compared with the current ones.
+        """
+        if self._semantic is None:
+            groups: Dict[Tuple[str, str, int], _SemanticGroup] = {}
+            rows = self._connection().execute(
+                "SELECT id, config_key, variant, vector, created_at FROM llm_semantic_cache ORDER BY id"
+            ).fetchall()
+            for entry_id, config_key, variant, vector, created_at in rows:
+                vector = np.frombuffer(vector, dtype=np.float32)
+                group = groups.setdefault((config_key, variant, len(vector)), _SemanticGroup())
+                group.append(entry_id, vector, created_at)
+            self._semantic = groups
+        return self._semantic
+
+    def get_similar(
+        self,
+        config_key: str,
+        variant: str,
+        vector: Sequence[float],
+        threshold: float,
+        max_age: float
+    ) -> Optional[str]:
+        """Look up the response for the most similar prior input.
+
+        Vectors are matched in memory; only the chosen response is read
+        from the database.
+
+        Args:
+            config_key: LLM_CONFIG key; only responses to the same prompt match
+            variant: Hash of the request without the user prompt (model,
+                parameters, system prompt)
+            vector: Unit-length embedding of the input
+            threshold: Minimum cosine similarity to reuse a response
+            max_age: Staleness bound in seconds
+
+        Returns:
+            Reused response, or None on a miss or a bypass
+        """
+        if _bypass.get():
+            self.semantic_misses += 1
+            return None
+
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            group = self._semantic_index().get((config_key, variant, len(vector)))
+            if group is not None and len(group):
+                similarities = group.vectors @ vector
+                similarities[group.created_at < time.time() - max_age] = -np.inf
+                best = int(np.argmax(similarities))
+                if similarities[best] >= threshold:
+                    row = self._connection().execute(
+                        "SELECT response FROM llm_semantic_cache WHERE id = ?",
+                        (int(group.ids[best]),)
+                    ).fetchone()
+                    if row is not None:
+                        self.semantic_hits += 1
+                        return row[0]
+
+        self.semantic_misses += 1
+        return None
+
+    def set_similar(
+        self,
+        config_key: str,
+        variant: str,
+        vector: Sequence[float],
+        response: str
+    ) -> None:
+        """Store a response under its input embedding, evicting the oldest if full.
+
+        Args:
+            config_key: LLM_CONFIG key the request was made with
+            variant: Hash of the request without the user prompt
+            vector: Unit-length embedding of the input
+            response: LLM response text
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            conn = self._connection()
+            index = self._semantic_index()
+            now = time.time()
+            cursor = conn.execute(
+                "INSERT INTO llm_semantic_cache (config_key, variant, vector, response, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (config_key, variant, vector.tobytes(), response, now)
+            )
+            group = index.setdefault((config_key, variant, len(vector)), _SemanticGroup())
+            group.append(cursor.lastrowid, vector, now)
+
+            evicted = [row[0] for row in conn.execute(
+                "SELECT id FROM llm_semantic_cache ORDER BY created_at DESC, id DESC LIMIT -1 OFFSET ?",
+                (self.max_semantic_entries,)
+            ).fetchall()]
+            if evicted:
+                conn.executemany("DELETE FROM llm_semantic_cache WHERE id = ?", [(i,) for i in evicted])
+                for group in index.values():
+                    group.remove(evicted)
+            conn.commit()
+
+    async def aget_similar(
+        self,
+        config_key: str,
+        variant: str,
+        vector: Sequence[float],
+        threshold: float,
+        max_age: float
+    ) -> Optional[str]:
+        """Async get_similar; the lookup runs in a worker thread."""
+        return await asyncio.to_thread(self.get_similar, config_key, variant, vector, threshold, max_age)
+
+    async def aset_similar(
+        self,
+        config_key: str,
+        variant: str,
+        vector: Sequence[float],
+        response: str
+    ) -> None:
+        """Async set_similar; the write runs in a worker thread."""
+        await asyncio.to_thread(self.set_similar, config_key, variant, vector, response)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters since startup and the current number of entries."""
+        self.flush()
+        with self._lock:
+            conn = self._connection()
+            size = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            semantic_size = conn.execute("SELECT COUNT(*) FROM llm_semantic_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": size,
+            "semantic_hits": self.semantic_hits,
+            "semantic_misses": self.semantic_misses,
+            "semantic_entries": semantic_size,
+        }
+
+    async def astats(self) -> Dict[str, int]:
+        """Async stats; the flush and counts run in a worker thread."""
+        return await asyncio.to_thread(self.stats)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connection()
+            self._touched.clear()
+            self._semantic = None
+            conn.execute("DELETE FROM llm_cache")
+            conn.execute("DELETE FROM llm_semantic_cache")
+            conn.commit()
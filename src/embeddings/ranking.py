@@ -0,0 +1,193 @@
+"""Local article ranking.
+
+Scores articles without any LLM call, vectorized over the embedding
+matrix, from four signals:
+
+- centrality: how representative the article is of its topic
+- coverage: how many distinct sources reported closely related stories
+- freshness: exponential decay on the article's age, relative to the newest
+- source weight: configured per domain
+
+The ranking shortlists candidates for LLM top-article selection and, with
+the same output shape, replaces it when no LLM response is available.
+Given the run's SimilarityIndex, centrality and coverage are read from the
+similarities already computed for deduplication instead of recomputed.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import numpy as np
+
+from src.config import settings
+from src.embeddings.similarity import SimilarityIndex
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each signal in the final score
+RANKING_WEIGHTS = {
+    "centrality": 0.4,
+    "coverage": 0.3,
+    "freshness": 0.2,
+    "source": 0.1,
+}
+
+# Minimum similarity for two articles to count as covering the same story
+COVERAGE_MIN_SIMILARITY = 0.75
+
+# Neighbours examined per article when counting coverage
+COVERAGE_NEIGHBORS = 32
+
+# Hours for an article's freshness score to halve
+FRESHNESS_HALF_LIFE_HOURS = 24.0
+
+
+def _domain(url: str) -> str:
+    """Lowercase domain of a URL without the www. prefix."""
+    domain = urlparse(url or "").netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _age_hours(published: Any, now: datetime) -> float:
+    """Age of an article in hours (infinite if the date is missing or invalid)."""
+    if not isinstance(published, datetime):
+        try:
+            published = datetime.fromisoformat(str(published))
+        except (TypeError, ValueError):
+            return np.inf
+    if published.tzinfo is not None:
+        # Feed dates are naive local times; compare like with like
+        published = published.astimezone().replace(tzinfo=None)
+    return max((now - published).total_seconds() / 3600, 0.0)
+
+
+def _coverage_counts(similarity: SimilarityIndex, sources: Sequence[str]) -> np.ndarray:
+    """Distinct sources among each article and its close neighbours."""
+    _, codes = np.unique(np.asarray(sources, dtype=object).astype(str), return_inverse=True)
+    indices, _ = similarity.neighbors(COVERAGE_NEIGHBORS, min_similarity=COVERAGE_MIN_SIMILARITY)
+    # Each article counts its own source
+    indices = np.hstack([np.arange(len(codes))[:, None], indices])
+
+    # Source code per neighbour slot, -1 where there is no neighbour
+    neighbour_sources = np.where(indices >= 0, codes[np.maximum(indices, 0)], -1)
+    neighbour_sources.sort(axis=1)
+    distinct = (np.diff(neighbour_sources, axis=1) != 0) & (neighbour_sources[:, 1:] >= 0)
+    return distinct.sum(axis=1) + (neighbour_sources[:, 0] >= 0)
+
+
+def score_articles(
+    articles: List[Dict[str, Any]],
+    topics: Optional[Sequence[int]] = None,
+    now: Optional[datetime] = None,
+    source_weights: Optional[Dict[str, float]] = None,
+    similarity: Optional[SimilarityIndex] = None
+) -> Dict[str, np.ndarray]:
+    """Score articles on every ranking signal.
+
+    Args:
+        articles: Articles with 'embedding' (and optionally 'source', 'url',
+            'published_date')
+        topics: Topic label per article (all one topic if None)
+        now: Reference time for freshness (defaults to now)
+        source_weights: Domain -> weight (defaults to settings)
+        similarity: The run's SimilarityIndex; its slice for these articles
+            is reused (built here if None or not covering them)
+
+    Returns:
+        Dictionary with one array per signal, each scaled to [0, 1], plus
+        the weighted 'score'
+    """
+    n = len(articles)
+    if n == 0:
+        return {name: np.zeros(0, dtype=np.float32) for name in (*RANKING_WEIGHTS, "score")}
+
+    now = now or datetime.now()
+    if source_weights is None:
+        source_weights = settings.get_source_weights()
+
+    if similarity is not None:
+        similarity = similarity.aligned(articles)
+    if similarity is None:
+        similarity = SimilarityIndex([a["embedding"] for a in articles])
+
+    labels = np.zeros(n, dtype=int) if topics is None else np.asarray(topics, dtype=int)
+    centrality = np.zeros(n, dtype=np.float32)
+    for topic_id in np.unique(labels):
+        members = np.flatnonzero(labels == topic_id)
+        centrality[members] = similarity.centrality(members)
+
+    sources = [a.get("source") or _domain(a.get("url", "")) for a in articles]
+    coverage = _coverage_counts(similarity, sources).astype(np.float32)
+
+    # Relative to the newest article, like the other signals are scaled by
+    # their max: the order does not drift with the time the ranking runs
+    # (e.g. when a batch digest is resumed hours after submission)
+    ages = np.array([_age_hours(a.get("published_date"), now) for a in articles])
+    known = np.isfinite(ages)
+    if known.any():
+        freshness = 0.5 ** ((ages - ages[known].min()) / FRESHNESS_HALF_LIFE_HOURS)
+    else:
+        freshness = np.zeros(n)
+
+    weights = np.array([source_weights.get(_domain(a.get("url", "")), 1.0) for a in articles])
+
+    signals = {
+        "centrality": np.clip(centrality, 0.0, 1.0),
+        "coverage": coverage / coverage.max() if coverage.max() > 0 else coverage,
+        "freshness": freshness,
+        "source": weights / weights.max() if weights.max() > 0 else weights,
+    }
+    signals = {name: values.astype(np.float32) for name, values in signals.items()}
+    signals["score"] = sum(RANKING_WEIGHTS[name] * signals[name] for name in RANKING_WEIGHTS)
+    return signals
+
+
+def _selection_reason(article: Dict[str, Any], signals: Dict[str, np.ndarray], i: int) -> str:
+    """Short human-readable reason for a locally selected article."""
+    strongest = max(RANKING_WEIGHTS, key=lambda name: RANKING_WEIGHTS[name] * signals[name][i])
+    reasons = {
+        "centrality": "Most representative story of its topic",
+        "coverage": "Covered by several sources",
+        "freshness": "Breaking news",
+        "source": f"From a priority source ({article.get('source', 'unknown')})",
+    }
+    return reasons[strongest]
+
+
+def rank_articles(
+    articles: List[Dict[str, Any]],
+    count: int,
+    topics: Optional[Sequence[int]] = None,
+    now: Optional[datetime] = None,
+    source_weights: Optional[Dict[str, float]] = None,
+    similarity: Optional[SimilarityIndex] = None
+) -> List[Dict[str, Any]]:
+    """Pick the best articles by local score.
+
+    Args:
+        articles: Candidate articles with 'embedding'
+        count: Number of articles to return
+        topics: Topic label per article (all one topic if None)
+        now: Reference time for freshness
+        source_weights: Domain -> weight (defaults to settings)
+        similarity: The run's SimilarityIndex, reused for the candidates
+
+    Returns:
+        Copies of the top articles, best first, each with 'selection_reason'
+        (same shape as ContentGenerator.select_top_articles)
+    """
+    embedded = [i for i, a in enumerate(articles) if a.get("embedding") is not None]
+    if not embedded:
+        return [{**a, "selection_reason": ""} for a in articles[:count]]
+
+    candidates = [articles[i] for i in embedded]
+    candidate_topics = None if topics is None else [topics[i] for i in embedded]
+    signals = score_articles(candidates, candidate_topics, now, source_weights, similarity)
+
+    order = np.argsort(-signals["score"], kind="stable")[:count]
+    return [
+        {**candidates[i], "selection_reason": _selection_reason(candidates[i], signals, i)}
+        for i in order
+    ]
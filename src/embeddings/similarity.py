@@ -0,0 +1,320 @@
+"""Shared similarity structure for one pipeline run.
+
+Normalizes the embeddings once and computes pairwise cosine similarities
+once, so deduplication, clustering and article ranking all reuse the same
+O(n²·d) work. Small inputs keep a dense matrix; large inputs keep a sparse
+k-nearest-neighbour graph.
+
+An index built with its articles can be handed to any later stage: each
+stage takes the slice aligned with the articles it works on (see
+SimilarityIndex.aligned). Deduplication and ranking coverage read the
+similarities; clustering, cluster merging and ranking centrality read the
+normalized vectors. Mini-batch k-means (large inputs) works on the vectors
+only, so at that size the kNN graph serves deduplication and ranking.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from src.embeddings.clustering import AGGLOMERATIVE_MAX_ARTICLES, normalize_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per article in the sparse graph
+KNN_NEIGHBORS = 32
+
+# Rows per matrix product when building the sparse graph
+SIMILARITY_CHUNK_SIZE = 1024
+
+
+def top_k_similar(
+    queries: Sequence[Sequence[float]],
+    candidates: Sequence[Sequence[float]],
+    k: int = 5,
+    min_similarity: Optional[float] = None,
+    chunk_size: int = SIMILARITY_CHUNK_SIZE,
+    normalized: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched top-k cosine similarity search.
+    
+    Queries and candidates are processed in chunks, so memory stays at
+    O(chunk_size²) regardless of how many candidates there are. A running
+    top-k per query is merged chunk by chunk with argpartition.
+    
+    Args:
+        queries: Query vectors, shape (q, d)
+        candidates: Candidate vectors, shape (n, d)
+        k: Results per query (capped at n)
+        min_similarity: Drop results below this similarity
+        chunk_size: Rows per matrix product
+        normalized: Skip normalization if inputs already have unit length
+        
+    Returns:
+        Tuple (indices, scores), each of shape (q, k), sorted by descending
+        score. Slots without a result have index -1 and score -inf.
+    """
+    queries = np.asarray(queries, dtype=np.float32) if normalized else normalize_embeddings(queries)
+    candidates = np.asarray(candidates, dtype=np.float32) if normalized else normalize_embeddings(candidates)
+    
+    n_queries, n_candidates = len(queries), len(candidates)
+    k = min(k, n_candidates)
+    indices = np.full((n_queries, k), -1, dtype=np.int64)
+    scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    
+    for q_start in range(0, n_queries, chunk_size):
+        q_block = queries[q_start:q_start + chunk_size]
+        best_idx = np.full((len(q_block), k), -1, dtype=np.int64)
+        best_scores = np.full((len(q_block), k), -np.inf, dtype=np.float32)
+        
+        for c_start in range(0, n_candidates, chunk_size):
+            block = q_block @ candidates[c_start:c_start + chunk_size].T
+            block_idx = np.broadcast_to(
+                np.arange(c_start, c_start + block.shape[1]),
+                block.shape
+            )
+            
+            merged_scores = np.concatenate([best_scores, block], axis=1)
+            merged_idx = np.concatenate([best_idx, block_idx], axis=1)
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_idx = np.take_along_axis(merged_idx, top, axis=1)
+        
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        scores[q_start:q_start + len(q_block)] = np.take_along_axis(best_scores, order, axis=1)
+        indices[q_start:q_start + len(q_block)] = np.take_along_axis(best_idx, order, axis=1)
+    
+    if min_similarity is not None:
+        below = scores < min_similarity
+        scores[below] = -np.inf
+        indices[below] = -1
+    
+    return indices, scores
+
+
+def _knn_graph(vectors: np.ndarray, k: int, chunk_size: int) -> sparse.csr_matrix:
+    """Symmetric k-nearest-neighbour similarity graph (self excluded)."""
+    n = len(vectors)
+    k = min(k, n - 1)
+    
+    # One extra neighbour so each row can drop itself
+    indices, scores = top_k_similar(vectors, vectors, k + 1, chunk_size=chunk_size, normalized=True)
+    is_self = indices == np.arange(n)[:, None]
+    # Rows where exact duplicates pushed self out: drop the weakest instead
+    is_self[~is_self.any(axis=1), -1] = True
+    keep = ~is_self
+    
+    rows = np.repeat(np.arange(n), k)
+    graph = sparse.csr_matrix(
+        (scores[keep], (rows, indices[keep])),
+        shape=(n, n),
+        dtype=np.float32
+    )
+    # Keep an edge if either end has the other among its neighbours
+    return graph.maximum(graph.T).tocsr()
+
+
+class SimilarityIndex:
+    """Normalized embeddings plus their pairwise cosine similarities."""
+
+    def __init__(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        dense_max: int = AGGLOMERATIVE_MAX_ARTICLES,
+        k: int = KNN_NEIGHBORS,
+        articles: Optional[Sequence[Dict[str, Any]]] = None,
+        normalized: bool = False
+    ):
+        """Build the index.
+
+        Args:
+            embeddings: One vector per article
+            dense_max: Largest input kept as a dense n×n matrix
+            k: Neighbours per article in the sparse graph
+            articles: The articles the embeddings belong to, so later
+                stages can take the slice matching their own articles
+            normalized: Skip normalization if embeddings already have unit length
+        """
+        self.vectors = (
+            np.asarray(embeddings, dtype=np.float32) if normalized else normalize_embeddings(embeddings)
+        )
+        self.articles: Optional[List[Dict[str, Any]]] = list(articles) if articles is not None else None
+        self.dense: Optional[np.ndarray] = None
+        self.graph: Optional[sparse.csr_matrix] = None
+
+        n = len(self.vectors)
+        if n <= dense_max:
+            self.dense = self.vectors @ self.vectors.T
+        elif n > 1:
+            self.graph = _knn_graph(self.vectors, k, SIMILARITY_CHUNK_SIZE)
+        logger.debug(f"Similarity index for {n} articles ({'dense' if self.is_dense else 'knn'})")
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def is_dense(self) -> bool:
+        """Whether all pairwise similarities are available."""
+        return self.dense is not None
+
+    def subset(self, indices: Sequence[int]) -> "SimilarityIndex":
+        """Restrict the index to some articles without recomputing anything.
+
+        Args:
+            indices: Positions to keep, in the desired order
+
+        Returns:
+            New index aligned with indices
+        """
+        indices = np.asarray(indices, dtype=int)
+        index = SimilarityIndex.__new__(SimilarityIndex)
+        index.vectors = self.vectors[indices]
+        index.articles = [self.articles[i] for i in indices] if self.articles is not None else None
+        index.dense = self.dense[np.ix_(indices, indices)] if self.dense is not None else None
+        index.graph = self.graph[indices][:, indices] if self.graph is not None else None
+        return index
+
+    def aligned(self, articles: Sequence[Dict[str, Any]]) -> Optional["SimilarityIndex"]:
+        """The index restricted to some articles, in their order.
+
+        Articles are matched by identity, so stages that pass the run's
+        article dictionaries along get their slice without recomputation.
+
+        Args:
+            articles: Articles to align with
+
+        Returns:
+            Index aligned with articles, or None if some article is not in
+            the index (an index built without articles only aligns with a
+            list of the same length)
+        """
+        if self.articles is None:
+            return self if len(articles) == len(self) else None
+
+        positions: Dict[int, int] = {}
+        for i, article in enumerate(self.articles):
+            positions.setdefault(id(article), i)
+        try:
+            indices = [positions[id(article)] for article in articles]
+        except KeyError:
+            return None
+        if indices == list(range(len(self))):
+            return self
+        return self.subset(indices)
+
+    def neighbors(self, k: int, min_similarity: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Most similar other articles of each article.
+
+        Read from the dense matrix, or from the kNN graph (so at most the
+        graph's neighbours per article).
+
+        Args:
+            k: Neighbours per article
+            min_similarity: Drop neighbours below this similarity
+
+        Returns:
+            Tuple (indices, scores), each of shape (n, k), sorted by
+            descending score. Slots without a neighbour have index -1 and
+            score -inf.
+        """
+        n = len(self)
+        k = max(min(k, n - 1), 0)
+        indices = np.full((n, k), -1, dtype=np.int64)
+        scores = np.full((n, k), -np.inf, dtype=np.float32)
+        if k == 0:
+            return indices, scores
+
+        if self.dense is not None:
+            similarities = self.dense.astype(np.float32, copy=True)
+            np.fill_diagonal(similarities, -np.inf)
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            indices[:] = np.take_along_axis(top, order, axis=1)
+            scores[:] = np.take_along_axis(top_scores, order, axis=1)
+        elif self.graph is not None:
+            graph = self.graph
+            for i in range(n):
+                row = slice(graph.indptr[i], graph.indptr[i + 1])
+                row_indices, row_scores = graph.indices[row], graph.data[row]
+                order = np.argsort(-row_scores, kind="stable")[:k]
+                indices[i, :len(order)] = row_indices[order]
+                scores[i, :len(order)] = row_scores[order]
+
+        if min_similarity is not None:
+            below = scores < min_similarity
+            scores[below] = -np.inf
+            indices[below] = -1
+        return indices, scores
+
+    def duplicate_groups(self, threshold: float) -> List[List[int]]:
+        """Group articles above a similarity threshold.
+
+        Each group starts at the first not-yet-grouped article and takes the
+        later ungrouped articles similar to it, as in
+        EmbeddingsService.find_duplicates. With the sparse graph only the
+        k nearest neighbours of each article are candidates.
+
+        Args:
+            threshold: Minimum cosine similarity
+
+        Returns:
+            List of duplicate groups (indices), only groups of 2 or more
+        """
+        n = len(self)
+        visited = np.zeros(n, dtype=bool)
+        groups = []
+
+        for i in range(n):
+            if visited[i]:
+                continue
+            visited[i] = True
+
+            if self.dense is not None:
+                candidates = np.flatnonzero(self.dense[i, i + 1:] >= threshold) + i + 1
+            elif self.graph is not None:
+                row = self.graph.getrow(i)
+                candidates = np.sort(row.indices[(row.data >= threshold) & (row.indices > i)])
+            else:
+                candidates = np.array([], dtype=int)
+
+            members = candidates[~visited[candidates]]
+            if len(members):
+                visited[members] = True
+                groups.append([i] + members.tolist())
+
+        return groups
+
+    def distance_matrix(self) -> np.ndarray:
+        """Dense cosine distance matrix (dense index only)."""
+        if self.dense is None:
+            raise ValueError("Distance matrix requires a dense similarity index")
+        return np.clip(1.0 - self.dense, 0.0, 2.0)
+
+    def centrality(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """How representative each article is of a group.
+
+        Mean similarity to the other members when the dense matrix is
+        available, similarity to the group centroid otherwise.
+
+        Args:
+            indices: Group members (all articles if None)
+
+        Returns:
+            One score per member, aligned with indices
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=int)
+        if len(indices) == 1:
+            return np.ones(1, dtype=np.float32)
+
+        if self.dense is not None:
+            block = self.dense[np.ix_(indices, indices)]
+            return (block.sum(axis=1) - np.diag(block)) / (len(indices) - 1)
+
+        members = self.vectors[indices]
+        centroid = normalize_embeddings([members.mean(axis=0)])[0]
+        return members @ centroid
@@ -0,0 +1,126 @@
+"""Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call and
+its result instead of each paying for an identical API request. Nothing is
+cached: once a call completes, the next request for the key starts a new one.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark a shared call's error as seen; its awaiters still receive it.
+
+    A call outlives its callers (they await it shielded), so when every one
+    of them was cancelled nobody retrieves the error and asyncio would
+    report it as never retrieved.
+    """
+    if not future.cancelled():
+        future.exception()
+
+
+def flight_key(model: str, payload: Any) -> str:
+    """Build a coalescing key from the model and the request input.
+
+    Args:
+        model: Model name
+        payload: Request input (str or JSON-serializable structure)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    if not isinstance(payload, str):
+        payload = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{model}\x00{payload}".encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def _register(self, key: str, future: asyncio.Future) -> None:
+        """Track an in-flight future until it completes."""
+        self._calls[key] = future
+        future.add_done_callback(_retrieve_exception)
+
+        def _forget(done: asyncio.Future) -> None:
+            if self._calls.get(key) is done:
+                del self._calls[key]
+
+        future.add_done_callback(_forget)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory() unless a call for key is already in flight.
+
+        Args:
+            key: Coalescing key (see flight_key)
+            factory: Zero-argument coroutine function doing the actual call
+
+        Returns:
+            Result of the shared call
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._register(key, future)
+        else:
+            self.coalesced += 1
+        # Shielded so one cancelled caller does not cancel the call for everyone
+        return await asyncio.shield(future)
+
+    async def run_many(
+        self,
+        keys: List[str],
+        factory: Callable[[List[int]], Awaitable[List[Any]]]
+    ) -> List[Any]:
+        """Coalesce a batch call item by item.
+
+        Items already in flight (from another caller or repeated in this
+        batch) are awaited; the rest are fetched with a single factory call.
+
+        Args:
+            keys: One coalescing key per item
+            factory: Coroutine function receiving the positions this caller
+                must fetch and returning their results in that order
+
+        Returns:
+            Results aligned with keys
+        """
+        futures: List[Optional[asyncio.Future]] = [None] * len(keys)
+        own_positions: List[int] = []
+        own_keys: Dict[str, int] = {}
+
+        for pos, key in enumerate(keys):
+            if key in own_keys:
+                continue
+            existing = self._calls.get(key)
+            if existing is not None:
+                futures[pos] = existing
+                self.coalesced += 1
+            else:
+                own_keys[key] = pos
+                own_positions.append(pos)
+
+        if own_positions:
+            batch = asyncio.ensure_future(factory(own_positions))
+            batch.add_done_callback(_retrieve_exception)
+
+            async def pick(index: int) -> Any:
+                results = await asyncio.shield(batch)
+                return results[index]
+
+            for index, pos in enumerate(own_positions):
+                futures[pos] = asyncio.ensure_future(pick(index))
+                self._register(keys[pos], futures[pos])
+
+        for pos, key in enumerate(keys):
+            if futures[pos] is None:
+                futures[pos] = futures[own_keys[key]]
+
+        return list(await asyncio.gather(*(asyncio.shield(f) for f in futures)))
@@ -0,0 +1,138 @@
+"""Helpers for streamed LLM output.
+
+Completions can be streamed token by token (see ContentGenerator). Plain
+text responses are forwarded as they arrive; JSON responses are decoded
+incrementally so the text of their string fields can be forwarded before
+the object is complete.
+
+Streamed text is progress only: a call that fails mid-stream may already
+have emitted part of its text. The final value of each part is the one
+returned once the call completes.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Receives each digest event (see ContentGenerator.enrich_grouped_articles)
+EventCallback = Callable[[Dict[str, Any]], None]
+
+# Receives each chunk of streamed completion text
+TextCallback = Callable[[str], None]
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStream:
+    """Incremental decoder for the string fields of a streamed JSON object.
+
+    Only flat objects are expected ({"brief": "...", "narrative": "..."});
+    strings nested deeper are decoded as if they were top-level.
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        """Initialize the decoder.
+
+        Args:
+            fields: Keys whose string values are forwarded
+        """
+        self.fields = set(fields)
+        self._buffer = ""
+        self._in_string = False
+        self._is_key = True
+        self._key: Optional[str] = None
+        self._chars: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Consume a chunk of the JSON text.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            List of (field, text) decoded from this chunk, in order
+        """
+        self._buffer += chunk
+        out: List[Tuple[str, str]] = []
+        buffer = self._buffer
+        pos = 0
+
+        while pos < len(buffer):
+            char = buffer[pos]
+            if not self._in_string:
+                if char == '"':
+                    self._in_string = True
+                    self._chars = []
+                elif char in "{,":
+                    self._is_key = True
+                elif char == ":":
+                    self._is_key = False
+                pos += 1
+                continue
+
+            if char == '"':
+                self._in_string = False
+                if self._is_key:
+                    self._key = "".join(self._chars)
+                else:
+                    self._emit(out)
+                pos += 1
+                continue
+
+            if char == "\\":
+                decoded, consumed = self._unescape(buffer, pos)
+                if consumed == 0:
+                    # Escape split across chunks: wait for the rest
+                    break
+                self._chars.append(decoded)
+                pos += consumed
+                continue
+
+            self._chars.append(char)
+            pos += 1
+
+        if self._in_string and not self._is_key:
+            self._emit(out)
+
+        # Drop consumed input; keep an unfinished escape
+        self._buffer = buffer[pos:]
+        return out
+
+    def _emit(self, out: List[Tuple[str, str]]) -> None:
+        """Forward the value characters decoded so far, if the field is wanted."""
+        if self._chars and self._key in self.fields:
+            text = "".join(self._chars)
+            if out and out[-1][0] == self._key:
+                out[-1] = (self._key, out[-1][1] + text)
+            else:
+                out.append((self._key, text))
+        self._chars = []
+
+    @staticmethod
+    def _unescape(buffer: str, pos: int) -> Tuple[str, int]:
+        """Decode the escape sequence at pos.
+
+        Returns:
+            Tuple of (decoded text, characters consumed); 0 consumed if the
+            sequence is incomplete
+        """
+        if pos + 1 >= len(buffer):
+            return "", 0
+        kind = buffer[pos + 1]
+        if kind != "u":
+            return _ESCAPES.get(kind, kind), 2
+
+        if pos + 6 > len(buffer):
+            return "", 0
+        try:
+            code = int(buffer[pos + 2:pos + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # High surrogate: combine with the low half that follows
+                if pos + 12 > len(buffer):
+                    return "", 0
+                if buffer[pos + 6:pos + 8] == "\\u":
+                    low = int(buffer[pos + 8:pos + 12], 16)
+                    if 0xDC00 <= low < 0xE000:
+                        return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)), 12
+        except ValueError:
+            # Malformed escape: keep it as written
+            return buffer[pos:pos + 6], 6
+        return chr(code), 6
@@ -0,0 +1,139 @@
+"""Token counting and prompt packing.
+
+Prompts are sized in tokens rather than characters: items are added in
+order of importance until the prompt's input budget is spent, and each
+item is capped so one long summary cannot crowd out the rest. Counting
+uses the model's tokenizer when tiktoken is installed and a
+characters-per-token estimate otherwise, or when the tokenizer cannot be
+loaded (tiktoken downloads its files on first use, which fails offline).
+"""
+
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Estimate used without tiktoken (typical for English text)
+CHARS_PER_TOKEN = 4
+
+# Models whose encoding failed to load (the warning is logged once)
+_encoding_errors: List[str] = []
+
+# Per-item caps inside a prompt
+TITLE_MAX_TOKENS = 32
+SUMMARY_MAX_TOKENS = 96
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """Tokenizer for a model (the current default encoding if unknown).
+
+    Returns:
+        The encoding, or None if tiktoken is missing or cannot load it
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        if not _encoding_errors:
+            logger.warning(f"Cannot load the tiktoken encoding, estimating token counts instead: {e}")
+        _encoding_errors.append(model)
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Count the tokens of a text for a model.
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer to use
+
+    Returns:
+        Number of tokens (estimated if tiktoken is not available)
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+    """Cut a text down to at most max_tokens tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+        model: Model whose tokenizer to use
+
+    Returns:
+        The text, or its longest prefix within the limit
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens]).rstrip()
+    return text[:max_tokens * CHARS_PER_TOKEN].rstrip()
+
+
+def pack_items(
+    items: List[str],
+    budget: int,
+    model: str = "gpt-4o-mini",
+    separator: str = "\n",
+    max_items: Optional[int] = None
+) -> List[str]:
+    """Keep the leading items that fit in a token budget.
+
+    Items must already be ordered from most to least informative. Packing
+    stops at the first item that does not fit, so the kept items are always
+    a prefix (callers may rely on positions, e.g. numbered lists).
+
+    Args:
+        items: Formatted prompt items, most informative first
+        budget: Max tokens for the packed items, separators included
+        model: Model whose tokenizer to use
+        separator: String the items will be joined with
+        max_items: Optional cap on the number of items
+
+    Returns:
+        The items that fit (at least the first one, truncated if needed)
+    """
+    if max_items is not None:
+        items = items[:max_items]
+    if not items:
+        return []
+
+    separator_tokens = count_tokens(separator, model)
+    packed = []
+    used = 0
+    for item in items:
+        cost = count_tokens(item, model) + (separator_tokens if packed else 0)
+        if used + cost > budget:
+            break
+        packed.append(item)
+        used += cost
+
+    if not packed:
+        # Never send an empty prompt: keep what fits of the most informative item
+        packed = [truncate_to_tokens(items[0], budget, model)]
+
+    if len(packed) < len(items):
+        logger.debug(f"Packed {len(packed)}/{len(items)} items into {budget} tokens")
+    return packed
@@ -0,0 +1,257 @@
+"""Persistent topic centroids for incremental clustering.
+
+Topics survive between runs: new articles are assigned to the nearest
+known topic within a distance bound, and only the leftovers need to be
+clustered and named. Centroids are updated online, and topics that stop
+receiving articles lose weight over time until they are forgotten.
+
+A run works on a copy of the store; the copy replaces the saved topics
+only once the run's digest has been built (see
+EmbeddingsService.commit_topics).
+"""
+
+import copy
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.embeddings.clustering import normalize_embeddings
+from src.security import safe_log_error
+
+logger = logging.getLogger(__name__)
+
+
+class Topic:
+    """A named topic with a running centroid."""
+
+    def __init__(
+        self,
+        topic_id: int,
+        name: str,
+        centroid: List[float],
+        weight: float = 0.0,
+        last_updated: Optional[datetime] = None
+    ):
+        self.topic_id = topic_id
+        self.name = name
+        self.centroid = np.asarray(centroid, dtype=np.float32)
+        self.weight = weight
+        self.last_updated = last_updated or datetime.now()
+
+    def effective_weight(self, now: datetime, half_life_days: float) -> float:
+        """Weight after exponential decay since the last update."""
+        age_days = max((now - self.last_updated).total_seconds() / 86400, 0.0)
+        return self.weight * 0.5 ** (age_days / half_life_days)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert topic to a JSON-serializable dictionary."""
+        return {
+            "topic_id": self.topic_id,
+            "name": self.name,
+            "centroid": self.centroid.tolist(),
+            "weight": self.weight,
+            "last_updated": self.last_updated.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Topic":
+        """Build a topic from its dictionary form."""
+        return cls(
+            topic_id=data["topic_id"],
+            name=data["name"],
+            centroid=data["centroid"],
+            weight=data.get("weight", 0.0),
+            last_updated=datetime.fromisoformat(data["last_updated"]),
+        )
+
+
+class TopicStore:
+    """JSON-backed collection of topics with online centroid updates."""
+
+    def __init__(
+        self,
+        path: str,
+        max_distance: float = 0.35,
+        half_life_days: float = 7.0,
+        min_weight: float = 0.5
+    ):
+        """Initialize the store.
+
+        Args:
+            path: JSON file holding the topics
+            max_distance: Max cosine distance for assigning to an existing topic
+            half_life_days: Days for an idle topic's weight to halve
+            min_weight: Decayed weight below which a topic is forgotten
+        """
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.half_life_days = half_life_days
+        self.min_weight = min_weight
+        self.topics: Dict[int, Topic] = {}
+        self._next_id = 0
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "TopicStore":
+        """Load a store from disk (empty if the file does not exist)."""
+        store = cls(path, **kwargs)
+        if not store.path.exists():
+            return store
+
+        try:
+            store.restore(json.loads(store.path.read_text(encoding="utf-8")))
+            logger.info(f"Loaded {len(store.topics)} topics from {store.path}")
+        except Exception as e:
+            safe_log_error(logger, "Error loading topic store, starting empty", e)
+        return store
+
+    def copy(self) -> "TopicStore":
+        """Independent copy to stage a run's changes on."""
+        return copy.deepcopy(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the topics to a JSON-serializable dictionary."""
+        return {
+            "next_id": self._next_id,
+            "topics": [topic.to_dict() for topic in self.topics.values()],
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Replace the topics with those of a to_dict dictionary."""
+        self.topics = {}
+        for item in data.get("topics", []):
+            topic = Topic.from_dict(item)
+            self.topics[topic.topic_id] = topic
+        self._next_id = data.get("next_id", len(self.topics))
+
+    def save(self) -> None:
+        """Write the store to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def assign(
+        self,
+        articles: List[Dict[str, Any]]
+    ) -> Tuple[Dict[int, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Assign articles to the nearest topic within max_distance.
+
+        Args:
+            articles: Articles with 'embedding'
+
+        Returns:
+            Tuple of (topic_id -> assigned articles, leftover articles)
+        """
+        if not self.topics or not articles:
+            return {}, list(articles)
+
+        topic_ids = list(self.topics)
+        centroids = np.vstack([self.topics[tid].centroid for tid in topic_ids])
+        vectors = normalize_embeddings([a["embedding"] for a in articles])
+
+        similarities = vectors @ centroids.T
+        best = np.argmax(similarities, axis=1)
+        best_similarity = similarities[np.arange(len(articles)), best]
+
+        assigned: Dict[int, List[Dict[str, Any]]] = {}
+        leftovers = []
+        for article, idx, similarity in zip(articles, best, best_similarity):
+            if 1.0 - similarity <= self.max_distance:
+                assigned.setdefault(topic_ids[idx], []).append(article)
+            else:
+                leftovers.append(article)
+
+        logger.info(
+            f"Assigned {len(articles) - len(leftovers)} articles to "
+            f"{len(assigned)} known topics, {len(leftovers)} left over"
+        )
+        return assigned, leftovers
+
+    def nearest(
+        self,
+        articles: List[Dict[str, Any]],
+        topic_ids: List[int]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Group articles under the closest of the given topics, at any distance.
+
+        Args:
+            articles: Articles with 'embedding'
+            topic_ids: Candidate topics
+
+        Returns:
+            Dictionary topic_id -> articles
+        """
+        if not articles or not topic_ids:
+            return {}
+
+        centroids = np.vstack([self.topics[tid].centroid for tid in topic_ids])
+        vectors = normalize_embeddings([a["embedding"] for a in articles])
+        best = np.argmax(vectors @ centroids.T, axis=1)
+
+        grouped: Dict[int, List[Dict[str, Any]]] = {}
+        for article, idx in zip(articles, best):
+            grouped.setdefault(topic_ids[idx], []).append(article)
+        return grouped
+
+    def update(
+        self,
+        topic_id: int,
+        articles: List[Dict[str, Any]],
+        now: Optional[datetime] = None
+    ) -> Topic:
+        """Fold new articles into a topic's centroid.
+
+        The decayed weight of the old centroid is combined with the new
+        vectors, so idle topics move faster toward fresh coverage.
+        """
+        now = now or datetime.now()
+        topic = self.topics[topic_id]
+        vectors = normalize_embeddings([a["embedding"] for a in articles])
+
+        weight = topic.effective_weight(now, self.half_life_days)
+        combined = topic.centroid * weight + vectors.sum(axis=0)
+        topic.centroid = normalize_embeddings([combined])[0]
+        topic.weight = weight + len(articles)
+        topic.last_updated = now
+        return topic
+
+    def add_topic(
+        self,
+        name: str,
+        articles: List[Dict[str, Any]],
+        now: Optional[datetime] = None
+    ) -> Topic:
+        """Create a topic from a freshly clustered group of articles."""
+        vectors = normalize_embeddings([a["embedding"] for a in articles])
+        topic = Topic(
+            topic_id=self._next_id,
+            name=name,
+            centroid=normalize_embeddings([vectors.mean(axis=0)])[0],
+            weight=float(len(articles)),
+            last_updated=now or datetime.now(),
+        )
+        self.topics[topic.topic_id] = topic
+        self._next_id += 1
+        return topic
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Forget topics whose decayed weight fell below min_weight.
+
+        Returns:
+            Number of topics removed
+        """
+        now = now or datetime.now()
+        stale = [
+            topic_id for topic_id, topic in self.topics.items()
+            if topic.effective_weight(now, self.half_life_days) < self.min_weight
+        ]
+        for topic_id in stale:
+            del self.topics[topic_id]
+        if stale:
+            logger.info(f"Forgot {len(stale)} stale topics")
+        return len(stale)
@@ -0,0 +1,16 @@
+"""Local stand-in for the OpenAI API.
+
+Implements the endpoints the aggregator uses (embeddings, chat
+completions, files and batches), with deterministic responses, so the
+pipeline can be tested and benchmarked offline:
+
+    python -m src.mock_openai.server --latency 0.05 --error-rate 0.05 --rpm 60
+
+then point the aggregator at it with OPENAI_BASE_URL=http://localhost:8001/v1.
+See python -m src.mock_openai.server --help for latency, error and rate
+limit options.
+"""
+
+from src.mock_openai.server import app, create_app
+
+__all__ = ["app", "create_app"]
@@ -0,0 +1,490 @@
+"""OpenAI-compatible stand-in server.
+
+Serves embeddings, chat completions (plain or streamed), file uploads and
+Batch API jobs from memory. Responses are derived from the request:
+embeddings are feature-hashed bags of words, so texts sharing words get
+similar vectors, and JSON prompts get JSON with the shape the prompt asks
+for. Repeated runs give identical output.
+
+For benchmarks, the embeddings and chat endpoints can add latency, inject
+server errors and 429s at a seeded rate, and enforce per-minute request
+and token limits, reporting them in x-ratelimit-* headers like the API.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8001
+
+# Vector size of text-embedding-ada-002, used unless the request asks for 'dimensions'
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+
+# Sliding window of the per-minute limits, in seconds
+RATE_LIMIT_WINDOW = 60.0
+
+# Words hashed into embedding dimensions
+_WORD = re.compile(r"\w+")
+
+# Numbered items in a user prompt ("1. Title")
+_NUMBERED_ITEM = re.compile(r"^(\d+)\. ", re.MULTILINE)
+
+# Pieces of a streamed completion: words with their trailing whitespace
+_STREAM_PIECE = re.compile(r"\S+\s*|\s+")
+
+
+def _approx_tokens(text: str) -> int:
+    """Rough token count for usage reporting."""
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """Deterministic unit vector for a text.
+
+    Each lowercase word adds +-1 to a dimension picked by its hash, so the
+    cosine similarity of two texts follows their word overlap.
+
+    Args:
+        text: Input text
+        dimensions: Vector size
+
+    Returns:
+        Unit-length float32 vector
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in _WORD.findall(text.lower()) or [text]:
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        # Words cancelled out: fall back to a single hashed dimension
+        vector[int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16) % dimensions] = 1.0
+        return vector
+    return vector / norm
+
+
+def embedding_response(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an embeddings response object for a request body."""
+    inputs = body.get("input", "")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dimensions = body.get("dimensions") or DEFAULT_EMBEDDING_DIMENSIONS
+    as_base64 = body.get("encoding_format") == "base64"
+
+    data = []
+    for index, text in enumerate(inputs):
+        vector = fake_embedding(str(text), dimensions)
+        if as_base64:
+            embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+        else:
+            embedding = vector.tolist()
+        data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+    tokens = sum(_approx_tokens(str(text)) for text in inputs)
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model", "text-embedding-ada-002"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+def _error(status_code: int, message: str, error_type: str, headers: Dict[str, str]) -> JSONResponse:
+    """Error response in the API's format."""
+    code = "rate_limit_exceeded" if status_code == 429 else error_type
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": code}},
+        headers=headers,
+    )
+
+
+def _duration(seconds: float) -> str:
+    """Format a reset time like the x-ratelimit-reset-* headers ("1.5s")."""
+    return f"{max(seconds, 0.0):.3f}s"
+
+
+class RateLimiter:
+    """Per-minute request and token limits over a sliding window.
+
+    A limit of 0 disables it.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        # (admission time, tokens) of requests inside the window
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._tokens = 0
+
+    def acquire(self, tokens: int, now: Optional[float] = None) -> Tuple[bool, Dict[str, str]]:
+        """Admit a request if it fits both limits.
+
+        Args:
+            tokens: Tokens the request counts against the limit
+            now: Current time in monotonic seconds (defaults to now)
+
+        Returns:
+            Tuple of (admitted, x-ratelimit-* headers, plus retry-after-ms
+            when refused)
+        """
+        now = time.monotonic() if now is None else now
+        while self._window and now - self._window[0][0] >= RATE_LIMIT_WINDOW:
+            self._tokens -= self._window.popleft()[1]
+
+        over_requests = bool(self.requests_per_minute) and len(self._window) >= self.requests_per_minute
+        over_tokens = bool(self.tokens_per_minute) and self._tokens + tokens > self.tokens_per_minute
+        admitted = not (over_requests or over_tokens)
+        if admitted:
+            self._window.append((now, tokens))
+            self._tokens += tokens
+
+        # Time until the oldest request leaves the window and frees capacity
+        reset = RATE_LIMIT_WINDOW - (now - self._window[0][0]) if self._window else 0.0
+        headers = {}
+        if self.requests_per_minute:
+            headers["x-ratelimit-limit-requests"] = str(self.requests_per_minute)
+            headers["x-ratelimit-remaining-requests"] = str(max(self.requests_per_minute - len(self._window), 0))
+            headers["x-ratelimit-reset-requests"] = _duration(reset)
+        if self.tokens_per_minute:
+            headers["x-ratelimit-limit-tokens"] = str(self.tokens_per_minute)
+            headers["x-ratelimit-remaining-tokens"] = str(max(self.tokens_per_minute - self._tokens, 0))
+            headers["x-ratelimit-reset-tokens"] = _duration(reset)
+        if not admitted:
+            headers["retry-after-ms"] = str(int(reset * 1000))
+        return admitted, headers
+
+
+def fake_content(body: Dict[str, Any]) -> str:
+    """Deterministic completion text for a chat completion request.
+
+    Args:
+        body: Chat completion request body
+
+    Returns:
+        JSON shaped after the system prompt's example for JSON requests,
+        plain text otherwise
+    """
+    messages = body.get("messages") or []
+    system = messages[0].get("content", "") if messages else ""
+    user = messages[-1].get("content", "") if messages else ""
+    digest = hashlib.sha256(user.encode("utf-8")).hexdigest()[:6]
+
+    if (body.get("response_format") or {}).get("type") != "json_object":
+        return f"Mock response {digest}"
+
+    indexes = [int(n) for n in _NUMBERED_ITEM.findall(user)]
+    if '"summaries"' in system:
+        return json.dumps({"summaries": [
+            {"index": i, "tldr": f"Mock TL;DR of article {i} ({digest})."} for i in indexes
+        ]})
+    if '"selections"' in system:
+        return json.dumps({"selections": [
+            {"index": i, "reason": "Mock selection reason."} for i in indexes[:3]
+        ]})
+    if '"brief"' in system:
+        return json.dumps({
+            "brief": f"Mock brief {digest}.",
+            "narrative": f"Mock narrative {digest}.",
+        })
+    return "{}"
+
+
+def _usage(body: Dict[str, Any], content: str) -> Dict[str, int]:
+    """Approximate token usage of a completion."""
+    prompt = "".join(m.get("content", "") for m in body.get("messages") or [])
+    prompt_tokens, completion_tokens = _approx_tokens(prompt), _approx_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a chat completion response object for a request body."""
+    content = fake_content(body)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": _usage(body, content),
+    }
+
+
+async def chat_completion_chunks(body: Dict[str, Any], token_latency: float = 0.0) -> AsyncIterator[str]:
+    """Server-sent events of a streamed chat completion, one word per chunk.
+
+    Args:
+        body: Chat completion request body
+        token_latency: Seconds before each chunk
+    """
+    content = fake_content(body)
+    base = {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+    }
+
+    def event(choices: List[Dict[str, Any]], **extra: Any) -> str:
+        return f"data: {json.dumps({**base, 'choices': choices, **extra})}\n\n"
+
+    yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+    for piece in _STREAM_PIECE.findall(content):
+        if token_latency:
+            await asyncio.sleep(token_latency)
+        yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+    yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield event([], usage=_usage(body, content))
+    yield "data: [DONE]\n\n"
+
+
+def create_app(
+    batch_delay: float = 0.0,
+    latency: float = 0.0,
+    token_latency: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+    seed: int = 0
+) -> FastAPI:
+    """Create a stand-in server with its own in-memory state.
+
+    Latency, injected errors and limits apply to the embeddings and chat
+    completions endpoints.
+
+    Args:
+        batch_delay: Seconds before a submitted batch job reports completion
+        latency: Seconds added to every request
+        token_latency: Seconds per generated word (between chunks when
+            streaming)
+        error_rate: Share of requests answered with a 500 error
+        rate_limit_rate: Share of requests answered with a 429 error
+        requests_per_minute: Request limit (0 for none)
+        tokens_per_minute: Prompt token limit (0 for none)
+        seed: Seed of the error injection, for reproducible runs
+
+    Returns:
+        FastAPI application; app.state.stats counts requests served and
+        refused
+    """
+    app = FastAPI(title="Mock OpenAI API")
+    files: Dict[str, Dict[str, Any]] = {}
+    contents: Dict[str, bytes] = {}
+    batches: Dict[str, Dict[str, Any]] = {}
+    app.state.stats = {
+        "chat_completions": 0,
+        "embeddings": 0,
+        "batch_requests": 0,
+        "server_errors": 0,
+        "rate_limited": 0,
+    }
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    rng = random.Random(seed)
+
+    async def admit(tokens: int) -> Tuple[Optional[JSONResponse], Dict[str, str]]:
+        """Apply latency, limits and injected errors to a request.
+
+        Returns:
+            Tuple of (error response or None, rate limit headers)
+        """
+        if latency:
+            await asyncio.sleep(latency)
+        admitted, headers = limiter.acquire(tokens)
+        if not admitted:
+            app.state.stats["rate_limited"] += 1
+            return _error(429, "Rate limit reached", "requests", headers), headers
+        draw = rng.random()
+        if draw < rate_limit_rate:
+            app.state.stats["rate_limited"] += 1
+            return _error(429, "Rate limit reached (injected)", "requests", {**headers, "retry-after-ms": "100"}), headers
+        if draw < rate_limit_rate + error_rate:
+            app.state.stats["server_errors"] += 1
+            return _error(500, "The server had an error (injected)", "server_error", headers), headers
+        return None, headers
+
+    def store_file(filename: str, purpose: str, data: bytes) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        files[file_id] = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(data),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        contents[file_id] = data
+        return files[file_id]
+
+    def run_batch(batch: Dict[str, Any]) -> None:
+        """Answer every request of a batch and attach the output file."""
+        lines: List[str] = []
+        for line in contents[batch["input_file_id"]].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            app.state.stats["batch_requests"] += 1
+            lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": chat_completion(request["body"]),
+                },
+                "error": None,
+            }))
+
+        output = store_file(f"{batch['id']}_output.jsonl", "batch_output", "\n".join(lines).encode("utf-8"))
+        now = int(time.time())
+        batch.update({
+            "status": "completed",
+            "output_file_id": output["id"],
+            "in_progress_at": batch["created_at"],
+            "finalizing_at": now,
+            "completed_at": now,
+            "request_counts": {"total": len(lines), "completed": len(lines), "failed": 0},
+        })
+
+    @app.post("/v1/chat/completions")
+    async def create_chat_completion(body: Dict[str, Any]):
+        prompt = "".join(m.get("content", "") for m in body.get("messages") or [])
+        refused, headers = await admit(_approx_tokens(prompt))
+        if refused is not None:
+            return refused
+        app.state.stats["chat_completions"] += 1
+        if body.get("stream"):
+            return StreamingResponse(
+                chat_completion_chunks(body, token_latency),
+                media_type="text/event-stream",
+                headers=headers
+            )
+        response = chat_completion(body)
+        if token_latency:
+            words = _STREAM_PIECE.findall(response["choices"][0]["message"]["content"])
+            await asyncio.sleep(token_latency * len(words))
+        return JSONResponse(response, headers=headers)
+
+    @app.post("/v1/embeddings")
+    async def create_embeddings(body: Dict[str, Any]):
+        inputs = body.get("input", "")
+        texts = [inputs] if isinstance(inputs, str) else inputs
+        refused, headers = await admit(sum(_approx_tokens(str(text)) for text in texts))
+        if refused is not None:
+            return refused
+        app.state.stats["embeddings"] += 1
+        return JSONResponse(embedding_response(body), headers=headers)
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        return store_file(file.filename or "upload.jsonl", purpose, await file.read())
+
+    @app.get("/v1/files/{file_id}")
+    async def retrieve_file(file_id: str):
+        if file_id not in files:
+            raise HTTPException(status_code=404, detail="File not found")
+        return files[file_id]
+
+    @app.get("/v1/files/{file_id}/content", response_class=PlainTextResponse)
+    async def file_content(file_id: str):
+        if file_id not in contents:
+            raise HTTPException(status_code=404, detail="File not found")
+        return contents[file_id].decode("utf-8")
+
+    @app.post("/v1/batches")
+    async def create_batch(body: Dict[str, Any]):
+        input_file_id = body.get("input_file_id")
+        if input_file_id not in contents:
+            raise HTTPException(status_code=400, detail="Unknown input_file_id")
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body.get("endpoint", "/v1/chat/completions"),
+            "input_file_id": input_file_id,
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "metadata": body.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        return batches[batch_id]
+
+    @app.get("/v1/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str):
+        batch = batches.get(batch_id)
+        if batch is None:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= batch_delay:
+            run_batch(batch)
+        return batch
+
+    return app
+
+
+app = create_app()
+
+
+def main() -> None:
+    """Run the stand-in server from the command line."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per generated word")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests refused with 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute limit (0 for none)")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens per minute limit (0 for none)")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="Seconds before batch jobs complete")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the error injection")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(
+            batch_delay=args.batch_delay,
+            latency=args.latency,
+            token_latency=args.token_latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            seed=args.seed
+        ),
+        host=args.host,
+        port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
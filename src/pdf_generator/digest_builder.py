@@ -0,0 +1,139 @@
+"""Incremental assembly of enriched digests.
+
+Enrichment reports each part of a digest as soon as it is generated (see
+ContentGenerator.enrich_grouped_articles). DigestBuilder renders each topic
+section to HTML and markdown as it arrives, so when the last part completes
+only the page frame is left before PDF rendering. Progress is forwarded to
+an optional listener, e.g. a streaming API response.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from src.pdf_generator.pdf_service import PDFGenerator
+
+logger = logging.getLogger(__name__)
+
+# Article fields included in events forwarded to listeners
+_PUBLIC_ARTICLE_FIELDS = ("title", "url", "source", "published_date", "selection_reason", "tldr")
+
+
+def _public_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Article fields safe and small enough to send to clients."""
+    return {key: article[key] for key in _PUBLIC_ARTICLE_FIELDS if article.get(key) is not None}
+
+
+class DigestBuilder:
+    """Collects digest parts as they are generated and renders sections early."""
+
+    def __init__(
+        self,
+        topics: List[str],
+        pdf_generator: PDFGenerator,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """Initialize the builder.
+
+        Args:
+            topics: Topic names in digest order
+            pdf_generator: Renders the sections
+            on_event: Receives progress events with client-safe article
+                fields (text chunks, summary, sections with their markdown,
+                top articles)
+        """
+        self.topics = list(topics)
+        self.pdf_generator = pdf_generator
+        self.on_event = on_event
+        self.executive_summary: Optional[str] = None
+        self.top_articles: Optional[List[Dict[str, Any]]] = None
+        self._sections: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def pending_topics(self) -> List[str]:
+        """Topics whose section has not arrived yet."""
+        return [topic for topic in self.topics if topic not in self._sections]
+
+    def handle(self, event: Dict[str, Any]) -> None:
+        """Consume one enrichment event (see ContentGenerator.enrich_grouped_articles)."""
+        kind = event.get("type")
+        if kind == "text":
+            self._forward(event)
+        elif kind == "executive_summary":
+            self.executive_summary = event.get("text")
+            self._forward({"type": "executive_summary", "text": self.executive_summary})
+        elif kind == "top_articles":
+            self.top_articles = event.get("articles") or []
+            self._forward({
+                "type": "top_articles",
+                "articles": [_public_article(article) for article in self.top_articles],
+            })
+        elif kind == "section":
+            self._add_section(event["topic"], event["section"])
+
+    def _add_section(self, topic: str, section: Dict[str, Any]) -> None:
+        """Render a finished section and report it."""
+        if topic not in self.topics:
+            self.topics.append(topic)
+        index = self.topics.index(topic)
+
+        entry = {
+            "topic_name": topic,
+            "articles": section.get("articles", []),
+            "brief": section.get("brief"),
+            "narrative": section.get("narrative"),
+        }
+        entry["markdown"] = self.pdf_generator.render_markdown_topic_section(entry)
+        entry["html"] = self.pdf_generator.render_html_topic_section(entry, index)
+        self._sections[topic] = entry
+
+        self._forward({
+            "type": "section",
+            "topic": topic,
+            "index": index,
+            "brief": entry["brief"],
+            "narrative": entry["narrative"],
+            "markdown": entry["markdown"],
+            "articles": [_public_article(article) for article in entry["articles"]],
+        })
+        logger.info(f"Digest section ready: {topic} ({len(self.pending_topics)} pending)")
+
+    def _forward(self, event: Dict[str, Any]) -> None:
+        """Pass an event to the listener; listener errors never stop the digest."""
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.warning(f"Digest event listener failed: {type(e).__name__}")
+
+    def finish(self, enriched: Dict[str, Any]) -> Dict[str, Any]:
+        """Complete the digest from the final enrichment result.
+
+        Sections that were not reported are rendered now; section articles
+        are taken from the result, which carries their TL;DRs.
+
+        Args:
+            enriched: Result of enrich_grouped_articles
+
+        Returns:
+            The enriched data plus 'topics', the list of sections in digest
+            order expected by PDFGenerator.generate_pdf_enriched
+        """
+        sections = enriched.get("sections", {})
+        if self.executive_summary is None and enriched.get("executive_summary"):
+            self.handle({"type": "executive_summary", "text": enriched["executive_summary"]})
+        if self.top_articles is None:
+            self.handle({"type": "top_articles", "articles": enriched.get("top_articles", [])})
+        for topic, section in sections.items():
+            if topic not in self._sections:
+                self._add_section(topic, section)
+
+        topics = []
+        for topic in self.topics:
+            if topic not in self._sections:
+                continue
+            entry = dict(self._sections[topic])
+            if topic in sections:
+                entry["articles"] = sections[topic].get("articles", entry["articles"])
+            topics.append(entry)
+        return {**enriched, "topics": topics}
@@ -20,6 +20,12 @@ from src.config import settings
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Topic colors for visual distinction
+TOPIC_COLORS = [
+    "#3498db", "#e74c3c", "#2ecc71", "#9b59b6",
+    "#f39c12", "#1abc9c", "#e67e22", "#34495e"
+]
+
 
 def sanitize_text(text: str, max_length: int = 10000) -> str:
     """Sanitize text content to prevent XSS attacks.
@@ -208,7 +214,8 @@ class PDFGenerator:
         Optimized for NotebookLM podcast generation with narrative-first structure.
 
         Args:
-            enriched_data: Dict with 'executive_summary', 'top_articles', and 'topics'
+            enriched_data: Dict with 'executive_summary', 'top_articles', and 'topics';
+                topics may carry a pre-rendered 'markdown' section (see DigestBuilder)
             title: Optional title for the document
         """
         title = title or settings.pdf_title
@@ -236,9 +243,9 @@ class PDFGenerator:
             md_content += "Before diving into the details, here are the three stories that deserve your immediate attention this week.\n\n"
             for idx, article in enumerate(top_articles, 1):
                 title_text = article.get('title', 'No Title')
-                reason = article.get('relevance_reason', '')
+                reason = article.get('selection_reason', '')
                 source = article.get('source', 'Unknown')
-                content = article.get('content', '')[:300]
+                content = article.get('tldr') or article.get('content', '')[:300]
 
                 md_content += f"**{idx}. {title_text}**\n\n"
                 if reason:
@@ -259,28 +266,7 @@ class PDFGenerator:
 
         # Generate narrative content for each topic
         for topic in topics:
-            topic_name = topic["topic_name"]
-            narrative = topic.get("narrative", "")
-            brief = topic.get("brief", "")
-            articles = topic["articles"]
-
-            md_content += f"## {topic_name}\n\n"
-
-            # Main narrative (this is the key content for NotebookLM)
-            if narrative:
-                md_content += f"{narrative}\n\n"
-            elif brief:
-                md_content += f"{brief}\n\n"
-
-            # Sources section (compact, for reference)
-            md_content += "**Sources for this section:**\n\n"
-            for article in articles:
-                title_text = article.get('title', 'No Title')
-                source = article.get('source', 'Unknown')
-                url = article.get('url', '#')
-                md_content += f"- [{title_text}]({url}) — *{source}*\n"
-
-            md_content += "\n---\n\n"
+            md_content += topic.get("markdown") or self.render_markdown_topic_section(topic)
 
         # Closing
         md_content += "## Wrapping Up\n\n"
@@ -290,6 +276,31 @@ class PDFGenerator:
         md_content += "*This briefing was automatically generated and curated for tech consultants.*\n"
 
         return md_content
+
+    def render_markdown_topic_section(self, topic: Dict[str, Any]) -> str:
+        """Generate the markdown of one topic section: narrative and sources.
+
+        Args:
+            topic: Dict with 'topic_name', 'articles' and optional 'narrative'
+                and 'brief'
+        """
+        md_content = f"## {topic['topic_name']}\n\n"
+
+        # Main narrative (this is the key content for NotebookLM)
+        narrative = topic.get("narrative") or topic.get("brief")
+        if narrative:
+            md_content += f"{narrative}\n\n"
+
+        # Sources section (compact, for reference)
+        md_content += "**Sources for this section:**\n\n"
+        for article in topic["articles"]:
+            title_text = article.get('title', 'No Title')
+            source = article.get('source', 'Unknown')
+            url = article.get('url', '#')
+            md_content += f"- [{title_text}]({url}) — *{source}*\n"
+
+        md_content += "\n---\n\n"
+        return md_content
     
     def generate_html(self, markdown_content: str) -> str:
         """Convert markdown to HTML with styling."""
@@ -391,7 +402,8 @@ class PDFGenerator:
         """Generate visually rich HTML with badges, cards, and better hierarchy.
 
         Optimized for PDF generation with visual aids for easier reading.
-        All dynamic content is sanitized to prevent XSS attacks.
+        All dynamic content is sanitized to prevent XSS attacks. Topics may
+        carry a pre-rendered 'html' section (see DigestBuilder).
         """
         # Sanitize title
         title = sanitize_text(title or settings.pdf_title, max_length=200)
@@ -401,12 +413,6 @@ class PDFGenerator:
         topics = enriched_data.get("topics", [])
         total_articles = sum(len(t["articles"]) for t in topics)
 
-        # Topic colors for visual distinction
-        topic_colors = [
-            "#3498db", "#e74c3c", "#2ecc71", "#9b59b6",
-            "#f39c12", "#1abc9c", "#e67e22", "#34495e"
-        ]
-
         html = f"""
 <!DOCTYPE html>
 <html>
@@ -781,9 +787,11 @@ class PDFGenerator:
 
                 # Sanitize all dynamic content
                 title_text = sanitize_text(article.get('title', 'No Title'), max_length=300)
-                reason = sanitize_text(article.get('relevance_reason', ''), max_length=500)
+                reason = sanitize_text(article.get('selection_reason', ''), max_length=500)
                 source = sanitize_text(article.get('source', 'Unknown'), max_length=100)
-                content = sanitize_text(article.get('content', '')[:250], max_length=300)
+                # LLM TL;DR when available, else the start of the raw feed content
+                tldr = article.get('tldr')
+                content = sanitize_text(tldr or article.get('content', '')[:250] + "...", max_length=300)
 
                 html += f"""
     <div class="must-read-card {card_class}">
@@ -792,7 +800,7 @@ class PDFGenerator:
         <div class="why-matters">
             <strong>Why it matters:</strong> {reason}
         </div>
-        <p style="font-size: 10pt; color: #4a5568; margin: 10px 0;">{content}...</p>
+        <p style="font-size: 10pt; color: #4a5568; margin: 10px 0;">{content}</p>
         <div style="font-size: 9pt; color: #718096;">Source: {source}</div>
     </div>
 """
@@ -806,7 +814,7 @@ class PDFGenerator:
     <div class="topics-grid">
 """
         for idx, topic in enumerate(topics):
-            color = topic_colors[idx % len(topic_colors)]
+            color = TOPIC_COLORS[idx % len(TOPIC_COLORS)]
             topic_name = sanitize_text(topic.get("topic_name", "Topic"), max_length=100)
             count = len(topic.get("articles", []))
             html += f'        <span class="topic-pill" style="background: {color};">{topic_name} ({count})</span>\n'
@@ -815,12 +823,34 @@ class PDFGenerator:
 
         # Topic sections with narratives
         for idx, topic in enumerate(topics):
-            color = topic_colors[idx % len(topic_colors)]
-            topic_name = sanitize_text(topic.get("topic_name", "Topic"), max_length=100)
-            narrative = text_to_paragraphs(topic.get("narrative", ""))
-            articles = topic.get("articles", [])
+            html += topic.get("html") or self.render_html_topic_section(topic, idx)
 
-            html += f"""
+        # Footer
+        html += f"""
+    <div class="footer">
+        <h3>That's Your Briefing</h3>
+        <p>Stay informed, stay ahead. Use these insights to deliver more value to your clients.</p>
+        <p style="margin-top: 10px; font-size: 9pt;">Auto-generated tech intelligence • {datetime.now().strftime('%B %d, %Y')}</p>
+    </div>
+</body>
+</html>
+"""
+        return html
+
+    def render_html_topic_section(self, topic: Dict[str, Any], index: int) -> str:
+        """Generate the HTML of one topic section: narrative and sources.
+
+        Args:
+            topic: Dict with 'topic_name', 'articles' and optional 'narrative'
+                and 'brief'
+            index: Position of the topic in the digest (picks its color)
+        """
+        color = TOPIC_COLORS[index % len(TOPIC_COLORS)]
+        topic_name = sanitize_text(topic.get("topic_name", "Topic"), max_length=100)
+        narrative = text_to_paragraphs(topic.get("narrative") or topic.get("brief") or "")
+        articles = topic.get("articles", [])
+
+        html = f"""
     <div class="topic-section">
         <div class="topic-header">
             <span class="topic-badge" style="background: {color};">{topic_name}</span>
@@ -834,29 +864,18 @@ class PDFGenerator:
         <div class="sources-section">
             <div class="sources-title">📎 Sources</div>
 """
-            for article in articles:
-                # Sanitize all article data
-                a_title = sanitize_text(article.get('title', 'No Title'), max_length=300)
-                a_source = sanitize_text(article.get('source', 'Unknown'), max_length=100)
-                a_url = sanitize_url(article.get('url', '#'))
-                html += f"""            <div class="source-item">
+        for article in articles:
+            # Sanitize all article data
+            a_title = sanitize_text(article.get('title', 'No Title'), max_length=300)
+            a_source = sanitize_text(article.get('source', 'Unknown'), max_length=100)
+            a_url = sanitize_url(article.get('url', '#'))
+            html += f"""            <div class="source-item">
                 <span class="source-bullet">•</span>
                 <a href="{a_url}">{a_title}</a>
                 <span class="source-tag">{a_source}</span>
             </div>
 """
-            html += "        </div>\n    </div>\n"
-
-        # Footer
-        html += f"""
-    <div class="footer">
-        <h3>That's Your Briefing</h3>
-        <p>Stay informed, stay ahead. Use these insights to deliver more value to your clients.</p>
-        <p style="margin-top: 10px; font-size: 9pt;">Auto-generated tech intelligence • {datetime.now().strftime('%B %d, %Y')}</p>
-    </div>
-</body>
-</html>
-"""
+        html += "        </div>\n    </div>\n"
         return html
     
     def generate_pdf(
@@ -5,7 +5,7 @@ import feedparser
 import ipaddress
 import requests
 import socket
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime
 from urllib.parse import urlparse
 import logging
@@ -217,7 +217,8 @@ class NewsScraper:
             return articles
 
         try:
-            feed = feedparser.parse(feed_url)
+            # feedparser is blocking; keep the event loop free for other feeds
+            feed = await asyncio.to_thread(feedparser.parse, feed_url)
 
             for entry in feed.entries[:10]:  # Limit to 10 recent articles
                 title = entry.get("title", "No Title")
@@ -321,6 +322,41 @@ class NewsScraper:
         logger.info(f"Total articles scraped: {len(all_articles)}")
         return all_articles
 
+    async def iter_all_sources(
+        self,
+        sources: Optional[List[str]] = None
+    ) -> AsyncIterator[List[Article]]:
+        """Scrape all configured news sources, yielding each feed as it finishes.
+
+        Args:
+            sources: Optional list of RSS feed URLs (defaults to configured sources)
+
+        Yields:
+            Articles of one feed, in completion order
+        """
+        if sources is None:
+            sources = settings.get_news_sources()
+
+        if not sources:
+            logger.warning("No news sources configured")
+            return
+
+        logger.info(f"Streaming {len(sources)} news sources")
+
+        tasks = [asyncio.ensure_future(self.scrape_rss_feed(source)) for source in sources]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    articles = await next_done
+                except Exception as e:
+                    logger.error(f"Error in scraping task: {e}")
+                    continue
+                if articles:
+                    yield articles
+        finally:
+            for task in tasks:
+                task.cancel()
+
 
 async def main():
     """Test the scraper."""
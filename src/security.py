@@ -82,6 +82,8 @@ def get_safe_error_detail(error: Exception) -> str:
         Generic error message without sensitive details
     """
     error_type = type(error).__name__
+    if getattr(error, "code", None) == "insufficient_quota":
+        return "API quota exhausted. Please check your plan and billing details."
     
     # Map common errors to user-friendly messages
     error_messages = {
@@ -131,8 +133,9 @@ LLM_INJECTION_PATTERNS = [
     r"\[/INST\]",
     r"###\s*(System|User|Assistant)",
     
-    # System revelation attempts
-    r"(what|reveal|show|tell).*(system\s+prompt|instructions)",
+    # System revelation attempts (a keyword, then a target later on the same
+    # line; the atomic group keeps the scan linear on long lines)
+    r"^(?>[^\n]*?(?:what|reveal|show|tell))[^\n]*(?:system\s+prompt|instructions)",
     r"print\s+(your|the)\s+(prompt|instructions)",
     
     # Shell/code commands
@@ -143,18 +146,29 @@ LLM_INJECTION_PATTERNS = [
     r"os\.(system|popen|exec)",
 ]
 
-# Compilar patrones para eficiencia
-_COMPILED_INJECTION_PATTERNS = [
-    re.compile(pattern, re.IGNORECASE) 
-    for pattern in LLM_INJECTION_PATTERNS
-]
+# One alternation instead of a regex per pattern: a single scan finds any of them
+_INJECTION_REGEX = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in LLM_INJECTION_PATTERNS),
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Longest text sent to the LLM; anything beyond it is cut before scanning
+MAX_LLM_TEXT_LENGTH = 10000
+
+# Control characters (except tab, newline and carriage return) and invisible
+# unicode characters that could hide injections, deleted via str.translate
+_STRIP_CHARACTERS = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f,
+     *range(0x200b, 0x2010), *range(0x2028, 0x2030), *range(0x2060, 0x2070)]
+)
 
 
 def sanitize_text_for_llm(text: str) -> str:
     """Sanitize text before sending to LLM.
     
     Cleans text of potential injection attempts while
-    preserving legitimate content.
+    preserving legitimate content. Text is truncated first, so
+    oversized inputs are never processed in full.
     
     Args:
         text: Text to sanitize
@@ -165,19 +179,19 @@ def sanitize_text_for_llm(text: str) -> str:
     if not text:
         return ""
     
-    # Remove control characters except newlines and tabs
-    sanitized = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
+    # Limit length to prevent context attacks
+    truncated = len(text) > MAX_LLM_TEXT_LENGTH
+    if truncated:
+        text = text[:MAX_LLM_TEXT_LENGTH]
+    
+    # Remove control and invisible characters in one pass
+    sanitized = text.translate(_STRIP_CHARACTERS)
     
     # Escape delimiters that could confuse the LLM
     sanitized = sanitized.replace("```", "'''")
     
-    # Remove invisible unicode characters that could hide injections
-    sanitized = re.sub(r'[\u200b-\u200f\u2028-\u202f\u2060-\u206f]', '', sanitized)
-    
-    # Limit length to prevent context attacks
-    max_length = 10000
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length] + "... [truncated for length]"
+    if truncated:
+        sanitized += "... [truncated for length]"
     
     return sanitized.strip()
 
@@ -201,6 +215,41 @@ def sanitize_article_data(article: Dict[str, Any]) -> Dict[str, Any]:
     return sanitized
 
 
+# Record key holding the sanitized text fields, computed once per article.
+# Keys starting with "_" are in-memory only and never stored.
+SANITIZED_KEY = "_sanitized"
+
+_SANITIZED_FIELDS = ('title', 'summary', 'content', 'description')
+
+
+def sanitized_view(article: Dict[str, Any]) -> Dict[str, str]:
+    """Sanitized text fields of an article, computed on first use.
+    
+    The view is memoized on the record under SANITIZED_KEY, so every later
+    LLM call site reuses it instead of sanitizing the article again.
+    
+    Args:
+        article: Article record (mutated to carry the view)
+        
+    Returns:
+        Dictionary with the sanitized text fields present in the article
+    """
+    view = article.get(SANITIZED_KEY)
+    if view is None:
+        view = {
+            field: sanitize_text_for_llm(str(article[field]))
+            for field in _SANITIZED_FIELDS
+            if article.get(field)
+        }
+        article[SANITIZED_KEY] = view
+    return view
+
+
+def strip_private_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a record without in-memory keys (those starting with "_")."""
+    return {key: value for key, value in record.items() if not key.startswith("_")}
+
+
 def check_for_injection(text: str) -> bool:
     """Check if text contains injection patterns.
     
@@ -213,10 +262,10 @@ def check_for_injection(text: str) -> bool:
     if not text:
         return False
     
-    for pattern in _COMPILED_INJECTION_PATTERNS:
-        if pattern.search(text):
-            logger.warning("Potential LLM injection detected in input")
-            return True
+    # Only what could reach the LLM is scanned
+    if _INJECTION_REGEX.search(text, 0, MAX_LLM_TEXT_LENGTH):
+        logger.warning("Potential LLM injection detected in input")
+        return True
     
     return False
 
@@ -0,0 +1,131 @@
+"""Local record of article URLs known to be in the database.
+
+Most URLs in a feed were already stored by an earlier run. Keeping their
+hashes locally answers those "already seen" checks without a database
+round-trip; only URLs missing from the record are looked up remotely.
+
+The record is a set rather than a Bloom filter, which would add false
+positives of its own. It only receives URLs the database confirmed, and
+each database gets its own file, so switching SUPABASE_URL starts from an
+empty record. It is still a cache: rows deleted by anything other than
+SupabaseStorage.delete_article stay "known" until the record is reset
+(KnownUrlStore.clear, or `python -m src.storage.supabase_storage
+--reset-known-urls`).
+
+The file holds raw hashes back to back. New hashes are appended; the file
+is only rewritten when hashes are removed.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, List, Set
+
+from src.security import safe_log_error
+
+logger = logging.getLogger(__name__)
+
+# Bytes per stored hash (SHA-256 digest)
+_DIGEST_SIZE = 32
+
+
+def url_hash(url: str) -> str:
+    """SHA-256 of a URL as hex, the key of the articles.url_hash column."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def known_urls_path(path: str, database_url: str) -> Path:
+    """Record file for one database: the configured path tagged with a hash of its URL."""
+    base = Path(path)
+    tag = hashlib.sha256(database_url.rstrip("/").encode("utf-8")).hexdigest()[:12]
+    return base.with_name(f"{base.stem}-{tag}{base.suffix}")
+
+
+class KnownUrlStore:
+    """Persisted set of URL hashes known to be stored."""
+
+    def __init__(self, path: str):
+        """Initialize the store.
+
+        Args:
+            path: Binary file holding the raw hashes back to back
+        """
+        self.path = Path(path)
+        self.hashes: Set[str] = set()
+        # Added since the last save, appended on save
+        self._pending: List[str] = []
+        # Hashes were removed: the next save rewrites the file
+        self._rewrite = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "KnownUrlStore":
+        """Load a store from disk (empty if the file does not exist)."""
+        store = cls(path)
+        if not store.path.exists():
+            return store
+
+        try:
+            data = store.path.read_bytes()
+            store.hashes = {
+                data[i:i + _DIGEST_SIZE].hex()
+                for i in range(0, len(data) - len(data) % _DIGEST_SIZE, _DIGEST_SIZE)
+            }
+            logger.info(f"Loaded {len(store.hashes)} known URL hashes from {store.path}")
+        except Exception as e:
+            safe_log_error(logger, "Error loading known URLs, starting empty", e)
+        return store
+
+    def __contains__(self, hash_: str) -> bool:
+        return hash_ in self.hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, hashes: Iterable[str]) -> None:
+        """Record hashes confirmed to be in the database."""
+        with self._lock:
+            for hash_ in hashes:
+                if hash_ not in self.hashes:
+                    self.hashes.add(hash_)
+                    self._pending.append(hash_)
+
+    def discard(self, hashes: Iterable[str]) -> None:
+        """Forget hashes whose rows were deleted."""
+        with self._lock:
+            before = len(self.hashes)
+            self.hashes.difference_update(hashes)
+            self._rewrite |= len(self.hashes) != before
+
+    def clear(self) -> None:
+        """Forget every hash, e.g. after rows were deleted outside this app."""
+        with self._lock:
+            self.hashes.clear()
+            self._pending.clear()
+            self._rewrite = False
+            self.path.unlink(missing_ok=True)
+        logger.info(f"Cleared known URLs ({self.path})")
+
+    def save(self) -> None:
+        """Persist changes: append new hashes, or rewrite after removals.
+
+        Blocking file I/O; async callers run it in a worker thread.
+        """
+        with self._lock:
+            if not self._pending and not self._rewrite:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self._rewrite:
+                    tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                    tmp_path.write_bytes(b"".join(bytes.fromhex(h) for h in self.hashes))
+                    os.replace(tmp_path, self.path)
+                else:
+                    with open(self.path, "ab") as f:
+                        f.write(b"".join(bytes.fromhex(h) for h in self._pending))
+                self._pending.clear()
+                self._rewrite = False
+            except Exception as e:
+                safe_log_error(logger, "Error saving known URLs", e)
@@ -1,28 +1,93 @@
-"""Storage module for Supabase integration with pgvector."""
+"""Storage module for Supabase integration with pgvector.
 
+All database calls are async so they never block the event loop serving
+the API and the pipeline. Each SupabaseStorage holds one async client,
+created on first use; its PostgREST session is the connection pool shared
+by every query made through that storage.
+
+Existing-URL checks are keyed by url_hash (SHA-256 of the URL), so every
+lookup key has the same short length. They are answered from the local
+known-URL record first (see known_urls.py); the rest are looked up in
+bounded chunks sent concurrently, keeping each request URL well within
+PostgREST limits. Databases created before the url_hash column existed
+keep working: lookups fall back to chunked url filters and writes leave
+the column out, until the schema SQL is re-run.
+"""
+
+import argparse
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient
 
 from src.config import settings
-from src.security import safe_log_error
+from src.security import safe_log_error, strip_private_fields
+from src.storage.known_urls import KnownUrlStore, known_urls_path, url_hash
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters of filter values per existing-URL query, on top of the chunk size
+URL_LOOKUP_MAX_CHARS = 8000
+
+# PostgreSQL undefined column, PostgREST unknown column in the payload
+_MISSING_COLUMN_CODES = ("42703", "PGRST204")
+
+
+def _is_missing_url_hash(error: Exception) -> bool:
+    """Whether an error says the url_hash column does not exist."""
+    return getattr(error, "code", None) in _MISSING_COLUMN_CODES and "url_hash" in str(error)
+
+
+def _chunks(values: List[str], max_items: int, max_chars: int) -> List[List[str]]:
+    """Split values into chunks bounded by count and total length."""
+    chunks: List[List[str]] = []
+    chunk: List[str] = []
+    chars = 0
+    for value in values:
+        if chunk and (len(chunk) >= max_items or chars + len(value) > max_chars):
+            chunks.append(chunk)
+            chunk, chars = [], 0
+        chunk.append(value)
+        chars += len(value) + 1
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
 
 class SupabaseStorage:
     """Storage service for articles and embeddings in Supabase."""
     
     def __init__(self):
-        self.client: Client = create_client(
-            settings.supabase_url,
-            settings.supabase_key
-        )
+        self._client: Optional[AsyncClient] = None
+        self._client_lock = asyncio.Lock()
         self.table_name = "articles"
-    
-    def store_article(
+        # Cleared once a query shows the url_hash column is missing (older schemas)
+        self.has_url_hash = True
+        self.known_urls: Optional[KnownUrlStore] = None
+        if settings.known_urls_enabled:
+            self.known_urls = KnownUrlStore.load(
+                str(known_urls_path(settings.known_urls_path, settings.supabase_url))
+            )
+
+    async def get_client(self) -> AsyncClient:
+        """Return the shared async client, creating it on first use."""
+        async with self._client_lock:
+            if self._client is None:
+                self._client = await acreate_client(
+                    settings.supabase_url,
+                    settings.supabase_key
+                )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the client's connection pool."""
+        if self._client is not None:
+            await self._client.postgrest.aclose()
+            self._client = None
+
+    async def store_article(
         self,
         title: str,
         content: str,
@@ -47,15 +112,16 @@ class SupabaseStorage:
                 "created_at": datetime.now().isoformat()
             }
             
-            result = self.client.table(self.table_name).insert(data).execute()
+            result = await self._write("insert", [data])
             logger.info(f"Stored article: {title[:50]}")
+            await self._remember_urls([url])
             return result.data[0] if result.data else None
             
         except Exception as e:
             safe_log_error(logger, "Error storing article", e)
             return None
     
-    def store_articles_batch(
+    async def store_articles_batch(
         self,
         articles: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
@@ -64,30 +130,29 @@ class SupabaseStorage:
             return []
 
         try:
-            # Deduplicate by URL within the batch (keep first occurrence)
+            # Deduplicate by URL within the batch (keep first occurrence);
+            # in-memory fields such as the sanitized view are not stored
             seen_urls = set()
             unique_articles = []
             for article in articles:
                 if article["url"] not in seen_urls:
                     seen_urls.add(article["url"])
-                    unique_articles.append(article)
+                    unique_articles.append(strip_private_fields(article))
 
             if len(unique_articles) < len(articles):
                 logger.info(f"Removed {len(articles) - len(unique_articles)} duplicates within batch")
 
             # Use upsert to handle any remaining duplicates gracefully
-            result = self.client.table(self.table_name).upsert(
-                unique_articles,
-                on_conflict="url"
-            ).execute()
+            result = await self._write("upsert", unique_articles, on_conflict="url")
             logger.info(f"Stored {len(unique_articles)} articles")
+            await self._remember_urls(article["url"] for article in unique_articles)
             return result.data or []
 
         except Exception as e:
             safe_log_error(logger, "Error storing articles batch", e)
             return []
     
-    def search_similar_articles(
+    async def search_similar_articles(
         self,
         embedding: List[float],
         threshold: float = 0.85,
@@ -101,7 +166,8 @@ class SupabaseStorage:
         try:
             # Call RPC function for vector similarity search
             # This assumes you have created an RPC function in Supabase
-            result = self.client.rpc(
+            client = await self.get_client()
+            result = await client.rpc(
                 "match_articles",
                 {
                     "query_embedding": embedding,
@@ -116,7 +182,7 @@ class SupabaseStorage:
             safe_log_error(logger, "Error searching similar articles", e)
             return []
     
-    def get_articles(
+    async def get_articles(
         self,
         limit: int = 100,
         source: Optional[str] = None,
@@ -124,7 +190,8 @@ class SupabaseStorage:
     ) -> List[Dict[str, Any]]:
         """Retrieve articles with optional filters."""
         try:
-            query = self.client.table(self.table_name).select("*")
+            client = await self.get_client()
+            query = client.table(self.table_name).select("*")
             
             if source:
                 query = query.eq("source", source)
@@ -134,17 +201,21 @@ class SupabaseStorage:
             
             query = query.order("published_date", desc=True).limit(limit)
             
-            result = query.execute()
+            result = await query.execute()
             return result.data or []
             
         except Exception as e:
             safe_log_error(logger, "Error retrieving articles", e)
             return []
     
-    def delete_article(self, article_id: int) -> bool:
+    async def delete_article(self, article_id: int) -> bool:
         """Delete an article by ID."""
         try:
-            self.client.table(self.table_name).delete().eq("id", article_id).execute()
+            client = await self.get_client()
+            result = await client.table(self.table_name).delete().eq("id", article_id).execute()
+            if self.known_urls is not None and result.data:
+                self.known_urls.discard(url_hash(row["url"]) for row in result.data if row.get("url"))
+                await asyncio.to_thread(self.known_urls.save)
             logger.info(f"Deleted article with ID: {article_id}")
             return True
 
@@ -152,9 +223,86 @@ class SupabaseStorage:
             safe_log_error(logger, "Error deleting article", e)
             return False
 
-    def get_existing_urls(self, urls: List[str]) -> set[str]:
+    def _url_hash_missing(self, error: Exception) -> None:
+        """Switch to url-based lookups and writes without url_hash."""
+        if self.has_url_hash:
+            self.has_url_hash = False
+            logger.warning(
+                "Column articles.url_hash is missing: falling back to url lookups. "
+                "Re-run the schema SQL (python -m src.storage.supabase_storage) to add it."
+            )
+
+    async def _write(self, method: str, rows: List[Dict[str, Any]], **kwargs: Any):
+        """Insert or upsert rows with their url_hash, or without it on older schemas."""
+        client = await self.get_client()
+        if self.has_url_hash:
+            try:
+                return await getattr(client.table(self.table_name), method)(
+                    [{**row, "url_hash": url_hash(row["url"])} for row in rows],
+                    **kwargs
+                ).execute()
+            except Exception as e:
+                if not _is_missing_url_hash(e):
+                    raise
+                self._url_hash_missing(e)
+        return await getattr(client.table(self.table_name), method)(rows, **kwargs).execute()
+
+    async def _remember_urls(self, urls: Iterable[str]) -> None:
+        """Record URLs confirmed to be stored in the known-URL record."""
+        if self.known_urls is not None:
+            self.known_urls.add(url_hash(url) for url in urls)
+            await asyncio.to_thread(self.known_urls.save)
+
+    def reset_known_urls(self) -> None:
+        """Forget the local known-URL record; the next checks query the database."""
+        if self.known_urls is not None:
+            self.known_urls.clear()
+
+    async def _lookup_column(self, client: AsyncClient, column: str, values: List[str]) -> set[str]:
+        """Values of a column found in the database.
+
+        Values are sent in chunks of at most URL_LOOKUP_CHUNK_SIZE values
+        and URL_LOOKUP_MAX_CHARS characters, URL_LOOKUP_CONCURRENCY at a
+        time. A failed chunk only affects its own values, which are then
+        treated as new.
+
+        Raises:
+            The query error if the url_hash column does not exist
+        """
+        chunks = _chunks(values, max(settings.url_lookup_chunk_size, 1), URL_LOOKUP_MAX_CHARS)
+        semaphore = asyncio.Semaphore(max(settings.url_lookup_concurrency, 1))
+
+        async def lookup(chunk: List[str]) -> set[str]:
+            async with semaphore:
+                result = await client.table(self.table_name)\
+                    .select(column)\
+                    .in_(column, chunk)\
+                    .execute()
+            return {row[column] for row in result.data} if result.data else set()
+
+        results = await asyncio.gather(*(lookup(chunk) for chunk in chunks), return_exceptions=True)
+
+        found: set[str] = set()
+        failed = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                if _is_missing_url_hash(result):
+                    raise result
+                failed += 1
+                safe_log_error(logger, "Error checking existing URLs", result)
+            else:
+                found |= result
+        if failed:
+            logger.warning(f"{failed} of {len(chunks)} URL lookup chunks failed; their URLs are treated as new")
+        return found
+
+    async def get_existing_urls(self, urls: List[str]) -> set[str]:
         """Check which URLs already exist in the database.
 
+        URLs in the known-URL record are answered locally. The others are
+        looked up by url_hash (by url on schemas without that column) in
+        bounded, concurrent chunks (see _lookup_column).
+
         Args:
             urls: List of URLs to check
 
@@ -164,20 +312,38 @@ class SupabaseStorage:
         if not urls:
             return set()
 
-        try:
-            result = self.client.table(self.table_name)\
-                .select("url")\
-                .in_("url", urls)\
-                .execute()
+        hashes = {url: url_hash(url) for url in dict.fromkeys(urls)}
+        existing = set()
+        if self.known_urls is not None:
+            existing = {url for url, hash_ in hashes.items() if hash_ in self.known_urls}
+        pending = [url for url in hashes if url not in existing]
 
-            existing = {row["url"] for row in result.data} if result.data else set()
-            logger.info(f"Found {len(existing)} existing URLs out of {len(urls)}")
-            return existing
+        if pending:
+            try:
+                client = await self.get_client()
+            except Exception as e:
+                safe_log_error(logger, "Error checking existing URLs", e)
+                return existing
+
+            found: set[str] = set()
+            if self.has_url_hash:
+                try:
+                    found_hashes = await self._lookup_column(client, "url_hash", [hashes[url] for url in pending])
+                    found = {url for url in pending if hashes[url] in found_hashes}
+                except Exception as e:
+                    self._url_hash_missing(e)
+            if not self.has_url_hash:
+                found = await self._lookup_column(client, "url", pending)
+
+            existing |= found
+            await self._remember_urls(found)
+
+        logger.info(
+            f"Found {len(existing)} existing URLs out of {len(hashes)} "
+            f"({len(hashes) - len(pending)} known locally, {len(pending)} looked up)"
+        )
+        return existing
 
-        except Exception as e:
-            safe_log_error(logger, "Error checking existing URLs", e)
-            return set()
-    
     def create_schema_sql(self) -> str:
         """Generate SQL for creating the articles table with pgvector.
         
@@ -193,6 +359,7 @@ CREATE TABLE IF NOT EXISTS articles (
     title TEXT NOT NULL,
     content TEXT NOT NULL,
     url TEXT UNIQUE NOT NULL,
+    url_hash TEXT,
     source TEXT NOT NULL,
     embedding vector(1536),
     published_date TIMESTAMP WITH TIME ZONE,
@@ -201,6 +368,13 @@ CREATE TABLE IF NOT EXISTS articles (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Existing-URL lookups are keyed by the SHA-256 of the URL (upgrades
+-- tables created before the column existed)
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS url_hash TEXT;
+UPDATE articles SET url_hash = encode(sha256(convert_to(url, 'UTF8')), 'hex')
+WHERE url_hash IS NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS articles_url_hash_idx ON articles (url_hash);
+
 -- Create index for vector similarity search
 CREATE INDEX IF NOT EXISTS articles_embedding_idx ON articles 
 USING ivfflat (embedding vector_cosine_ops)
@@ -242,8 +416,20 @@ $$;
 
 
 def main():
-    """Print schema SQL for setup."""
+    """Print schema SQL for setup, or reset the local known-URL record."""
+    parser = argparse.ArgumentParser(description="Supabase storage setup")
+    parser.add_argument(
+        "--reset-known-urls",
+        action="store_true",
+        help="Forget the local record of stored URLs (e.g. after deleting rows by hand)"
+    )
+    args = parser.parse_args()
+
     storage = SupabaseStorage()
+    if args.reset_known_urls:
+        storage.reset_known_urls()
+        return
+
     print("Run this SQL in your Supabase SQL editor:")
     print("=" * 80)
     print(storage.create_schema_sql())
@@ -0,0 +1 @@
+"""Scale benchmarks (run as modules, not collected by pytest)."""
@@ -0,0 +1,225 @@
+"""End-to-end pipeline benchmark against the local OpenAI stand-in.
+
+Starts src.mock_openai on a local port and points the clients at it through
+OPENAI_BASE_URL, then times the pipeline stages after scraping: embedding,
+deduplication, clustering and naming, enrichment, and digest assembly.
+Each scenario configures the server differently (added latency, injected
+500s and 429s, per-minute limits), so throughput and resilience can be
+compared across commits with identical inputs. No API key or network
+access needed.
+
+Usage:
+    python -m tests.benchmarks.bench_pipeline --articles 200 \
+        --output pipeline_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+import uvicorn
+
+from src.config import settings
+from src.embeddings.embeddings_service import EmbeddingsService
+from src.mock_openai import create_app
+from src.pdf_generator.digest_builder import DigestBuilder
+from src.pdf_generator.pdf_service import PDFGenerator
+from src.security import sanitized_view
+from tests.benchmarks.bench_scale import git_commit
+
+# Server settings per scenario (see create_app)
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "ideal": {},
+    "latency": {"latency": 0.05, "token_latency": 0.002},
+    "faults": {"latency": 0.02, "error_rate": 0.05, "rate_limit_rate": 0.05},
+    "rate-limited": {"requests_per_minute": 30},
+}
+
+_TOPIC_WORDS = [
+    ["openai", "model", "reasoning", "benchmark", "gpt"],
+    ["aws", "outage", "region", "cloud", "latency"],
+    ["chip", "nvidia", "gpu", "fab", "wafer"],
+    ["rust", "compiler", "release", "memory", "safety"],
+    ["breach", "ransomware", "patch", "vulnerability", "attack"],
+    ["startup", "funding", "series", "valuation", "investors"],
+    ["browser", "chrome", "extension", "privacy", "tracking"],
+    ["kubernetes", "cluster", "container", "operator", "helm"],
+]
+_FILLER = "today analysts said the company would expand its plans next quarter according to sources".split()
+
+
+def make_articles(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic articles spread over a few topics, with some reposted stories."""
+    rng = np.random.default_rng(seed)
+    articles = []
+    for i in range(n):
+        if i and rng.random() < 0.05:
+            # Repost of an earlier story under a new URL
+            original = articles[int(rng.integers(0, i))]
+            articles.append({**original, "url": f"https://example.com/story/{i}"})
+            continue
+        words = _TOPIC_WORDS[int(rng.integers(0, len(_TOPIC_WORDS)))]
+        title = " ".join(rng.choice(words, 4)).capitalize() + f" update {i}"
+        sentences = [
+            " ".join(rng.choice(words + _FILLER, 12)).capitalize() + "."
+            for _ in range(4)
+        ]
+        articles.append({
+            "title": title,
+            "content": f"<p>{' '.join(sentences)}</p>",
+            "url": f"https://example.com/story/{i}",
+            "source": f"Source {i % 5}",
+            "published_date": datetime.now().isoformat(),
+        })
+    return articles
+
+
+class MockServer:
+    """The stand-in server running on a local port in a background thread."""
+
+    def __init__(self, **options: Any):
+        self.app = create_app(**options)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self) -> "MockServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+async def run_pipeline(articles: List[Dict[str, Any]], stream: bool) -> Dict[str, Any]:
+    """Run the post-scrape pipeline once, timing each stage."""
+    service = EmbeddingsService()
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    views = [sanitized_view(article) for article in articles]
+    embedding_stats: Dict[str, int] = {}
+    embeddings = await service.generate_embeddings_batch(
+        [f"{view['title']} {view['content']}" for view in views],
+        stats=embedding_stats,
+        sanitized=True
+    )
+    records = [
+        {**article, "embedding": embedding}
+        for article, embedding in zip(articles, embeddings)
+        if embedding
+    ]
+    timings["embed"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups = service.find_duplicates([record["embedding"] for record in records])
+    unique = [records[group[0]] for group in groups]
+    timings["dedupe"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grouped = await service.cluster_and_name_articles(unique, max_clusters=8)
+    timings["cluster_and_name"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_event = None
+    builder = DigestBuilder(list(grouped), PDFGenerator(output_dir=settings.output_dir))
+
+    def on_event(event: Dict[str, Any]) -> None:
+        nonlocal first_event
+        if first_event is None:
+            first_event = time.perf_counter() - start
+        builder.handle(event)
+
+    enriched = await service.enrich_grouped_articles(grouped, on_event=on_event if stream else None)
+    timings["enrich"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    html = PDFGenerator(output_dir=settings.output_dir).generate_html_enriched(builder.finish(enriched))
+    timings["assemble"] = time.perf_counter() - start
+
+    await service.client.close()
+    await service.content_generator.client.close()
+
+    sections = enriched["sections"].values()
+    return {
+        "timings": timings,
+        "total_seconds": sum(timings.values()),
+        "first_content_seconds": first_event,
+        "articles_per_second": len(articles) / sum(timings.values()),
+        "embedding_stats": embedding_stats,
+        "unique_articles": len(unique),
+        "topics": len(grouped),
+        "sections_with_narrative": sum(1 for section in sections if section["narrative"]),
+        "top_articles": len(enriched["top_articles"]),
+        "html_bytes": len(html),
+        "llm_usage": service.content_generator.token_usage,
+    }
+
+
+def run_scenario(name: str, articles: List[Dict[str, Any]], stream: bool) -> Dict[str, Any]:
+    """Run the pipeline against a server configured for the scenario."""
+    options = SCENARIOS[name]
+    with MockServer(**options) as server:
+        settings.openai_base_url = server.base_url
+        result = asyncio.run(run_pipeline(articles, stream))
+        result["server"] = dict(server.app.state.stats)
+
+    result.update({"scenario": name, "server_options": options, "articles": len(articles), "stream": stream})
+    timings = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["timings"].items())
+    print(
+        f"{name:>12}: {result['total_seconds']:.2f}s ({result['articles_per_second']:.0f} articles/s) | {timings} | "
+        f"dropped {result['embedding_stats']['dropped']}, narratives {result['sections_with_narrative']}/{result['topics']}, "
+        f"500s {result['server']['server_errors']}, 429s {result['server']['rate_limited']}"
+    )
+    return result
+
+
+def main():
+    """Run the benchmark scenarios."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--no-stream", action="store_true", help="Enrich without streaming")
+    parser.add_argument("--retry-delay", type=float, default=0.05, help="Embedding retry base delay (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="pipeline_results.json")
+    args = parser.parse_args()
+
+    # Measure the pipeline itself: no response cache, no state across runs
+    settings.openai_api_key = settings.openai_api_key or "sk-mock"
+    settings.llm_cache_enabled = False
+    settings.incremental_topics = False
+    settings.embedding_retry_base_delay = args.retry_delay
+
+    articles = make_articles(args.articles, args.seed)
+    results = [run_scenario(name, articles, not args.no_stream) for name in args.scenarios]
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Scale benchmarks for deduplication and clustering.
+
+Generates synthetic clustered embeddings with known topics and planted
+near-duplicates, then times and memory-profiles find_duplicates,
+cluster_articles, merge_small_clusters and get_cluster_centroid. Quality
+is checked against the ground truth, and results are written as JSON so
+runs can be compared across commits. No API keys required.
+
+Usage:
+    python -m tests.benchmarks.bench_scale --sizes 100 1000 10000 100000 \
+        --output benchmark_results.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from src.embeddings.clustering import (
+    AGGLOMERATIVE_MAX_ARTICLES,
+    cluster_articles,
+    get_cluster_centroid,
+    merge_small_clusters,
+)
+from src.embeddings.embeddings_service import EmbeddingsService
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+# Largest size for the exact engine when it is forced for comparison
+EXACT_MAX_ARTICLES = 5000
+
+
+def make_dataset(
+    n: int,
+    n_topics: int = 20,
+    dim: int = 1536,
+    duplicate_rate: float = 0.05,
+    seed: int = 0
+) -> Tuple[List[Dict[str, Any]], np.ndarray, List[Tuple[int, int]]]:
+    """Generate articles around topic centers with planted near-duplicates.
+
+    Returns:
+        Tuple of (articles, topic label per article, planted duplicate pairs)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_topics, dim), dtype=np.float32)
+    n_duplicates = int(n * duplicate_rate)
+    n_originals = n - n_duplicates
+
+    labels = rng.integers(0, n_topics, size=n_originals)
+    vectors = centers[labels] + 0.8 * rng.standard_normal((n_originals, dim), dtype=np.float32)
+
+    sources = rng.choice(n_originals, size=n_duplicates, replace=False)
+    copies = vectors[sources] + 0.05 * rng.standard_normal((n_duplicates, dim), dtype=np.float32)
+
+    vectors = np.vstack([vectors, copies])
+    labels = np.concatenate([labels, labels[sources]])
+    pairs = [(int(src), n_originals + i) for i, src in enumerate(sources)]
+
+    articles = [
+        {"title": f"Article {i}", "embedding": vector}
+        for i, vector in enumerate(vectors)
+    ]
+    return articles, labels, pairs
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """Run fn, returning (result, seconds, peak traced memory in MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def duplicate_quality(groups: List[List[int]], pairs: List[Tuple[int, int]], n: int) -> Dict[str, float]:
+    """Recall of planted pairs and precision of reported duplicates."""
+    group_of = np.full(n, -1)
+    for gid, group in enumerate(groups):
+        group_of[group] = gid
+
+    found = sum(1 for a, b in pairs if group_of[a] >= 0 and group_of[a] == group_of[b])
+    planted = {b for _, b in pairs} | {a for a, _ in pairs}
+    reported = {i for group in groups for i in group}
+    return {
+        "recall": found / len(pairs) if pairs else 1.0,
+        "precision": len(reported & planted) / len(reported) if reported else 1.0,
+    }
+
+
+def clustering_quality(
+    clusters: List[Tuple[int, List[Dict[str, Any]]]],
+    labels: np.ndarray,
+    index_of: Dict[int, int]
+) -> Dict[str, float]:
+    """Adjusted Rand index against the topics, over the clustered articles."""
+    truth, predicted = [], []
+    for cluster_id, members in clusters:
+        for article in members:
+            truth.append(labels[index_of[id(article)]])
+            predicted.append(cluster_id)
+    return {
+        "ari": float(adjusted_rand_score(truth, predicted)) if truth else 0.0,
+        "coverage": len(truth) / len(labels),
+    }
+
+
+def run_size(n: int, dim: int, n_topics: int) -> List[Dict[str, Any]]:
+    """Benchmark every function at one input size."""
+    articles, labels, pairs = make_dataset(n, n_topics=n_topics, dim=dim)
+    index_of = {id(article): i for i, article in enumerate(articles)}
+    records = []
+
+    def record(function: str, seconds: float, peak_mb: float, **quality):
+        entry = {"function": function, "n": n, "seconds": round(seconds, 4), "peak_mb": round(peak_mb, 1)}
+        entry.update({k: round(v, 4) for k, v in quality.items()})
+        records.append(entry)
+        print(f"{function:<36} n={n:<7} {seconds:>8.2f}s {peak_mb:>9.1f}MB {quality}")
+
+    # find_duplicates does not touch the OpenAI client
+    service = EmbeddingsService.__new__(EmbeddingsService)
+    embeddings = [article["embedding"] for article in articles]
+    groups, seconds, peak = measure(lambda: service.find_duplicates(embeddings, threshold=0.85))
+    record("find_duplicates", seconds, peak, **duplicate_quality(groups, pairs, n))
+
+    methods = ["auto"]
+    if n <= EXACT_MAX_ARTICLES and n > AGGLOMERATIVE_MAX_ARTICLES:
+        methods.append("agglomerative")
+    if n <= AGGLOMERATIVE_MAX_ARTICLES:
+        methods.append("minibatch")
+
+    clusters = []
+    for method in methods:
+        result, seconds, peak = measure(
+            lambda: cluster_articles(articles, n_clusters=n_topics, method=method)
+        )
+        record(f"cluster_articles[{method}]", seconds, peak,
+               **clustering_quality(result, labels, index_of))
+        if method == "auto":
+            clusters = result
+
+    # Split a fifth of every cluster into singletons for merging to reassign
+    fragmented = []
+    for cluster_id, members in clusters:
+        keep = max(1, int(len(members) * 0.8))
+        fragmented.append((cluster_id, members[:keep]))
+        fragmented.extend((-1, [article]) for article in members[keep:])
+    merged, seconds, peak = measure(lambda: merge_small_clusters(fragmented, min_size=2))
+    record("merge_small_clusters", seconds, peak, **clustering_quality(merged, labels, index_of))
+
+    largest = clusters[0][1] if clusters else articles
+    _, seconds, peak = measure(lambda: get_cluster_centroid(largest))
+    record("get_cluster_centroid", seconds, peak)
+
+    return records
+
+
+def git_commit() -> str:
+    """Current commit hash, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        results.extend(run_size(n, args.dim, args.topics))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "dim": args.dim,
+        "topics": args.topics,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,23 @@
 """Tests configuration."""
 
+import httpx
+import openai
 import pytest
 
+try:
+    import httpx2
+except ImportError:
+    httpx2 = None
+
+from src.config import settings
+from src.mock_openai import create_app
+
+
+@pytest.fixture(autouse=True)
+def offline_openai_key(monkeypatch):
+    """Let OpenAI clients be built without real credentials; tests never reach the API."""
+    monkeypatch.setattr(settings, "openai_api_key", settings.openai_api_key or "sk-test")
+
 
 @pytest.fixture
 def sample_article():
@@ -37,3 +53,44 @@ def sample_articles():
             "author": "Author 2"
         }
     ]
+
+
+def asgi_transport(app):
+    """In-process transport to app for the HTTP library the openai SDK uses.
+
+    openai 3.x is built on httpx2, earlier releases on httpx; the client
+    only accepts transports from its own library.
+    """
+    if httpx2 is not None and issubclass(openai.DefaultAsyncHttpxClient, httpx2.AsyncClient):
+        return httpx2.ASGITransport(app=app)
+    return httpx.ASGITransport(app=app)
+
+
+@pytest.fixture
+def mock_openai_factory():
+    """Build local stand-in OpenAI servers, each with a client wired to it in process.
+
+    Returns:
+        Function taking create_app options and returning (server app,
+        AsyncOpenAI client)
+    """
+    def make(**options):
+        app = create_app(**options)
+        client = openai.AsyncOpenAI(
+            api_key="sk-test",
+            base_url="http://mock-openai/v1",
+            http_client=openai.DefaultAsyncHttpxClient(transport=asgi_transport(app))
+        )
+        return app, client
+
+    return make
+
+
+@pytest.fixture
+def mock_openai(mock_openai_factory):
+    """Local stand-in OpenAI server and a client wired to it in process.
+
+    Returns:
+        Tuple of (server app, AsyncOpenAI client)
+    """
+    return mock_openai_factory()
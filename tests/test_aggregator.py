@@ -0,0 +1,344 @@
+"""Tests for the aggregator pipeline."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.aggregator import NewsAggregator
+from src.scraper.news_scraper import Article
+
+
+def make_aggregator(feeds, vectors):
+    """Build an aggregator with fake scraper, embeddings and storage."""
+    aggregator = NewsAggregator.__new__(NewsAggregator)
+
+    async def iter_all_sources(sources=None):
+        for feed in feeds:
+            yield feed
+
+    aggregator.scraper = Mock()
+    aggregator.scraper.iter_all_sources = iter_all_sources
+
+    async def generate_embeddings_batch(texts, stats=None, sanitized=False):
+        return [vectors[text.split()[0]] for text in texts]
+
+    aggregator.embeddings_service = Mock()
+    aggregator.embeddings_service.generate_embeddings_batch = AsyncMock(
+        side_effect=generate_embeddings_batch
+    )
+    aggregator.storage = Mock()
+    aggregator.storage.get_existing_urls = AsyncMock(return_value=set())
+    aggregator.storage.store_articles_batch = AsyncMock(side_effect=lambda articles: articles)
+    return aggregator
+
+
+@pytest.mark.asyncio
+async def test_streaming_pipeline_dedupes_across_feeds():
+    """Duplicates arriving from different feeds are removed before storage."""
+    feeds = [
+        [Article("a1 AI", "x", "https://a.com/1", "A"), Article("b1 Cloud", "x", "https://a.com/2", "A")],
+        [Article("a2 AI", "x", "https://b.com/1", "B")],
+    ]
+    vectors = {"a1": [1.0, 0.0], "b1": [0.0, 1.0], "a2": [0.99, 0.01]}
+    aggregator = make_aggregator(feeds, vectors)
+
+    result = await aggregator.run_full_pipeline(generate_pdf=False, streaming=True)
+
+    assert result["articles_scraped"] == 3
+    assert result["articles_new"] == 3
+    assert result["articles_processed"] == 2
+    assert result["articles_stored"] == 2
+
+
+async def test_streaming_pipeline_reports_an_exhausted_quota():
+    """A quota error from a stage surfaces as itself, not as an ExceptionGroup."""
+    import httpx
+    from openai import RateLimitError
+    from src.embeddings.embeddings_service import EmbeddingsService
+    from src.security import get_safe_error_detail
+
+    feeds = [[Article("a1 AI", "x", "https://a.com/1", "A")], [Article("b1 Cloud", "x", "https://a.com/2", "A")]]
+    aggregator = make_aggregator(feeds, {})
+    aggregator.embeddings_service = EmbeddingsService()
+    aggregator.embeddings_service.client = Mock()
+    aggregator.embeddings_service.client.embeddings.create = AsyncMock(side_effect=RateLimitError(
+        "quota",
+        response=httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com")),
+        body={"code": "insufficient_quota"}
+    ))
+
+    with pytest.raises(RateLimitError) as raised:
+        await aggregator.run_full_pipeline(generate_pdf=False, streaming=True)
+
+    assert get_safe_error_detail(raised.value).startswith("API quota exhausted")
+    aggregator.storage.store_articles_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_records_carry_sanitized_view_that_is_not_stored():
+    """Articles are sanitized once at ingestion; the view never reaches storage."""
+    from src.security import SANITIZED_KEY
+
+    feeds = [[Article("a1 AI\u200b", "x", "https://a.com/1", "A")]]
+    aggregator = make_aggregator(feeds, {"a1": [1.0, 0.0]})
+
+    processed = await aggregator.process_articles(feeds[0])
+    assert processed[0][SANITIZED_KEY]["title"] == "a1 AI"
+    texts = aggregator.embeddings_service.generate_embeddings_batch.await_args.args[0]
+    assert texts == ["a1 AI x"]
+
+    from src.storage.supabase_storage import SupabaseStorage
+
+    storage = SupabaseStorage()
+    storage.known_urls = None
+    storage._client = Mock()
+    storage._client.table.return_value.upsert.return_value.execute = AsyncMock(return_value=Mock(data=[]))
+    await storage.store_articles_batch(processed)
+
+    upserted = storage._client.table.return_value.upsert.call_args.args[0]
+    assert SANITIZED_KEY not in upserted[0]
+    assert upserted[0]["title"] == "a1 AI\u200b"
+
+
+@pytest.mark.asyncio
+async def test_storage_queries_share_one_client_without_blocking(monkeypatch):
+    """Concurrent queries await one lazily created client; the loop keeps running."""
+    import asyncio
+    from src.storage import supabase_storage
+    from src.storage.known_urls import url_hash
+
+    async def slow_execute():
+        await asyncio.sleep(0.05)
+        return Mock(data=[{"url": "https://a.com/1", "url_hash": url_hash("https://a.com/1")}])
+
+    client = Mock()
+    query = client.table.return_value.select.return_value
+    query.in_.return_value.execute = slow_execute
+    query.order.return_value.limit.return_value.execute = slow_execute
+    create = AsyncMock(return_value=client)
+    monkeypatch.setattr(supabase_storage, "acreate_client", create)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    storage = supabase_storage.SupabaseStorage()
+    storage.known_urls = None
+    tick_task = asyncio.create_task(ticker())
+    existing, articles = await asyncio.gather(
+        storage.get_existing_urls(["https://a.com/1", "https://a.com/2"]),
+        storage.get_articles(limit=5),
+    )
+    tick_task.cancel()
+
+    assert existing == {"https://a.com/1"}
+    assert articles[0]["url"] == "https://a.com/1"
+    create.assert_awaited_once()
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_existing_urls_are_looked_up_by_hash_in_chunks(tmp_path, monkeypatch):
+    """Known URLs are answered locally; the rest go out in concurrent chunks."""
+    import asyncio
+    from src.config import settings
+    from src.storage.known_urls import KnownUrlStore, url_hash
+    from src.storage.supabase_storage import SupabaseStorage
+
+    monkeypatch.setattr(settings, "url_lookup_chunk_size", 10)
+    urls = [f"https://a.com/{'long-path/' * 50}{i}" for i in range(35)]
+    in_database = {url_hash(url) for url in urls[:20]}
+    queried = []
+    in_flight = peak = 0
+
+    def select_in(column, hashes):
+        async def execute():
+            nonlocal in_flight, peak
+            assert column == "url_hash"
+            queried.append(list(hashes))
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if url_hash(urls[30]) in hashes:
+                raise RuntimeError("request failed")
+            return Mock(data=[{"url_hash": h} for h in hashes if h in in_database])
+        return Mock(execute=execute)
+
+    storage = SupabaseStorage()
+    storage.known_urls = KnownUrlStore(str(tmp_path / "known.bin"))
+    storage.known_urls.add([url_hash(url) for url in urls[:5]])
+    storage._client = Mock()
+    storage._client.table.return_value.select.return_value.in_ = select_in
+
+    existing = await storage.get_existing_urls(urls)
+
+    # 5 known locally; 30 looked up in 3 chunks at once; the chunk with
+    # urls[30] failed, so only its URLs count as new
+    assert existing == set(urls[:20])
+    assert sorted(len(chunk) for chunk in queried) == [10, 10, 10]
+    assert peak == 3
+    assert max(len(h) for chunk in queried for h in chunk) == 64
+
+    # Confirmed URLs persist and are no longer queried
+    reloaded = KnownUrlStore.load(str(tmp_path / "known.bin"))
+    assert len(reloaded) == 20
+    storage.known_urls = reloaded
+    queried.clear()
+    assert await storage.get_existing_urls(urls[:20]) == set(urls[:20])
+    assert queried == []
+
+
+@pytest.mark.asyncio
+async def test_storage_falls_back_to_urls_without_the_hash_column(tmp_path):
+    """Databases without url_hash are queried and written by url instead."""
+    from postgrest.exceptions import APIError
+    from src.storage.known_urls import KnownUrlStore, known_urls_path
+    from src.storage.supabase_storage import SupabaseStorage
+
+    missing = APIError({"code": "42703", "message": "column articles.url_hash does not exist"})
+    urls = ["https://a.com/1", "https://a.com/2"]
+    queried = []
+
+    def select_in(column, values):
+        async def execute():
+            queried.append(column)
+            if column == "url_hash":
+                raise missing
+            return Mock(data=[{"url": urls[0]}])
+        return Mock(execute=execute)
+
+    written = []
+
+    def upsert(rows, on_conflict):
+        async def execute():
+            written.append(rows)
+            if "url_hash" in rows[0]:
+                raise APIError({"code": "PGRST204", "message": "Could not find the 'url_hash' column"})
+            return Mock(data=rows)
+        return Mock(execute=execute)
+
+    storage = SupabaseStorage()
+    path = known_urls_path(str(tmp_path / "known.bin"), "https://db.supabase.co/")
+    storage.known_urls = KnownUrlStore(str(path))
+    storage._client = Mock()
+    storage._client.table.return_value.select.return_value.in_ = select_in
+    storage._client.table.return_value.upsert = upsert
+
+    assert await storage.get_existing_urls(urls) == {urls[0]}
+    assert queried == ["url_hash", "url"]
+    assert not storage.has_url_hash
+
+    await storage.store_articles_batch([{"title": "T", "content": "C", "url": urls[1], "source": "S"}])
+    assert [("url_hash" in rows[0]) for rows in written] == [False]
+
+    # Both URLs were appended to this database's record; a reset forgets them
+    assert path.name.startswith("known-") and path.stat().st_size == 64
+    storage.reset_known_urls()
+    assert not path.exists() and len(storage.known_urls) == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_digest_survives_restart_and_uses_no_sync_calls(tmp_path, mock_openai):
+    """Enrichment goes through one batch job that a new process can resume."""
+    from src.embeddings.batch_jobs import BatchJobStore
+    from src.embeddings.embeddings_service import EmbeddingsService
+    from src.embeddings.llm_cache import LLMCache
+
+    app, client = mock_openai
+
+    def make_batch_aggregator():
+        aggregator = NewsAggregator.__new__(NewsAggregator)
+        aggregator.embeddings_service = EmbeddingsService()
+        generator = aggregator.embeddings_service.content_generator
+        generator.client = client
+        generator.cache = LLMCache(str(tmp_path / "cache.sqlite"))
+        aggregator.pdf_generator = Mock()
+        aggregator.pdf_generator.generate_pdf_enriched = Mock(return_value=tmp_path / "digest.pdf")
+        aggregator.batch_jobs = BatchJobStore(str(tmp_path / "batch.json"))
+        return aggregator
+
+    articles = [
+        {
+            "title": f"{topic} story {i}",
+            "content": f"<p>{topic} details {i}</p>",
+            "url": f"https://example.com/{topic}/{i}",
+            "source": "Example",
+            "published_date": "2024-01-18T12:00:00",
+            "embedding": [x + 0.01 * i for x in vector],
+        }
+        for topic, vector in (("AI", [1.0, 0.0, 0.0]), ("Cloud", [0.0, 1.0, 0.0]), ("Chips", [0.0, 0.0, 1.0]))
+        for i in range(6)
+    ]
+
+    batch_id = await make_batch_aggregator().submit_digest_batch(articles, "digest.pdf")
+    naming_calls = app.state.stats["chat_completions"]
+    assert batch_id
+
+    resumed = make_batch_aggregator()
+    pdf_path = await resumed.resume_digest_batch()
+
+    assert pdf_path == str(tmp_path / "digest.pdf")
+    assert app.state.stats["chat_completions"] == naming_calls
+    assert app.state.stats["batch_requests"] > 0
+    enriched, filename = resumed.pdf_generator.generate_pdf_enriched.call_args.args
+    assert filename == "digest.pdf"
+    assert enriched["top_articles"][0]["tldr"].startswith("Mock TL;DR")
+    assert all(section["narrative"] for section in enriched["sections"].values())
+    assert resumed.batch_jobs.load() is None
+
+
+async def test_batch_digest_resumed_later_matches_the_recorded_requests(tmp_path, mock_openai, monkeypatch):
+    """Ranking does not drift with the clock, so a late resume is served by the batch."""
+    from datetime import datetime, timedelta
+
+    from src.embeddings import ranking
+    from src.embeddings.batch_jobs import BatchJobStore
+    from src.embeddings.embeddings_service import EmbeddingsService
+    from src.embeddings.llm_cache import LLMCache
+
+    app, client = mock_openai
+    clock = {"now": datetime(2024, 1, 18, 12, 0)}
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock["now"]
+
+    monkeypatch.setattr(ranking, "datetime", FrozenDatetime)
+
+    def make_batch_aggregator():
+        aggregator = NewsAggregator.__new__(NewsAggregator)
+        aggregator.embeddings_service = EmbeddingsService()
+        generator = aggregator.embeddings_service.content_generator
+        generator.client = client
+        generator.cache = LLMCache(str(tmp_path / "cache.sqlite"))
+        aggregator.pdf_generator = Mock()
+        aggregator.pdf_generator.generate_pdf_enriched = Mock(return_value=tmp_path / "digest.pdf")
+        aggregator.batch_jobs = BatchJobStore(str(tmp_path / "batch.json"))
+        return aggregator
+
+    # Articles spread along their topic and over a day: centrality and
+    # freshness disagree, so absolute freshness would reorder the shortlist
+    articles = [
+        {
+            "title": f"{topic} story {i}",
+            "content": f"<p>{topic} details {i}</p>",
+            "url": f"https://example.com/{topic}/{i}",
+            "source": f"source{i % 3}.com",
+            "published_date": (clock["now"] - timedelta(hours=6 * i + 3 * t)).isoformat(),
+            "embedding": [x + (0.1 * i if axis == (t + 1) % 3 else 0.0) for axis, x in enumerate(vector)],
+        }
+        for t, (topic, vector) in enumerate((("AI", [1.0, 0.0, 0.0]), ("Cloud", [0.0, 1.0, 0.0]), ("Chips", [0.0, 0.0, 1.0])))
+        for i in range(6)
+    ]
+
+    assert await make_batch_aggregator().submit_digest_batch(articles, "digest.pdf")
+    naming_calls = app.state.stats["chat_completions"]
+
+    clock["now"] += timedelta(hours=30)
+    assert await make_batch_aggregator().resume_digest_batch()
+    assert app.state.stats["chat_completions"] == naming_calls
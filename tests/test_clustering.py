@@ -0,0 +1,210 @@
+"""Tests for clustering."""
+
+import numpy as np
+
+from src.embeddings.clustering import cluster_articles
+
+
+def make_topic_articles(n_per_topic=30, n_topics=3, dim=16, seed=0):
+    """Articles whose embeddings are noisy copies of well separated topics."""
+    rng = np.random.default_rng(seed)
+    centers = np.eye(dim)[:n_topics] * 10
+    articles = []
+    for topic in range(n_topics):
+        for i in range(n_per_topic):
+            vector = centers[topic] + rng.normal(scale=0.5, size=dim)
+            articles.append({"title": f"{topic}-{i}", "topic": topic, "embedding": vector.tolist()})
+    return articles
+
+
+def test_cluster_engines_agree_on_separated_topics():
+    """Exact and mini-batch engines recover the same topics."""
+    articles = make_topic_articles()
+
+    for method in ("agglomerative", "minibatch"):
+        clusters = cluster_articles(articles, n_clusters=3, method=method)
+        assert len(clusters) == 3
+        for _, members in clusters:
+            assert len({a["topic"] for a in members}) == 1
+
+
+def test_topic_store_reuses_and_decays_topics(tmp_path):
+    """Known topics absorb close articles, persist, and decay when idle."""
+    from datetime import datetime, timedelta
+
+    from src.embeddings.topic_store import TopicStore
+
+    path = tmp_path / "topics.json"
+    store = TopicStore(str(path), max_distance=0.2, half_life_days=1.0, min_weight=0.5)
+    now = datetime(2024, 1, 1)
+    ai = store.add_topic("AI", [{"embedding": [1.0, 0.0]}, {"embedding": [0.9, 0.1]}], now=now)
+    store.save()
+
+    store = TopicStore.load(str(path), max_distance=0.2, half_life_days=1.0, min_weight=0.5)
+    assigned, leftovers = store.assign([
+        {"title": "close", "embedding": [0.95, 0.05]},
+        {"title": "far", "embedding": [0.0, 1.0]},
+    ])
+    assert [a["title"] for a in assigned[ai.topic_id]] == ["close"]
+    assert [a["title"] for a in leftovers] == ["far"]
+
+    assert store.prune(now=now + timedelta(days=3)) == 1
+    assert not store.topics
+
+
+def test_similarity_index_dense_and_knn_agree():
+    """The sparse kNN graph finds the same duplicates as the dense matrix."""
+    from src.embeddings.similarity import SimilarityIndex
+
+    articles = make_topic_articles(n_per_topic=10)
+    embeddings = [a["embedding"] for a in articles]
+    embeddings.insert(5, embeddings[0])
+
+    dense = SimilarityIndex(embeddings)
+    knn = SimilarityIndex(embeddings, dense_max=0, k=4)
+
+    assert dense.is_dense and not knn.is_dense
+    assert dense.duplicate_groups(0.999) == knn.duplicate_groups(0.999) == [[0, 5]]
+    assert dense.subset([0, 5]).duplicate_groups(0.999) == [[0, 1]]
+
+    dense_idx, dense_scores = dense.neighbors(3)
+    knn_idx, knn_scores = knn.neighbors(3)
+    assert np.allclose(dense_scores, knn_scores, atol=1e-5)
+    assert (dense_idx != np.arange(len(embeddings))[:, None]).all()
+
+
+def test_ranking_reuses_the_runs_similarity_index(monkeypatch):
+    """Stages find their articles in the run's index instead of recomputing."""
+    from src.embeddings import ranking
+    from src.embeddings.ranking import rank_articles
+    from src.embeddings.similarity import SimilarityIndex
+
+    articles = make_topic_articles(n_per_topic=5)
+    index = SimilarityIndex([a["embedding"] for a in articles], articles=articles)
+    picked = articles[10:] + articles[:3]
+    topics = [0] * 5 + [1] * 3
+
+    aligned = index.aligned(picked)
+    assert aligned.articles == picked
+    assert np.allclose(aligned.vectors, index.vectors[list(range(10, 15)) + [0, 1, 2]])
+    assert index.aligned([dict(articles[0])]) is None
+
+    expected = rank_articles(picked, 3, topics, source_weights={})
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("similarity recomputed")
+
+    monkeypatch.setattr(ranking, "SimilarityIndex", no_rebuild)
+    reused = rank_articles(picked, 3, topics, source_weights={}, similarity=index)
+    assert [a["title"] for a in reused] == [a["title"] for a in expected]
+
+
+def test_top_k_similar_matches_brute_force_across_chunks():
+    """Chunked top-k search returns the exact best matches."""
+    from src.embeddings.clustering import normalize_embeddings
+    from src.embeddings.similarity import top_k_similar
+
+    rng = np.random.default_rng(1)
+    queries = rng.normal(size=(7, 8))
+    candidates = rng.normal(size=(50, 8))
+
+    indices, scores = top_k_similar(queries, candidates, k=3, chunk_size=4)
+
+    expected = normalize_embeddings(queries) @ normalize_embeddings(candidates).T
+    assert np.array_equal(indices, np.argsort(-expected, axis=1)[:, :3])
+    assert np.allclose(scores, np.sort(expected, axis=1)[:, ::-1][:, :3], atol=1e-5)
+
+    indices, scores = top_k_similar(queries, candidates, k=3, min_similarity=2.0)
+    assert (indices == -1).all()
+
+
+def test_merge_small_clusters_reassigns_to_nearest_centroid():
+    """Orphans join the closest large cluster; only outliers go to 'Other'."""
+    from src.embeddings.clustering import merge_small_clusters
+
+    big_a = [{"title": f"a{i}", "embedding": [1.0, 0.1 * i, 0.0]} for i in range(3)]
+    big_b = [{"title": f"b{i}", "embedding": [0.1 * i, 1.0, 0.0]} for i in range(3)]
+    small = [
+        {"title": "near-a", "embedding": [1.0, 0.05, 0.1]},
+        {"title": "outlier", "embedding": [0.0, 0.0, 1.0]},
+    ]
+
+    merged = merge_small_clusters([(0, big_a), (1, big_b), (2, small)], min_size=3)
+
+    titles = {cluster_id: [a["title"] for a in arts] for cluster_id, arts in merged}
+    assert titles[0][-1] == "near-a"
+    assert titles[1] == ["b0", "b1", "b2"]
+    assert titles[2] == ["outlier"]
+
+
+async def test_cluster_naming_keeps_colliding_clusters():
+    """Clusters sharing a generated name get deterministic suffixes."""
+    from unittest.mock import AsyncMock
+
+    from src.embeddings.embeddings_service import EmbeddingsService
+
+    service = EmbeddingsService()
+    service.topic_store = None
+    service._content_generator = AsyncMock()
+    service._content_generator.generate_cluster_name.return_value = "AI News"
+
+    named = await service.cluster_and_name_articles(make_topic_articles(), max_clusters=3)
+
+    assert list(named) == ["AI News", "AI News (2)", "AI News (3)"]
+    assert sum(len(members) for members in named.values()) == 90
+
+
+async def test_incremental_topics_stay_within_max_clusters_and_save_on_commit(tmp_path):
+    """Leftovers join known topics when those fill max_clusters; nothing is saved before commit."""
+    from src.embeddings.embeddings_service import EmbeddingsService
+    from src.embeddings.topic_store import TopicStore
+
+    path = tmp_path / "topics.json"
+    articles = make_topic_articles(n_per_topic=5)
+    store = TopicStore(str(path))
+    for topic in range(2):
+        store.add_topic(f"Topic {topic}", [a for a in articles if a["topic"] == topic])
+
+    service = EmbeddingsService()
+    service.topic_store = store
+    named = await service.cluster_and_name_articles(articles, max_clusters=2, local=True)
+
+    assert sorted(named) == ["Topic 0", "Topic 1"]
+    assert sum(len(members) for members in named.values()) == 15
+    assert len(store.topics) == 2 and not path.exists()
+
+    service.commit_topics()
+    assert path.exists() and service.topic_store is not store
+
+
+def test_rank_articles_prefers_widely_covered_fresh_stories():
+    """Local ranking favours stories reported by several sources, then freshness."""
+    from datetime import datetime, timedelta
+
+    from src.embeddings.ranking import rank_articles
+
+    now = datetime(2024, 1, 18, 12, 0)
+    story = [1.0, 0.0, 0.0]
+
+    def article(title, source, embedding, hours_old):
+        return {
+            "title": title,
+            "source": source,
+            "url": f"https://{source}.com/{title}",
+            "published_date": (now - timedelta(hours=hours_old)).isoformat(),
+            "embedding": embedding,
+        }
+
+    articles = [
+        article("niche", "a", [0.0, 1.0, 0.0], 1),
+        article("old", "d", [0.0, 0.0, 1.0], 200),
+        article("big-1", "a", story, 2),
+        article("big-2", "b", [0.95, 0.05, 0.0], 3),
+        article("big-3", "c", [0.9, 0.1, 0.0], 4),
+    ]
+
+    top = rank_articles(articles, 2, topics=[0, 1, 2, 2, 2], now=now, source_weights={})
+
+    assert [a["title"] for a in top] == ["big-1", "big-2"]
+    assert all(a["selection_reason"] for a in top)
+    assert "selection_reason" not in articles[2]
@@ -61,3 +61,497 @@ def test_find_duplicates():
     assert len(duplicate_groups) == 2
     assert len(duplicate_groups[0]) == 2
     assert len(duplicate_groups[1]) == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_isolates_bad_text():
+    """A rejected input only drops the offending text."""
+    import httpx
+    from openai import BadRequestError
+
+    service = EmbeddingsService()
+    response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com"))
+
+    async def fake_create(model, input):
+        if any("bad" in text for text in input):
+            raise BadRequestError("input rejected", response=response, body=None)
+        return Mock(data=[Mock(embedding=[1.0, 0.0]) for _ in input])
+
+    service.client = Mock()
+    service.client.embeddings.create = AsyncMock(side_effect=fake_create)
+
+    texts = [f"text {i}" for i in range(9)] + ["bad text"]
+    stats = {}
+    embeddings = await service.generate_embeddings_batch(texts, stats=stats)
+
+    assert len(embeddings) == 10
+    assert embeddings[9] is None
+    assert all(e is not None for e in embeddings[:9])
+    assert stats["dropped"] == 1
+    assert stats["split"] > 0
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_fails_fast_on_account_errors():
+    """Authentication and quota errors are raised at once, without splitting or retrying."""
+    import httpx
+    from openai import AuthenticationError, RateLimitError
+
+    service = EmbeddingsService()
+    service.retry_base_delay = 0
+    request = httpx.Request("POST", "https://api.openai.com")
+    errors = [
+        AuthenticationError("invalid key", response=httpx.Response(401, request=request), body=None),
+        RateLimitError(
+            "quota",
+            response=httpx.Response(429, request=request),
+            body={"code": "insufficient_quota"}
+        ),
+    ]
+
+    for error in errors:
+        service.client = Mock()
+        service.client.embeddings.create = AsyncMock(side_effect=error)
+        stats = {}
+        with pytest.raises(type(error)):
+            await service.generate_embeddings_batch([f"text {i}" for i in range(8)], stats=stats)
+        service.client.embeddings.create.assert_awaited_once()
+        assert stats == {"retried": 0, "split": 0, "dropped": 0}
+
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_retries_transient_errors():
+    """Transient errors are retried without splitting the batch."""
+    import httpx
+    from openai import APIConnectionError
+
+    service = EmbeddingsService()
+    service.retry_base_delay = 0
+    calls = {"count": 0}
+
+    async def fake_create(model, input):
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        return Mock(data=[Mock(embedding=[1.0, 0.0]) for _ in input])
+
+    service.client = Mock()
+    service.client.embeddings.create = AsyncMock(side_effect=fake_create)
+
+    stats = {}
+    embeddings = await service.generate_embeddings_batch(["a", "b"], stats=stats)
+
+    assert all(e is not None for e in embeddings)
+    assert stats == {"retried": 2, "split": 0, "dropped": 0}
+
+
+@pytest.mark.asyncio
+async def test_embeddings_from_stand_in_server_survive_injected_429s(mock_openai_factory):
+    """Stand-in vectors are deterministic and injected 429s are retried away."""
+    _, clean_client = mock_openai_factory()
+    app, flaky_client = mock_openai_factory(rate_limit_rate=0.3, requests_per_minute=1000, seed=1)
+    texts = [f"{word} chip launch news {i}" for i, word in enumerate(["Nvidia", "AMD", "Intel"] * 7)]
+
+    service = EmbeddingsService()
+    service.retry_base_delay = 0
+    service.client = clean_client
+    expected = await service.generate_embeddings_batch(texts)
+    # Retries are the service's own, as with its default client
+    service.client = flaky_client.with_options(max_retries=0)
+    stats = {}
+    embeddings = await service.generate_embeddings_batch(texts, stats=stats)
+
+    assert embeddings == expected
+    assert app.state.stats["rate_limited"] > 0
+    assert stats["retried"] > 0 and stats["dropped"] == 0
+    # Texts sharing words are closer than unrelated ones
+    assert service.cosine_similarity(expected[0], expected[3]) > service.cosine_similarity(expected[0], expected[1]) > 0.3
+
+    raw = await flaky_client.embeddings.with_raw_response.create(model="text-embedding-ada-002", input="x")
+    assert int(raw.headers["x-ratelimit-remaining-requests"]) < 1000
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_embeddings_share_one_call():
+    """Overlapping batches from concurrent runs embed shared texts once."""
+    import asyncio
+
+    service = EmbeddingsService()
+    embedded = []
+
+    async def fake_create(model, input):
+        embedded.extend(input)
+        await asyncio.sleep(0.01)
+        return Mock(data=[Mock(embedding=[float(len(text)), 1.0]) for text in input])
+
+    service.client = Mock()
+    service.client.embeddings.create = AsyncMock(side_effect=fake_create)
+
+    first, second = await asyncio.gather(
+        service.generate_embeddings_batch(["shared", "only first"]),
+        service.generate_embeddings_batch(["shared", "only second"]),
+    )
+
+    assert sorted(embedded) == ["only first", "only second", "shared"]
+    assert first[0] == second[0] == [6.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_failed_shared_call_reaches_followers_and_is_retrieved():
+    """A failing batch fails its followers too, even after its own caller left."""
+    import asyncio
+    import gc
+
+    from src.embeddings.singleflight import SingleFlight
+
+    loop = asyncio.get_running_loop()
+    unretrieved = []
+    loop.set_exception_handler(lambda loop, context: unretrieved.append(context["message"]))
+    flights = SingleFlight()
+
+    async def failing(positions):
+        await asyncio.sleep(0.02)
+        raise RuntimeError("embedding failed")
+
+    leader = asyncio.ensure_future(flights.run_many(["a", "b", "c"], failing))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flights.run_many(["c", "b"], failing))
+    await asyncio.sleep(0.005)
+    leader.cancel()
+
+    with pytest.raises(RuntimeError):
+        await follower
+    assert flights.coalesced == 2
+
+    del leader, follower
+    await asyncio.sleep(0.03)
+    gc.collect()
+    await asyncio.sleep(0)
+    loop.set_exception_handler(None)
+    assert unretrieved == []
+
+
+@pytest.mark.asyncio
+async def test_enrich_grouped_articles_runs_calls_concurrently():
+    """Section calls fan out together, capped by the concurrency limit."""
+    import asyncio
+    from src.embeddings.content_generator import ContentGenerator
+
+    generator = ContentGenerator(openai_api_key="sk-test")
+    generator._semaphore = asyncio.Semaphore(3)
+    generator.cache = None
+    active = {"now": 0, "peak": 0, "calls": 0}
+
+    async def fake_create(**kwargs):
+        active["now"] += 1
+        active["calls"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        content = '{"brief": "brief", "narrative": "narrative"}' if "response_format" in kwargs else " text "
+        return Mock(choices=[Mock(message=Mock(content=content))])
+
+    generator.client = Mock()
+    generator.client.chat.completions.create = AsyncMock(side_effect=fake_create)
+
+    grouped = {
+        f"Topic {i}": [{"title": f"Article {i}-{j}", "summary": "s"} for j in range(2)]
+        for i in range(4)
+    }
+    result = await generator.enrich_grouped_articles(grouped)
+
+    # Summary + top picks + one TL;DR batch + one combined call per section
+    assert active["calls"] == 3 + 4
+    assert active["peak"] == 3
+    assert result["sections"]["Topic 2"]["brief"] == "brief"
+    assert result["sections"]["Topic 2"]["narrative"] == "narrative"
+
+
+@pytest.mark.asyncio
+async def test_section_enrichment_falls_back_to_separate_calls():
+    """An invalid combined response falls back to brief and narrative calls."""
+    from src.embeddings.content_generator import ContentGenerator
+
+    generator = ContentGenerator(openai_api_key="sk-test")
+    generator.cache = None
+
+    async def fake_create(**kwargs):
+        content = '{"brief": "only a brief"}' if "response_format" in kwargs else "separate"
+        return Mock(choices=[Mock(message=Mock(content=content))])
+
+    generator.client = Mock()
+    generator.client.chat.completions.create = AsyncMock(side_effect=fake_create)
+
+    result = await generator.generate_section_enrichment("AI", [{"title": "GPT-5", "summary": "s"}])
+
+    assert result == {"brief": "separate", "narrative": "separate"}
+    assert generator.client.chat.completions.create.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_enrichment_streams_text_and_reports_parts(mock_openai):
+    """Streamed chunks add up to the final texts; each section is reported when done."""
+    from src.embeddings.content_generator import ContentGenerator
+
+    _, client = mock_openai
+    generator = ContentGenerator(openai_api_key="sk-test")
+    generator.client = client
+    generator.cache = None
+
+    grouped = {
+        topic: [
+            {"title": f"{topic} story {i}", "content": f"{topic} details {i}", "url": f"https://example.com/{topic}/{i}"}
+            for i in range(3)
+        ]
+        for topic in ("AI", "Cloud")
+    }
+    events = []
+    result = await generator.enrich_grouped_articles(grouped, on_event=events.append)
+
+    def streamed(part, topic=None):
+        return "".join(
+            e["text"] for e in events
+            if e["type"] == "text" and e["part"] == part and e.get("topic") == topic
+        )
+
+    assert streamed("executive_summary") == result["executive_summary"]
+    for topic in grouped:
+        assert streamed("brief", topic) == result["sections"][topic]["brief"]
+        assert streamed("narrative", topic) == result["sections"][topic]["narrative"]
+    sections = [e for e in events if e["type"] == "section"]
+    assert sorted(e["topic"] for e in sections) == ["AI", "Cloud"]
+    assert [e["type"] for e in events].count("top_articles") == 1
+
+
+@pytest.mark.asyncio
+async def test_tldrs_are_batched_mapped_by_index_and_cached(tmp_path):
+    """TL;DRs come back in input order from batched calls, once per article."""
+    import json
+    import re
+    from src.embeddings.content_generator import TLDR_BATCH_SIZE, ContentGenerator
+    from src.embeddings.llm_cache import LLMCache
+
+    generator = ContentGenerator(openai_api_key="sk-test")
+    generator.cache = LLMCache(str(tmp_path / "cache.sqlite"))
+
+    async def fake_create(**kwargs):
+        # Answer in reverse order, echoing each article's title
+        numbered = re.findall(r"^(\d+)\. (.+)$", kwargs["messages"][1]["content"], re.M)
+        summaries = [{"index": int(i), "tldr": f"About {title}"} for i, title in reversed(numbered)]
+        return Mock(choices=[Mock(message=Mock(content=json.dumps({"summaries": summaries})))])
+
+    generator.client = Mock()
+    generator.client.chat.completions.create = AsyncMock(side_effect=fake_create)
+
+    articles = [
+        {"title": f"Story {i}", "content": f"<p>Body of story {i}</p>"}
+        for i in range(TLDR_BATCH_SIZE + 5)
+    ]
+    articles.append(dict(articles[0]))  # same content, summarized once
+
+    tldrs = await generator.generate_tldrs(articles)
+
+    assert tldrs[:3] == ["About Story 0", "About Story 1", "About Story 2"]
+    assert tldrs[-1] == tldrs[0]
+    assert generator.client.chat.completions.create.await_count == 2
+    assert "<p>" not in generator.client.chat.completions.create.await_args.kwargs["messages"][1]["content"]
+
+    assert await generator.generate_tldrs(articles[:4]) == tldrs[:4]
+    assert generator.client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_reuses_responses_until_bypassed(tmp_path):
+    """Repeated prompts hit the cache; a bypass regenerates and re-stores."""
+    from src.embeddings.content_generator import ContentGenerator
+    from src.embeddings.llm_cache import LLMCache, bypass_llm_cache
+
+    generator = ContentGenerator(openai_api_key="sk-test")
+    generator.cache = LLMCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    generator.client = Mock()
+    generator.client.chat.completions.create = AsyncMock(
+        return_value=Mock(choices=[Mock(message=Mock(content="AI News"))])
+    )
+    articles = [{"title": "GPT-5 released"}]
+
+    assert await generator.generate_cluster_name(articles) == "AI News"
+    assert await generator.generate_cluster_name(articles) == "AI News"
+    assert generator.client.chat.completions.create.await_count == 1
+
+    with bypass_llm_cache():
+        await generator.generate_cluster_name(articles)
+    assert generator.client.chat.completions.create.await_count == 2
+    stats = await generator.cache.astats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+
+def test_llm_cache_expires_and_evicts_least_recently_used(tmp_path):
+    """Entries expire after their TTL and the oldest-used go first when full."""
+    from src.embeddings.llm_cache import LLMCache
+
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("a", "cluster_name", "A")
+    cache.set("b", "cluster_name", "B")
+    assert cache.get("a", ttl=60) == "A"  # b is now least recently used
+
+    cache.set("c", "cluster_name", "C")
+    assert cache.get("b", ttl=60) is None
+    assert cache.get("c", ttl=60) == "C"
+    assert cache.get("a", ttl=-1) is None
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_writes_hit_recency_in_bulk(tmp_path):
+    """Async hits record recency in memory; it reaches the database on flush."""
+    import asyncio
+    import sqlite3
+
+    from src.embeddings.llm_cache import LLMCache
+
+    path = tmp_path / "cache.sqlite"
+    cache = LLMCache(str(path))
+    await cache.aset_many({"a": "A", "b": "B"}, "tldr_batch")
+
+    def last_used():
+        with sqlite3.connect(path) as conn:
+            return dict(conn.execute("SELECT key, last_used FROM llm_cache").fetchall())
+
+    stored = last_used()
+    await asyncio.sleep(0.01)
+    assert await cache.aget_many(["a", "b", "x"], ttl=60) == {"a": "A", "b": "B"}
+    assert await cache.aget("a", ttl=60) == "A"
+    assert last_used() == stored
+
+    cache.flush()
+    assert all(used > stored[key] for key, used in last_used().items())
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_semantic_cache_matches_in_memory_within_its_own_limit(tmp_path):
+    """Semantic entries are matched in memory and evicted against their own limit."""
+    from src.embeddings.llm_cache import LLMCache
+
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path, max_entries=1, max_semantic_entries=2)
+    cache.set("exact", "cluster_name", "E")
+    for i, vector in enumerate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]):
+        cache.set_similar("section", "v1", vector, f"R{i}")
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["semantic_entries"]) == (1, 2)
+    assert cache.get_similar("section", "v1", [1.0, 0.0, 0.0], 0.9, 60) is None
+    assert cache.get_similar("section", "v1", [0.0, 0.0, 1.0], 0.9, 60) == "R2"
+    assert cache.get_similar("section", "v2", [0.0, 0.0, 1.0], 0.9, 60) is None
+    assert cache.get_similar("section", "v1", [0.0, 0.0, 1.0], 0.9, -1) is None
+
+    reopened = LLMCache(path, max_semantic_entries=2)
+    assert reopened.get_similar("section", "v1", [0.0, 1.0, 0.0], 0.9, 60) == "R1"
+
+    # Vectors of another dimension (a new embedding model) get their own group
+    reopened.set_similar("section", "v1", [0.0, 0.0, 0.0, 1.0], "R3")
+    assert reopened.get_similar("section", "v1", [0.0, 0.0, 0.0, 1.0], 0.9, 60) == "R3"
+    assert reopened.get_similar("section", "v1", [0.0, 0.0, 1.0], 0.9, 60) == "R2"
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_reuses_near_identical_sections(tmp_path):
+    """A section with almost the same articles reuses the earlier response."""
+    from src.embeddings.content_generator import ContentGenerator
+    from src.embeddings.llm_cache import LLMCache
+
+    generator = ContentGenerator(openai_api_key="sk-test")
+    generator.cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    generator.client = Mock()
+    generator.client.chat.completions.create = AsyncMock(
+        return_value=Mock(choices=[Mock(message=Mock(content="AI News"))])
+    )
+
+    yesterday = [{"title": f"Story {i}", "embedding": [1.0, 0.01 * i, 0.0]} for i in range(5)]
+    today = yesterday[1:] + [{"title": "New headline", "embedding": [1.0, 0.02, 0.0]}]
+    unrelated = [{"title": "Chip shortage", "embedding": [0.0, 0.0, 1.0]}]
+
+    assert await generator.generate_cluster_name(yesterday) == "AI News"
+    assert await generator.generate_cluster_name(today) == "AI News"
+    assert generator.client.chat.completions.create.await_count == 1
+
+    await generator.generate_cluster_name(unrelated)
+    assert generator.client.chat.completions.create.await_count == 2
+    stats = generator.cache.stats()
+    assert (stats["semantic_hits"], stats["semantic_misses"]) == (1, 2)
+
+
+def test_pack_items_keeps_leading_items_within_budget():
+    """Packing keeps a prefix that fits and never returns an empty prompt."""
+    from src.embeddings.token_budget import count_tokens, pack_items
+
+    items = [f"- Headline number {i} about cloud infrastructure" for i in range(20)]
+    budget = 60
+    packed = pack_items(items, budget)
+
+    assert packed == items[:len(packed)]
+    assert 0 < len(packed) < len(items)
+    assert count_tokens("\n".join(packed)) <= budget
+
+    long_item = "word " * 500
+    assert count_tokens(pack_items([long_item], 10)[0]) <= 10
+
+
+def test_token_counts_fall_back_to_estimate_when_encoding_cannot_load(monkeypatch, caplog):
+    """A tokenizer that fails to load (e.g. offline download) degrades to the estimate."""
+    from types import SimpleNamespace
+
+    from src.embeddings import token_budget
+
+    def unavailable(name):
+        raise OSError("network unreachable")
+
+    monkeypatch.setattr(token_budget, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(
+        token_budget, "tiktoken",
+        SimpleNamespace(encoding_for_model=unavailable, get_encoding=unavailable),
+        raising=False
+    )
+    monkeypatch.setattr(token_budget, "_encoding_errors", [])
+    token_budget._encoding.cache_clear()
+    try:
+        assert token_budget.count_tokens("a" * 40) == 10
+        assert token_budget.truncate_to_tokens("word " * 20, 2) == "word wor"
+        assert token_budget.count_tokens("b" * 8, model="gpt-4o") == 2
+    finally:
+        token_budget._encoding.cache_clear()
+
+    assert len([r for r in caplog.records if "tiktoken" in r.getMessage()]) == 1
+
+
+@pytest.mark.asyncio
+async def test_local_digest_makes_no_llm_calls():
+    """Fast mode names clusters by keywords and writes extractive content."""
+    service = EmbeddingsService()
+    generator = service.content_generator
+    generator.client = Mock()
+    generator.client.chat.completions.create = AsyncMock(side_effect=AssertionError("no LLM calls"))
+
+    def story(title, content, vector):
+        return {"title": title, "content": f"<p>{content}</p>", "url": f"https://example.com/{title}", "embedding": vector}
+
+    articles = [
+        story("OpenAI launches GPT-5", "OpenAI released GPT-5 today. It improves reasoning a lot.", [1.0, 0.0, 0.0]),
+        story("GPT-5 tops coding benchmarks", "GPT-5 leads every coding benchmark so far.", [0.99, 0.05, 0.0]),
+        story("AWS outage hits us-east-1", "AWS suffered a long outage in us-east-1.", [0.0, 1.0, 0.0]),
+        story("Amazon explains AWS outage", "Amazon blamed a faulty network change for it.", [0.05, 0.99, 0.0]),
+    ]
+
+    grouped = await service.cluster_and_name_articles(articles, max_clusters=2, local=True)
+    enriched = await service.enrich_grouped_articles(grouped, local=True)
+
+    ai_label, cloud_label = sorted(grouped, key=lambda label: "AWS" in label)
+    assert ai_label.startswith("GPT-5, ") and cloud_label.startswith("AWS, Outage")
+    section = enriched["sections"][ai_label]
+    assert section["brief"] == "OpenAI released GPT-5 today. GPT-5 leads every coding benchmark so far."
+    assert section["narrative"].startswith("OpenAI released GPT-5 today.")
+    assert section["articles"][0]["tldr"] == "OpenAI released GPT-5 today. It improves reasoning a lot."
+    assert len(enriched["top_articles"]) == 3
+    assert all(a["selection_reason"] and a["tldr"] for a in enriched["top_articles"])
+    assert enriched["executive_summary"].startswith("- **")
+    generator.client.chat.completions.create.assert_not_awaited()
@@ -2,6 +2,7 @@
 
 import pytest
 from pathlib import Path
+from src.pdf_generator.digest_builder import DigestBuilder
 from src.pdf_generator.pdf_service import PDFGenerator
 
 
@@ -48,3 +49,42 @@ def test_generate_html():
     assert "<html>" in html
     assert "Test Title" in html
     assert "Article 1" in html
+
+
+def test_digest_builder_renders_sections_as_they_arrive(tmp_path):
+    """Sections are rendered on arrival and end up in topic order for the PDF."""
+    import json
+
+    generator = PDFGenerator(output_dir=str(tmp_path))
+    forwarded = []
+    builder = DigestBuilder(["AI", "Cloud"], generator, forwarded.append)
+
+    def article(n):
+        return {"title": f"Story {n}", "url": f"https://example.com/{n}", "source": "Wire", "embedding": [0.1]}
+
+    builder.handle({"type": "section", "topic": "Cloud", "section": {
+        "articles": [article(2)], "count": 1, "brief": "Cloud brief.", "narrative": "Cloud narrative.",
+    }})
+    assert builder.pending_topics == ["AI"]
+    assert forwarded[-1]["markdown"].startswith("## Cloud")
+
+    enriched = {
+        "executive_summary": "- Summary",
+        "top_articles": [{**article(1), "selection_reason": "Biggest launch", "tldr": "It shipped."}],
+        "sections": {
+            "AI": {"articles": [{**article(1), "tldr": "It shipped."}], "count": 1,
+                   "brief": "AI brief.", "narrative": "AI narrative."},
+            "Cloud": {"articles": [{**article(2), "tldr": None}], "count": 1,
+                      "brief": "Cloud brief.", "narrative": "Cloud narrative."},
+        },
+    }
+    data = builder.finish(enriched)
+
+    assert [topic["topic_name"] for topic in data["topics"]] == ["AI", "Cloud"]
+    assert data["topics"][0]["articles"][0]["tldr"] == "It shipped."
+    html = generator.generate_html_enriched(data)
+    assert html.index("AI narrative.") < html.index("Cloud narrative.")
+    assert "Biggest launch" in html
+    assert "2 developments across 2 key areas" in generator.generate_markdown_enriched(data)
+    # Forwarded events are client-safe JSON
+    assert "embedding" not in json.dumps(forwarded)